@@ -0,0 +1,240 @@
+"""
+Benchmarks dos caminhos de precificação (legado e refatorado) e do cadastro
+de clientes, com quebra por etapa do processamento em lote.
+
+Uso (a partir de ``src/``)::
+
+    python -m bench.benchmark --pedidos 100000 --clientes 20000 --saida base.json
+    python -m bench.benchmark --comparar base.json --tolerancia 0.2
+
+Com ``--comparar``, o processo termina com código 1 se algum caso ficar mais
+lento (por item) do que a linha de base além da tolerância.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, redirect_stdout
+from itertools import count
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from bench.cargas import gerar_clientes, gerar_pedidos
+from bench.legado import carregar_legado
+from refatorado.cliente_service import ClienteService
+from refatorado.pedido import LotePedidos
+from refatorado.pedido_service import PedidoService
+from refatorado.repositorio_clientes import RepositorioClientes
+from refatorado.validacao_clientes import validar_lote
+
+Caso = Tuple[Callable[[], object], int]  # (função medida, itens processados por chamada)
+Resultados = Dict[str, Dict[str, float]]
+
+
+@contextmanager
+def _na_pasta(pasta: str) -> Iterator[None]:
+    """Executa o bloco com ``pasta`` como diretório de trabalho."""
+    anterior = os.getcwd()
+    os.chdir(pasta)
+    try:
+        yield
+    finally:
+        os.chdir(anterior)
+
+
+def casos_pedidos(quantidade: int) -> Dict[str, Caso]:
+    """Casos de precificação: legado, escalar, lote, modo exato e etapas do lote."""
+    pedidos = gerar_pedidos(quantidade)
+    legado = carregar_legado(silencioso=False)
+    service = PedidoService()
+    calculadora = service.calculadora
+
+    validos = [p for p in pedidos if p["qtd"] > 0]
+    produtos = [p["produto"] for p in validos]
+    quantidades = [p["qtd"] for p in validos]
+    cupons = [p["cupom"] for p in validos]
+    precos = list(calculadora.calcular_precos(produtos, quantidades))
+    com_cupom = service.cupons.aplicar_lote(precos, cupons, produtos)
+    arredondar = service._arredondar_valor  # pylint: disable=W0212
+    lote = LotePedidos.de_pedidos(pedidos)
+
+    return {
+        "preco.legado": (
+            lambda: [legado.calcular_preco(p, q) for p, q in zip(produtos, quantidades)],
+            len(validos),
+        ),
+        "preco.escalar": (
+            lambda: [calculadora.calcular_preco(p, q) for p, q in zip(produtos, quantidades)],
+            len(validos),
+        ),
+        "preco.lote": (lambda: calculadora.calcular_precos(produtos, quantidades), len(validos)),
+        "preco.centavos": (
+            lambda: calculadora.calcular_precos_centavos(produtos, quantidades),
+            len(validos),
+        ),
+        "pedido.legado": (lambda: [legado.processar_pedido(p) for p in validos], len(validos)),
+        "pedido.escalar": (lambda: [service.processar_pedido(p) for p in pedidos], quantidade),
+        "pedido.lote": (
+            lambda: service.processar_pedidos(pedidos, registrar_log=False),
+            quantidade,
+        ),
+        "pedido.lote_colunas": (
+            lambda: service.processar_pedidos(lote, registrar_log=False),
+            quantidade,
+        ),
+        "pedido.lote_centavos": (
+            lambda: service.processar_pedidos_centavos(pedidos, registrar_log=False),
+            quantidade,
+        ),
+        "pedido.etapa.validacao": (
+            lambda: service._separar_validos(pedidos),  # pylint: disable=W0212
+            quantidade,
+        ),
+        "pedido.etapa.preco": (
+            lambda: calculadora.calcular_precos(produtos, quantidades),
+            len(validos),
+        ),
+        "pedido.etapa.cupom": (
+            lambda: service.cupons.aplicar_lote(precos, cupons, produtos),
+            len(validos),
+        ),
+        "pedido.etapa.arredondamento": (
+            lambda: [arredondar(p, prod) for p, prod in zip(com_cupom, produtos)],
+            len(validos),
+        ),
+    }
+
+
+def casos_clientes(quantidade: int, pasta: str) -> Dict[str, Caso]:
+    """Casos de cadastro e validação de clientes; cada chamada grava em um arquivo novo."""
+    clientes = gerar_clientes(quantidade)
+    legado = carregar_legado(silencioso=False)
+    sequencia = count()
+
+    def novo_arquivo() -> str:
+        return os.path.join(pasta, f"clientes_{next(sequencia)}.txt")
+
+    def cadastrar_legado() -> None:
+        subpasta = novo_arquivo() + ".d"
+        os.mkdir(subpasta)
+        with _na_pasta(subpasta):
+            for cliente in clientes:
+                legado.cadastrar_cliente(cliente)
+
+    def cadastrar_individual() -> None:
+        service = ClienteService(novo_arquivo())
+        for cliente in clientes:
+            service.cadastrar_cliente(cliente)
+
+    def cadastrar_repositorio() -> None:
+        with RepositorioClientes(novo_arquivo() + ".db") as repositorio:
+            ClienteService(repositorio=repositorio).cadastrar_clientes(clientes)
+
+    def cadastrar_lote() -> None:
+        ClienteService(novo_arquivo()).cadastrar_clientes(clientes)
+
+    return {
+        "cliente.legado": (cadastrar_legado, quantidade),
+        "cliente.individual": (cadastrar_individual, quantidade),
+        "cliente.lote": (cadastrar_lote, quantidade),
+        "cliente.repositorio": (cadastrar_repositorio, quantidade),
+        "cliente.validacao_lote": (lambda: validar_lote(clientes), quantidade),
+    }
+
+
+def medir(funcao: Callable[[], object], repeticoes: int) -> float:
+    """Retorna o menor tempo (em segundos) entre as repetições, com stdout descartado."""
+    melhor = float("inf")
+    with open(os.devnull, "w", encoding="utf-8") as nulo, redirect_stdout(nulo):
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            funcao()
+            melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def executar(n_pedidos: int, n_clientes: int, repeticoes: int = 3) -> Resultados:
+    """Executa todos os casos e retorna tempo total e microssegundos por item de cada um."""
+    resultados: Resultados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        casos = {**casos_pedidos(n_pedidos), **casos_clientes(n_clientes, pasta)}
+        for nome, (funcao, itens) in casos.items():
+            segundos = medir(funcao, repeticoes)
+            resultados[nome] = {
+                "segundos": segundos,
+                "itens": itens,
+                "us_por_item": segundos * 1e6 / itens if itens else 0.0,
+            }
+    return resultados
+
+
+def comparar(atual: Resultados, base: Resultados, tolerancia: float) -> List[str]:
+    """Lista os casos cujo tempo por item piorou mais que ``tolerancia`` em relação à base."""
+    regressoes = []
+    for nome, medida in atual.items():
+        referencia = base.get(nome)
+        if referencia is None or not referencia["us_por_item"]:
+            continue
+        razao = medida["us_por_item"] / referencia["us_por_item"]
+        if razao > 1 + tolerancia:
+            regressoes.append(
+                f"{nome}: {referencia['us_por_item']:.3f} -> {medida['us_por_item']:.3f} "
+                f"us/item ({razao:.2f}x)"
+            )
+    return regressoes
+
+
+def _imprimir(resultados: Resultados) -> None:
+    """Mostra os resultados em uma tabela simples."""
+    print(f"{'caso':<30} {'itens':>9} {'total (s)':>11} {'us/item':>10}")
+    for nome, medida in resultados.items():
+        print(
+            f"{nome:<30} {medida['itens']:>9} {medida['segundos']:>11.4f} "
+            f"{medida['us_por_item']:>10.3f}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Executa os benchmarks, salva a linha de base e/ou compara com uma anterior."""
+    parser = argparse.ArgumentParser(description="Benchmarks da PetroBahia.")
+    parser.add_argument("--pedidos", type=int, default=100_000, help="Pedidos sintéticos.")
+    parser.add_argument("--clientes", type=int, default=10_000, help="Clientes sintéticos.")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Repetições por caso.")
+    parser.add_argument("--saida", help="Arquivo JSON onde salvar os resultados.")
+    parser.add_argument("--comparar", help="Arquivo JSON de linha de base para comparar.")
+    parser.add_argument(
+        "--tolerancia", type=float, default=0.2, help="Piora aceita por item (0.2 = 20%%)."
+    )
+    args = parser.parse_args(argv)
+
+    resultados = executar(args.pedidos, args.clientes, args.repeticoes)
+    _imprimir(resultados)
+
+    if args.saida:
+        dados = {
+            "meta": {
+                "python": platform.python_version(),
+                "plataforma": platform.platform(),
+                "pedidos": args.pedidos,
+                "clientes": args.clientes,
+                "repeticoes": args.repeticoes,
+            },
+            "resultados": resultados,
+        }
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(dados, arquivo, indent=2)
+
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as arquivo:
+            base = json.load(arquivo)["resultados"]
+        regressoes = comparar(resultados, base, args.tolerancia)
+        for regressao in regressoes:
+            print(f"[REGRESSÃO] {regressao}")
+        return 1 if regressoes else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""Geradores de cargas sintéticas (pedidos e clientes) para benchmarks e testes."""
+import random
+from typing import Dict, List, Optional, Union
+
+PRODUTOS = ("diesel", "gasolina", "etanol", "lubrificante")
+CUPONS = (None, None, "MEGA10", "NOVO5", "LUB2")
+# Limites das faixas de desconto; quantidades em volta deles exercitam as bordas.
+LIMITES_QTD = (80, 200, 500, 1000)
+
+
+def gerar_pedidos(
+    quantidade: int, semente: int = 0, cupons: Optional[tuple] = None
+) -> List[Dict[str, Union[str, int, None]]]:
+    """Gera pedidos variados: todos os produtos, quantidades nas bordas das faixas e cupons."""
+    aleatorio = random.Random(semente)
+    cupons = cupons or CUPONS
+    pedidos = []
+    for i in range(quantidade):
+        if aleatorio.random() < 0.3:
+            qtd = aleatorio.choice(LIMITES_QTD) + aleatorio.randint(-1, 1)
+        else:
+            qtd = aleatorio.randint(0, 2000)
+        pedidos.append(
+            {
+                "cliente": f"Cliente{i % 1000}",
+                "produto": aleatorio.choice(PRODUTOS),
+                "qtd": qtd,
+                "cupom": aleatorio.choice(cupons),
+            }
+        )
+    return pedidos
+
+
+def gerar_clientes(quantidade: int, semente: int = 0) -> List[Dict[str, str]]:
+    """Gera clientes com emails válidos e inválidos e CNPJs de 14 dígitos."""
+    aleatorio = random.Random(semente)
+    clientes = []
+    for i in range(quantidade):
+        email = f"frota{i}@petrobahia.com" if aleatorio.random() < 0.9 else f"frota{i}@@petrobahia"
+        clientes.append(
+            {
+                "nome": f"Frota {i}",
+                "email": email,
+                "cnpj": f"{aleatorio.randrange(10**14):014d}",
+            }
+        )
+    return clientes
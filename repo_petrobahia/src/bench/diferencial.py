@@ -0,0 +1,323 @@
+"""
+Teste diferencial em larga escala: gera pedidos aleatórios (todos os
+produtos, quantidades nas bordas 80/200/500/1000 e cupons), precifica-os
+em cada implementação disponível e compara com a referência
+(``refatorado.escalar``; o modo exato, em centavos, tem a sua própria). Os
+blocos de pedidos rodam em paralelo, em um pool de processos; a primeira
+divergência é reduzida a um caso mínimo.
+
+O legado só entra se pedido em ``--implementacoes``, e a sua divergência
+documentada (sem o arredondamento intermediário do preço base e com o cupom
+percentual calculado como ``preco - preco * taxa``, o valor final pode mudar
+em um centavo, ou em um real no diesel; ex.: etanol x81) é tolerada só nos
+casos de ``DIVERGENCIAS_LEGADO``; qualquer outra diferença é reportada.
+
+Uso (a partir de ``src/``)::
+
+    python -m bench.diferencial --pedidos 1000000 --workers 8
+    python -m bench.diferencial --implementacoes legado,refatorado.lote
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from bench.cargas import CUPONS, LIMITES_QTD, gerar_pedidos
+from bench.legado import carregar_legado
+from refatorado.cache_precos import CachePrecos
+from refatorado.pedido import LotePedidos, PedidoDict
+from refatorado.pedido_service import PedidoService
+from refatorado.preco_calculadora import PrecoCalculadora
+
+Implementacao = Callable[[List[PedidoDict]], List[Union[float, int]]]
+Tolerancia = Callable[[PedidoDict, Union[float, int], Union[float, int]], bool]
+
+REFERENCIA = "refatorado.escalar"
+REFERENCIA_CENTAVOS = "refatorado.centavos.escalar"
+# Cupons combinados também entram na carga, para exercitar o motor de cupons.
+CUPONS_DIFERENCIAL = CUPONS + ("MEGA10+NOVO5", "XPTO")
+
+
+def _legado() -> Implementacao:
+    processar = carregar_legado().processar_pedido
+    return lambda pedidos: [processar(p) for p in pedidos]
+
+
+def _refatorado_escalar() -> Implementacao:
+    service = PedidoService()
+
+    def precificar(pedidos: List[PedidoDict]) -> List[float]:
+        with open(os.devnull, "w", encoding="utf-8") as nulo, redirect_stdout(nulo):
+            return [service.processar_pedido(p) for p in pedidos]
+
+    return precificar
+
+
+def _refatorado_lote() -> Implementacao:
+    service = PedidoService()
+    return lambda pedidos: service.processar_pedidos(pedidos, registrar_log=False).valores
+
+
+def _refatorado_colunas() -> Implementacao:
+    service = PedidoService()
+    return lambda pedidos: service.processar_pedidos(
+        LotePedidos.de_pedidos(pedidos), registrar_log=False
+    ).valores
+
+
+def _refatorado_cache() -> Implementacao:
+    # O cache dura o processo inteiro: os blocos seguintes também exercitam os acertos.
+    service = PedidoService(cache=CachePrecos())
+    return lambda pedidos: service.processar_pedidos(pedidos, registrar_log=False).valores
+
+
+def _refatorado_centavos() -> Implementacao:
+    service = PedidoService()
+    return lambda pedidos: service.processar_pedidos_centavos(
+        pedidos, registrar_log=False
+    ).valores
+
+
+def _refatorado_centavos_escalar() -> Implementacao:
+    service = PedidoService()
+    return lambda pedidos: [
+        service.processar_pedidos_centavos([p], registrar_log=False).valores[0]
+        for p in pedidos
+    ]
+
+
+# Fábricas das implementações, criadas uma vez em cada processo trabalhador.
+IMPLEMENTACOES: Dict[str, Callable[[], Implementacao]] = {
+    "legado": _legado,
+    "refatorado.escalar": _refatorado_escalar,
+    "refatorado.lote": _refatorado_lote,
+    "refatorado.colunas": _refatorado_colunas,
+    "refatorado.cache": _refatorado_cache,
+    "refatorado.centavos": _refatorado_centavos,
+    "refatorado.centavos.escalar": _refatorado_centavos_escalar,
+}
+
+# O modo exato calcula em decimal e difere do float de propósito; é
+# comparado com a sua própria referência, pedido a pedido.
+REFERENCIAS: Dict[str, str] = {
+    "refatorado.centavos": REFERENCIA_CENTAVOS,
+    REFERENCIA_CENTAVOS: REFERENCIA_CENTAVOS,
+}
+
+# Só entram quando pedidas explicitamente em ``--implementacoes``.
+OPCIONAIS = ("legado",)
+PADRAO = tuple(nome for nome in IMPLEMENTACOES if nome not in OPCIONAIS)
+
+
+# Casos documentados em que o legado diverge da referência: (produto, limite
+# da faixa de quantidade em vigor; 0 abaixo de todas) -> unidade do arredondamento final.
+DIVERGENCIAS_LEGADO: Dict[Tuple[str, int], float] = {
+    ("diesel", 500): 1.0,
+    ("diesel", 1000): 1.0,
+    ("etanol", 0): 0.01,
+    ("etanol", 80): 0.01,
+    ("gasolina", 0): 0.01,
+    ("gasolina", 200): 0.01,
+}
+
+_MODELO = PedidoService()
+
+
+def caso_do_legado(pedido: PedidoDict) -> Tuple[Optional[str], int]:
+    """Chave de ``DIVERGENCIAS_LEGADO`` do pedido: produto e limite da faixa em vigor."""
+    produto, qtd = pedido.get("produto"), pedido.get("qtd") or 0
+    faixas = PrecoCalculadora.FAIXAS.get(produto, ())
+    return produto, max((f.limite for f in faixas if qtd > f.limite), default=0)
+
+
+def _legado_modelado(pedido: PedidoDict) -> float:
+    """
+    Valor da referência com só as duas diferenças documentadas do legado: o
+    preço base não é arredondado a centavos antes do cupom e do arredondamento
+    final, e o cupom percentual é calculado como ``preco - preco * taxa``.
+    """
+    produto, cupom = pedido["produto"], pedido.get("cupom")
+    preco = _MODELO.calculadora.tabela.preco_total(produto, pedido["qtd"])
+    regra = _MODELO.cupons.regras.get(cupom) if cupom else None
+    if regra is not None and regra.vale_para(produto, None):
+        preco = preco - preco * round(1 - regra.multiplicador, 2) - regra.deducao
+    return _MODELO._arredondar_valor(preco, produto)  # pylint: disable=protected-access
+
+
+def _arredondamento_do_legado(
+    pedido: PedidoDict, esperado: float, valor: float
+) -> bool:
+    """
+    Tolera a divergência documentada do legado (ex.: etanol x81) só nos casos
+    de ``DIVERGENCIAS_LEGADO``, quando a diferença é de exatamente uma unidade
+    do arredondamento final e o valor do legado é o previsto por
+    ``_legado_modelado``. Qualquer outra diferença é reportada.
+    """
+    unidade = DIVERGENCIAS_LEGADO.get(caso_do_legado(pedido))
+    if unidade is None or not isinstance(pedido.get("qtd"), int) or pedido["qtd"] <= 0:
+        return False
+    return round(abs(esperado - valor), 2) == unidade and _legado_modelado(pedido) == valor
+
+
+# Divergências conhecidas e aceitas, por implementação.
+TOLERADAS: Dict[str, Tolerancia] = {"legado": _arredondamento_do_legado}
+
+
+def referencia_de(nome: str) -> str:
+    """Implementação com a qual ``nome`` é comparada."""
+    return REFERENCIAS.get(nome, REFERENCIA)
+
+
+class Divergencia(NamedTuple):
+    """Primeiro pedido em que alguma implementação diverge da referência."""
+
+    indice: int
+    pedido: PedidoDict
+    valores: Dict[str, Union[float, int]]
+
+
+_IMPLEMENTACOES_DO_PROCESSO: Dict[str, Implementacao] = {}
+
+
+def _inicializar_processo(nomes: Sequence[str]) -> None:
+    """Cria as implementações pedidas no processo trabalhador."""
+    _IMPLEMENTACOES_DO_PROCESSO.clear()
+    for nome in dict.fromkeys(n for nome in nomes for n in (referencia_de(nome), nome)):
+        _IMPLEMENTACOES_DO_PROCESSO[nome] = IMPLEMENTACOES[nome]()
+
+
+def primeira_divergencia(
+    pedidos: List[PedidoDict],
+    implementacoes: Dict[str, Implementacao],
+    inicio: int = 0,
+    toleradas: Optional[Dict[str, Tolerancia]] = None,
+) -> Optional[Divergencia]:
+    """
+    Compara cada implementação com a sua referência e retorna a primeira
+    divergência que não está em ``toleradas`` (padrão: ``TOLERADAS``).
+    """
+    toleradas = TOLERADAS if toleradas is None else toleradas
+    resultados = {nome: impl(pedidos) for nome, impl in implementacoes.items()}
+    comparacoes = [
+        (resultados[nome], resultados[referencia_de(nome)], toleradas.get(nome))
+        for nome in resultados
+        if referencia_de(nome) in resultados and referencia_de(nome) != nome
+    ]
+    for i, pedido in enumerate(pedidos):
+        for obtidos, esperados, tolerada in comparacoes:
+            if obtidos[i] != esperados[i] and not (
+                tolerada and tolerada(pedido, esperados[i], obtidos[i])
+            ):
+                valores = {nome: valores[i] for nome, valores in resultados.items()}
+                return Divergencia(inicio + i, pedido, valores)
+    return None
+
+
+def _verificar_bloco(semente: int, tamanho: int, inicio: int) -> Optional[Divergencia]:
+    """Gera e verifica um bloco de pedidos dentro do processo trabalhador."""
+    pedidos = gerar_pedidos(tamanho, semente=semente, cupons=CUPONS_DIFERENCIAL)
+    return primeira_divergencia(pedidos, _IMPLEMENTACOES_DO_PROCESSO, inicio)
+
+
+def minimizar(pedido: PedidoDict, implementacoes: Dict[str, Implementacao]) -> PedidoDict:
+    """
+    Reduz o pedido divergente a um caso mínimo que ainda diverge: remove o
+    cupom e o cliente quando possível e procura a menor quantidade candidata
+    (bordas das faixas, metades e vizinhos).
+    """
+
+    def diverge(candidato: PedidoDict) -> bool:
+        return primeira_divergencia([candidato], implementacoes) is not None
+
+    atual = dict(pedido)
+    for campo, simples in (("cupom", None), ("cliente", "X")):
+        candidato = dict(atual, **{campo: simples})
+        if atual.get(campo) != simples and diverge(candidato):
+            atual = candidato
+
+    while isinstance(atual.get("qtd"), int) and atual["qtd"] > 1:
+        qtd = atual["qtd"]
+        candidatas = {1, qtd // 2, qtd - 1}
+        candidatas.update(limite + delta for limite in LIMITES_QTD for delta in (0, 1))
+        for nova in sorted(c for c in candidatas if 0 < c < qtd):
+            candidato = dict(atual, qtd=nova)
+            if diverge(candidato):
+                atual = candidato
+                break
+        else:
+            break
+    return atual
+
+
+def verificar(
+    total_pedidos: int,
+    nomes: Sequence[str],
+    workers: Optional[int] = None,
+    tamanho_bloco: int = 50_000,
+    semente: int = 0,
+) -> Optional[Divergencia]:
+    """
+    Verifica ``total_pedidos`` pedidos em blocos paralelos e retorna a
+    primeira divergência na ordem dos pedidos (ou None se todas concordam).
+    """
+    blocos = [
+        (semente + i, min(tamanho_bloco, total_pedidos - inicio), inicio)
+        for i, inicio in enumerate(range(0, total_pedidos, tamanho_bloco))
+    ]
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_inicializar_processo, initargs=(tuple(nomes),)
+    ) as executor:
+        futuros = [executor.submit(_verificar_bloco, *bloco) for bloco in blocos]
+        for futuro in futuros:
+            divergencia = futuro.result()
+            if divergencia is not None:
+                for restante in futuros:
+                    restante.cancel()
+                return divergencia
+    return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Executa o teste diferencial e imprime a primeira divergência minimizada."""
+    parser = argparse.ArgumentParser(description="Teste diferencial das implementações.")
+    parser.add_argument("--pedidos", type=int, default=1_000_000, help="Pedidos gerados.")
+    parser.add_argument("--workers", type=int, help="Processos (padrão: núcleos da máquina).")
+    parser.add_argument("--bloco", type=int, default=50_000, help="Pedidos por bloco.")
+    parser.add_argument("--semente", type=int, default=0, help="Semente do gerador.")
+    parser.add_argument(
+        "--implementacoes",
+        default=",".join(PADRAO),
+        help="Implementações comparadas à referência, separadas por vírgula "
+        f"(disponíveis: {', '.join(IMPLEMENTACOES)}; {', '.join(OPCIONAIS)} só se pedido).",
+    )
+    args = parser.parse_args(argv)
+    nomes = [nome.strip() for nome in args.implementacoes.split(",") if nome.strip()]
+    desconhecidas = set(nomes) - set(IMPLEMENTACOES)
+    if desconhecidas:
+        parser.error(f"Implementações desconhecidas: {sorted(desconhecidas)}")
+
+    divergencia = verificar(args.pedidos, nomes, args.workers, args.bloco, args.semente)
+    if divergencia is None:
+        toleradas = [nome for nome in nomes if nome in TOLERADAS]
+        ressalva = f" (tolerando as divergências documentadas de {', '.join(toleradas)})"
+        print(
+            f"OK: {args.pedidos} pedidos idênticos em {', '.join(nomes)}"
+            f"{ressalva if toleradas else ''}."
+        )
+        return 0
+
+    _inicializar_processo(nomes)
+    minimo = minimizar(divergencia.pedido, _IMPLEMENTACOES_DO_PROCESSO)
+    print(f"[DIVERGÊNCIA] pedido #{divergencia.indice}: {divergencia.pedido}")
+    for nome, valor in divergencia.valores.items():
+        print(f"  {nome}: {valor!r}")
+    print(f"Caso mínimo: {minimo}")
+    for nome, impl in _IMPLEMENTACOES_DO_PROCESSO.items():
+        print(f"  {nome}: {impl([minimo])[0]!r}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Gerador de carga para o servidor de cotações: abre várias conexões, envia
+pedidos sintéticos com um limite de pedidos em voo por conexão e mede a vazão
+e a latência (p50, p99) de cada cotação.
+
+Uso (a partir de ``src/``)::
+
+    python -m bench.gerador_carga --porta 8765 --conexoes 50 --pedidos 2000
+    python -m bench.gerador_carga --embutido --conexoes 50 --pedidos 2000
+
+Com ``--embutido``, o servidor é iniciado no mesmo processo, em uma porta livre.
+"""
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence
+
+from bench.cargas import gerar_pedidos
+from refatorado.servidor_cotacoes import ServidorCotacoes
+
+Medidas = Dict[str, float]
+
+
+def percentil(ordenados: Sequence[float], fracao: float) -> float:
+    """Percentil (pelo posto mais próximo) de uma sequência já ordenada."""
+    if not ordenados:
+        return 0.0
+    return ordenados[max(0, math.ceil(fracao * len(ordenados)) - 1)]
+
+
+async def _conexao(
+    host: str, porta: int, pedidos: List[dict], em_voo: int, latencias: List[float]
+) -> None:
+    """Envia os pedidos por uma conexão, com até ``em_voo`` sem resposta, e mede cada um."""
+    leitor, escritor = await asyncio.open_connection(host, porta)
+    envios: Deque[float] = deque()
+    vagas = asyncio.Semaphore(em_voo)
+
+    async def receber() -> None:
+        for _ in pedidos:
+            if not await leitor.readline():
+                raise ConnectionError("O servidor encerrou a conexão.")
+            latencias.append(time.perf_counter() - envios.popleft())
+            vagas.release()
+
+    recebedor = asyncio.create_task(receber())
+    for pedido in pedidos:
+        await vagas.acquire()
+        envios.append(time.perf_counter())
+        escritor.write(json.dumps(pedido).encode("utf-8") + b"\n")
+        await escritor.drain()
+    await recebedor
+    escritor.close()
+    await escritor.wait_closed()
+
+
+async def gerar_carga(
+    host: str,
+    porta: int,
+    conexoes: int = 10,
+    pedidos_por_conexao: int = 1000,
+    em_voo: int = 16,
+    semente: int = 0,
+) -> Medidas:
+    """Executa a carga e retorna a vazão (cotações/s) e as latências em milissegundos."""
+    pedidos = gerar_pedidos(conexoes * pedidos_por_conexao, semente)
+    latencias: List[float] = []
+    inicio = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _conexao(
+                host,
+                porta,
+                pedidos[i * pedidos_por_conexao : (i + 1) * pedidos_por_conexao],
+                em_voo,
+                latencias,
+            )
+            for i in range(conexoes)
+        )
+    )
+    segundos = time.perf_counter() - inicio
+    latencias.sort()
+    return {
+        "pedidos": len(latencias),
+        "segundos": segundos,
+        "cotacoes_por_segundo": len(latencias) / segundos if segundos else 0.0,
+        "p50_ms": percentil(latencias, 0.50) * 1000,
+        "p99_ms": percentil(latencias, 0.99) * 1000,
+        "max_ms": (latencias[-1] if latencias else 0.0) * 1000,
+    }
+
+
+async def _gerar_carga_embutida(args: argparse.Namespace) -> Medidas:
+    """Sobe o servidor em uma porta livre, executa a carga e o encerra."""
+    servidor = ServidorCotacoes(porta=0)
+    await servidor.iniciar()
+    try:
+        return await gerar_carga(
+            servidor.host, servidor.porta, args.conexoes, args.pedidos, args.em_voo
+        )
+    finally:
+        await servidor.encerrar()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Executa a carga pela linha de comando e imprime as medidas."""
+    parser = argparse.ArgumentParser(description="Gerador de carga do servidor de cotações.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--conexoes", type=int, default=10, help="Conexões simultâneas.")
+    parser.add_argument("--pedidos", type=int, default=1000, help="Pedidos por conexão.")
+    parser.add_argument("--em-voo", type=int, default=16, help="Pedidos sem resposta por conexão.")
+    parser.add_argument(
+        "--embutido", action="store_true", help="Inicia o servidor no mesmo processo."
+    )
+    args = parser.parse_args(argv)
+
+    if args.embutido:
+        medidas = asyncio.run(_gerar_carga_embutida(args))
+    else:
+        medidas = asyncio.run(
+            gerar_carga(args.host, args.porta, args.conexoes, args.pedidos, args.em_voo)
+        )
+    print(
+        f"{medidas['pedidos']:.0f} cotações em {medidas['segundos']:.2f}s "
+        f"({medidas['cotacoes_por_segundo']:.0f}/s) | p50 {medidas['p50_ms']:.2f} ms | "
+        f"p99 {medidas['p99_ms']:.2f} ms | máx {medidas['max_ms']:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
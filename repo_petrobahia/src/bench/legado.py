@@ -0,0 +1,57 @@
+"""
+Carrega o código legado de ``src/legacy/``, que foi mantido como docstring
+(comentado) para comparação, e o executa em um namespace isolado, para que
+a lógica original de referência possa ser medida e comparada.
+"""
+import os
+import textwrap
+import warnings
+from types import SimpleNamespace
+from typing import Any, Dict
+
+PASTA_SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASTA_LEGADO = os.path.join(PASTA_SRC, "legacy")
+
+
+def _silencio(*_args: Any, **_kwargs: Any) -> None:
+    """Substitui o print do código legado, para não medir nem poluir a saída."""
+
+
+def _executar(arquivo_legado: str, namespace: Dict[str, Any]) -> None:
+    """Executa o código guardado na docstring do módulo legado dentro do namespace."""
+    caminho = os.path.join(PASTA_LEGADO, arquivo_legado)
+    # Lê o texto cru do arquivo: em __doc__ os escapes (ex.: "\n") já viriam interpretados.
+    with open(caminho, "r", encoding="utf-8") as arquivo:
+        fonte = arquivo.read()
+    docstring = fonte[fonte.index('"""') + 3 : fonte.rindex('"""')]
+    linhas = docstring.splitlines()[1:]  # a 1ª linha é o comentário "Código antigo..."
+    codigo = "\n".join(
+        linha for linha in linhas if not linha.strip().startswith("from legacy.")
+    )
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", SyntaxWarning)
+        warnings.simplefilter("ignore", DeprecationWarning)
+        exec(  # pylint: disable=W0122
+            compile(textwrap.dedent(codigo), caminho, "exec"), namespace
+        )
+
+
+def carregar_legado(silencioso: bool = True) -> SimpleNamespace:
+    """
+    Retorna as funções legadas ``calcular_preco``, ``processar_pedido`` e
+    ``cadastrar_cliente``. Com ``silencioso``, os prints delas são descartados.
+    """
+    base: Dict[str, Any] = {"print": _silencio} if silencioso else {}
+
+    ns_preco = dict(base)
+    _executar("preco_calculadora.py", ns_preco)
+    ns_pedido = dict(base, calcular_preco=ns_preco["calcular_preco"])
+    _executar("pedido_service.py", ns_pedido)
+    ns_clientes = dict(base)
+    _executar("clientes.py", ns_clientes)
+
+    return SimpleNamespace(
+        calcular_preco=ns_preco["calcular_preco"],
+        processar_pedido=ns_pedido["processar_pedido"],
+        cadastrar_cliente=ns_clientes["cadastrar_cliente"],
+    )
@@ -3,12 +3,266 @@ Ponto de entrada principal para o processamento de pedidos e clientes
 da PetroBahia. Orquestra os serviços e exibe o resultado final.
 """
 # isort: organiza as importações em ordem alfabética e por tipo
+import argparse
+import os
+import sys
+from decimal import Decimal
+from typing import List, Optional, Union
+
+from refatorado.agregacao import Agregador
+from refatorado.cache_precos import CachePrecos
 from refatorado.cliente_service import ClienteService
+from refatorado.indice_clientes import IndiceClientes
+from refatorado.ingestao_pedidos import (
+    FORMATOS,
+    TAMANHO_LOTE_PADRAO,
+    abrir_entrada,
+    abrir_entrada_posicionada,
+    detectar_formato,
+    ler_pedidos,
+    processar_fluxo,
+)
 from refatorado.pedido_service import PedidoService
+from refatorado.ponto_controle import (
+    INTERVALO_PADRAO,
+    PontoControle,
+    PontosControle,
+    abrir_saida_retomada,
+    carregar_ponto_controle,
+)
+from refatorado.regras_precos import adicionar_argumentos_regras, criar_publicador
+from refatorado.saida_colunar import FORMATO_ARROW, FORMATO_PBCOL, EscritorColunar
+
+
+def _criar_parser() -> argparse.ArgumentParser:
+    """Define os argumentos de linha de comando do processamento."""
+    parser = argparse.ArgumentParser(description="Processamento de pedidos PetroBahia.")
+    parser.add_argument(
+        "--entrada",
+        help="Arquivo de pedidos (JSONL ou CSV) a processar em fluxo; use '-' para stdin.",
+    )
+    parser.add_argument(
+        "--formato",
+        choices=FORMATOS,
+        help="Formato da entrada (padrão: deduzido pela extensão).",
+    )
+    parser.add_argument(
+        "--saida",
+        default="-",
+        help="Arquivo JSONL para os pedidos precificados (padrão: stdout).",
+    )
+    parser.add_argument(
+        "--tamanho-lote",
+        type=int,
+        default=TAMANHO_LOTE_PADRAO,
+        help=f"Pedidos precificados por lote (padrão: {TAMANHO_LOTE_PADRAO}).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processos usados para precificar os lotes em paralelo (padrão: 1).",
+    )
+    parser.add_argument(
+        "--exato",
+        action="store_true",
+        help="Calcula em decimal e soma o TOTAL em centavos inteiros (sem deriva de float).",
+    )
+    parser.add_argument(
+        "--cache",
+        type=int,
+        default=0,
+        metavar="CAPACIDADE",
+        help="Memoriza até CAPACIDADE preços de linhas repetidas (padrão: 0, desligado).",
+    )
+    parser.add_argument(
+        "--agregados",
+        metavar="ARQUIVO",
+        help=(
+            "Arquivo JSON com os totais por cliente, produto e cupom; se existir, "
+            "os pedidos desta execução são somados aos totais já salvos."
+        ),
+    )
+    parser.add_argument(
+        "--saida-colunar",
+        metavar="ARQUIVO",
+        help="Grava também os pedidos precificados, com base e descontos, em formato colunar.",
+    )
+    parser.add_argument(
+        "--formato-colunar",
+        choices=(FORMATO_ARROW, FORMATO_PBCOL),
+        help="Formato da saída colunar (padrão: arrow com pyarrow instalado, senão pbcol).",
+    )
+    adicionar_argumentos_regras(
+        parser,
+        "Arquivo JSON de tarifas e cupons; se mudar durante a execução, vale a partir "
+        "do próximo lote e cada pedido registra a versao_regras usada.",
+    )
+    parser.add_argument(
+        "--clientes",
+        metavar="ARQUIVO",
+        help=(
+            "Arquivo de clientes cadastrados (clientes.txt); pedidos de clientes fora dele "
+            "são recusados antes da precificação e os demais recebem cnpj e email."
+        ),
+    )
+    parser.add_argument(
+        "--clientes-compacto",
+        action="store_true",
+        help="Índice compacto de clientes (hash, offset e filtro de Bloom), para bases enormes.",
+    )
+    parser.add_argument(
+        "--clientes-validos",
+        action="store_true",
+        help="Considera cadastrados só os clientes com email e CNPJ válidos.",
+    )
+    parser.add_argument(
+        "--ponto-controle",
+        metavar="ARQUIVO",
+        help=(
+            "Grava periodicamente a posição da entrada, o TOTAL e os agregados, para "
+            "retomar a execução com --retomar; o arquivo é removido ao final."
+        ),
+    )
+    parser.add_argument(
+        "--ponto-controle-a-cada",
+        type=int,
+        default=INTERVALO_PADRAO,
+        metavar="LOTES",
+        help=f"Lotes entre pontos de controle (padrão: {INTERVALO_PADRAO}).",
+    )
+    parser.add_argument(
+        "--retomar",
+        "--resume",
+        action="store_true",
+        help="Continua do último ponto de controle, sem repetir pedidos na saída.",
+    )
+    return parser
+
+
+def _validar_ponto_controle(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """Confere as combinações de opções que os pontos de controle exigem."""
+    if args.retomar and not args.ponto_controle:
+        parser.error("--retomar exige --ponto-controle.")
+    if args.ponto_controle:
+        if args.entrada == "-" or args.saida == "-":
+            parser.error("--ponto-controle exige arquivos em --entrada e --saida.")
+        if args.saida_colunar:
+            parser.error("--ponto-controle não pode ser usado com --saida-colunar.")
+
+
+def _criar_servico(args: argparse.Namespace) -> PedidoService:
+    """Cria o serviço de pedidos com o cache e as regras pedidos na linha de comando."""
+    regras = criar_publicador(args)
+    clientes = None
+    if args.clientes:
+        clientes = IndiceClientes(
+            args.clientes,
+            compacto=args.clientes_compacto,
+            somente_validos=args.clientes_validos,
+        )
+    return PedidoService(
+        cache=CachePrecos(args.cache) if args.cache > 0 else None,
+        regras=regras,
+        clientes=clientes,
+    )
+
+
+def processar_arquivo(args: argparse.Namespace) -> Union[float, Decimal]:
+    """Processa em fluxo os pedidos do arquivo informado e retorna o TOTAL."""
+    formato = args.formato or detectar_formato(args.entrada)
+    pedido_service = _criar_servico(args)
+    try:
+        if args.ponto_controle:
+            return _processar_com_pontos_controle(args, formato, pedido_service)
+        return _processar_fluxo_completo(args, formato, pedido_service)
+    finally:
+        # Encerra a vigia do arquivo de regras, mesmo se o processamento falhar.
+        if pedido_service.regras is not None:
+            pedido_service.regras.parar()
+
+
+def _processar_fluxo_completo(
+    args: argparse.Namespace, formato: str, pedido_service: PedidoService
+) -> Union[float, Decimal]:
+    """Processa a entrada inteira, sem pontos de controle."""
+    agregador = None
+    if args.agregados:
+        existe = os.path.exists(args.agregados)
+        agregador = Agregador.carregar(args.agregados) if existe else Agregador()
 
+    colunar = None
+    if args.saida_colunar:
+        colunar = EscritorColunar(args.saida_colunar, args.formato_colunar)
 
-def main():
-    """Orquestra o cadastro de clientes e o processamento de pedidos."""
+    try:
+        with abrir_entrada(args.entrada) as entrada:
+            pedidos = ler_pedidos(entrada, formato)
+            opcoes = (args.tamanho_lote, args.workers, args.exato, agregador, colunar)
+            if args.saida == "-":
+                total = processar_fluxo(pedidos, pedido_service, sys.stdout, *opcoes)
+            else:
+                with open(args.saida, "w", encoding="utf-8") as saida:
+                    total = processar_fluxo(pedidos, pedido_service, saida, *opcoes)
+    finally:
+        if colunar is not None:
+            colunar.fechar()
+
+    if agregador is not None:
+        agregador.salvar(args.agregados)
+    return total
+
+
+def _processar_com_pontos_controle(
+    args: argparse.Namespace, formato: str, pedido_service: PedidoService
+) -> Union[float, Decimal]:
+    """
+    Versão de ``processar_arquivo`` com pontos de controle: na retomada, a
+    entrada continua da posição salva, a saída é truncada para o tamanho
+    registrado e o TOTAL e os agregados partem dos valores do ponto de controle.
+    """
+    anterior = carregar_ponto_controle(args.ponto_controle) if args.retomar else None
+    if anterior is None:
+        inicial = PontoControle(args.entrada, args.exato)
+        agregador = None
+        if args.agregados:
+            existe = os.path.exists(args.agregados)
+            agregador = Agregador.carregar(args.agregados) if existe else Agregador()
+        saida = open(args.saida, "w", encoding="utf-8")  # pylint: disable=consider-using-with
+    else:
+        anterior.validar_retomada(args.entrada, args.exato, bool(args.agregados))
+        inicial = anterior
+        agregador = Agregador.de_dict(anterior.agregados) if args.agregados else None
+        saida = abrir_saida_retomada(args.saida, anterior.saida_bytes)
+        print(
+            f"Retomando após {anterior.pedidos} pedidos já precificados.", file=sys.stderr
+        )
+
+    with saida, abrir_entrada_posicionada(
+        args.entrada, inicial.posicao, cabecalho=formato == "csv"
+    ) as entrada:
+        pontos = PontosControle(
+            args.ponto_controle, entrada, inicial, args.ponto_controle_a_cada
+        )
+        total = processar_fluxo(
+            ler_pedidos(entrada, formato),
+            pedido_service,
+            saida,
+            args.tamanho_lote,
+            args.workers,
+            args.exato,
+            agregador,
+            pontos=pontos,
+        )
+
+    if agregador is not None:
+        agregador.salvar(args.agregados)
+    pontos.encerrar()
+    return total
+
+
+def processar_exemplo():
+    """Orquestra o cadastro de clientes e o processamento de pedidos de exemplo."""
     pedidos = [
         {"cliente": "TransLog", "produto": "diesel", "qtd": 1200, "cupom": "MEGA10"},
         {"cliente": "MoveMais", "produto": "gasolina", "qtd": 300, "cupom": None},
@@ -35,12 +289,29 @@ def main():
         else:
             print(f"Cliente com problema: {cliente}")
 
-    # Processamento de Pedidos
-    valores = [pedido_service.processar_pedido(pedido) for pedido in pedidos]
+    # Processamento de Pedidos (em lote, com uma única linha de resumo)
+    resultado = pedido_service.processar_pedidos(pedidos)
 
-    print(f"TOTAL = {sum(valores):.2f}")
+    print(f"TOTAL = {resultado.total:.2f}")
     print("==== Fim do processamento PetroBahia ====")
 
 
+def main(argv: Optional[List[str]] = None):
+    """Processa o arquivo de pedidos informado ou, sem argumentos, o exemplo embutido."""
+    parser = _criar_parser()
+    args = parser.parse_args(argv)
+    if not args.entrada:
+        processar_exemplo()
+        return
+
+    _validar_ponto_controle(parser, args)
+    try:
+        total = processar_arquivo(args)
+    except ValueError as erro:
+        sys.exit(f"[ERRO] {erro}")
+    # Com a saída em stdout, o TOTAL vai para stderr para não misturar com o JSONL.
+    print(f"TOTAL = {total:.2f}", file=sys.stderr if args.saida == "-" else sys.stdout)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,181 @@
+"""Módulo de agregação incremental: totais por cliente, produto e cupom, em centavos."""
+import json
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Union
+
+from refatorado.gravacao_atomica import gravar_atomicamente
+from refatorado.pedido import EntradaPedido, LotePedidos, como_pedido
+from refatorado.pedido_service import (
+    STATUS_OK,
+    PedidoService,
+    ResultadoLote,
+    ResultadoLoteCentavos,
+)
+
+Chave = Optional[str]
+
+DIMENSOES = ("cliente", "produto", "cupom")
+
+# Posições dos acumuladores de cada chave.
+_PEDIDOS, _QUANTIDADE, _DESCONTO, _TOTAL = range(4)
+
+
+class Totais(NamedTuple):
+    """Totais acumulados de uma chave (cliente, produto ou cupom)."""
+
+    pedidos: int
+    quantidade: int
+    desconto_centavos: int
+    total_centavos: int
+
+
+class Agregador:
+    """
+    Mantém, incrementalmente, pedidos, quantidade, desconto de cupom e valor
+    total (em centavos inteiros) por cliente, produto e cupom. Só entram os
+    pedidos com status OK; os demais são contados por status em ``rejeitados``.
+
+    O estado é só dados: dois agregadores podem ser mesclados (ex.: um por
+    processo ou por dia) e o estado pode ser salvo e recarregado, para somar
+    apenas os pedidos novos a um relatório já existente.
+    """
+
+    def __init__(self) -> None:
+        self._totais: Dict[str, Dict[Chave, List[int]]] = {
+            dimensao: {} for dimensao in DIMENSOES
+        }
+        self.rejeitados: Counter = Counter()
+
+    def __eq__(self, outro: object) -> bool:
+        if not isinstance(outro, Agregador):
+            return NotImplemented
+        return self._totais == outro._totais and self.rejeitados == outro.rejeitados
+
+    def registrar(
+        self,
+        cliente: Chave,
+        produto: str,
+        cupom: Chave,
+        quantidade: int,
+        total_centavos: int,
+        desconto_centavos: int = 0,
+    ) -> None:
+        """Soma um pedido precificado às três dimensões."""
+        for dimensao, chave in zip(DIMENSOES, (cliente, produto, cupom)):
+            acumulado = self._totais[dimensao].get(chave)
+            if acumulado is None:
+                acumulado = self._totais[dimensao][chave] = [0, 0, 0, 0]
+            acumulado[_PEDIDOS] += 1
+            acumulado[_QUANTIDADE] += quantidade
+            acumulado[_DESCONTO] += desconto_centavos
+            acumulado[_TOTAL] += total_centavos
+
+    def adicionar_lote(
+        self,
+        lote: Union[List[EntradaPedido], LotePedidos],
+        resultado: Union[ResultadoLote, ResultadoLoteCentavos],
+        service: PedidoService,
+    ) -> None:
+        """
+        Soma um lote já precificado por ``service``. O desconto de cada pedido
+        com cupom é o preço sem cupom menos o valor final, ambos em centavos.
+        """
+        # Mesmo instantâneo de regras usado para precificar o lote.
+        service = service.fixar(resultado.versao_regras)
+        exato = isinstance(resultado, ResultadoLoteCentavos)
+        validos = [i for i, situacao in enumerate(resultado.status) if situacao == STATUS_OK]
+        self.rejeitados.update(s for s in resultado.status if s != STATUS_OK)
+
+        pedidos = {indice: como_pedido(lote[indice]) for indice in validos}
+        com_cupom = [i for i in validos if pedidos[i].cupom]
+        descontos: Dict[int, int] = {}
+        if com_cupom:
+            brutos = service.precos_sem_cupom_centavos(
+                [pedidos[i].produto for i in com_cupom],
+                [pedidos[i].qtd for i in com_cupom],
+                exato,
+            )
+            for indice, bruto in zip(com_cupom, brutos):
+                descontos[indice] = bruto - _em_centavos(resultado.valores[indice], exato)
+
+        for indice, pedido in pedidos.items():
+            self.registrar(
+                pedido.cliente,
+                pedido.produto,
+                pedido.cupom,
+                pedido.qtd,
+                _em_centavos(resultado.valores[indice], exato),
+                descontos.get(indice, 0),
+            )
+
+    def mesclar(self, outro: "Agregador") -> "Agregador":
+        """Soma ao agregador o estado de outro (ex.: de outro processo) e o retorna."""
+        for dimensao, totais in outro._totais.items():  # pylint: disable=protected-access
+            destino = self._totais[dimensao]
+            for chave, valores in totais.items():
+                acumulado = destino.get(chave)
+                if acumulado is None:
+                    destino[chave] = list(valores)
+                else:
+                    for posicao, valor in enumerate(valores):
+                        acumulado[posicao] += valor
+        self.rejeitados.update(outro.rejeitados)
+        return self
+
+    def totais(self, dimensao: str) -> Dict[Chave, Totais]:
+        """Totais por chave de uma dimensão ("cliente", "produto" ou "cupom")."""
+        if dimensao not in self._totais:
+            raise ValueError(f"Dimensão desconhecida: {dimensao!r}")
+        return {chave: Totais(*valores) for chave, valores in self._totais[dimensao].items()}
+
+    @property
+    def total_centavos(self) -> int:
+        """Valor total de todos os pedidos agregados, em centavos."""
+        return sum(valores[_TOTAL] for valores in self._totais["produto"].values())
+
+    def para_dict(self) -> Dict[str, Any]:
+        """
+        Estado serializável em JSON. Cada dimensão é uma lista de linhas
+        ``[chave, pedidos, quantidade, desconto_centavos, total_centavos]``,
+        pois a chave pode ser nula (ex.: pedidos sem cupom).
+        """
+        estado: Dict[str, Any] = {
+            dimensao: [[chave, *valores] for chave, valores in totais.items()]
+            for dimensao, totais in self._totais.items()
+        }
+        estado["rejeitados"] = dict(self.rejeitados)
+        return estado
+
+    @classmethod
+    def de_dict(cls, estado: Mapping[str, Any]) -> "Agregador":
+        """Recria o agregador a partir do estado gerado por ``para_dict``."""
+        agregador = cls()
+        for dimensao in DIMENSOES:
+            agregador._totais[dimensao] = {  # pylint: disable=protected-access
+                chave: list(valores) for chave, *valores in estado.get(dimensao, ())
+            }
+        agregador.rejeitados.update(estado.get("rejeitados", {}))
+        return agregador
+
+    def salvar(self, caminho: str) -> None:
+        """Grava o estado em JSON de forma atômica (um checkpoint nunca fica pela metade)."""
+        gravar_atomicamente(caminho, json.dumps(self.para_dict(), ensure_ascii=False))
+
+    @classmethod
+    def carregar(cls, caminho: str) -> "Agregador":
+        """Carrega o estado salvo por ``salvar``."""
+        with open(caminho, "r", encoding="utf-8") as arquivo:
+            return cls.de_dict(json.load(arquivo))
+
+
+def mesclar_todos(agregadores: Iterable[Agregador]) -> Agregador:
+    """Mescla vários agregadores parciais em um novo agregador."""
+    resultado = Agregador()
+    for agregador in agregadores:
+        resultado.mesclar(agregador)
+    return resultado
+
+
+def _em_centavos(valor: Union[float, int], exato: bool) -> int:
+    """Converte o valor final de um pedido para centavos (no modo exato ele já está)."""
+    return valor if exato else round(valor * 100)
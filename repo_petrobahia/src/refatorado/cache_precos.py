@@ -0,0 +1,77 @@
+"""Módulo do cache de preços: memoização LRU de linhas repetidas (produto, qtd, cupom)."""
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple, Union
+
+ChavePreco = Tuple[str, int, Optional[str]]
+
+CAPACIDADE_PADRAO = 100_000
+
+
+class CachePrecos:
+    """
+    Cache LRU de preços finais por ``(produto, qtd, cupom)``, com capacidade
+    limitada. Cada consulta informa a versão das regras em vigor (tabela de
+    tarifas e cupons); quando ela muda, o cache é esvaziado antes de responder,
+    de modo que nunca devolve um preço calculado com regras antigas.
+    """
+
+    def __init__(self, capacidade: int = CAPACIDADE_PADRAO) -> None:
+        if capacidade <= 0:
+            raise ValueError("capacidade deve ser positiva.")
+        self.capacidade = capacidade
+        self._itens: "OrderedDict[ChavePreco, float]" = OrderedDict()
+        self._versao: Optional[Hashable] = None
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+        self.invalidacoes = 0
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+    def obter(self, chave: ChavePreco, versao: Hashable) -> Optional[float]:
+        """Retorna o preço em cache para a chave, ou None se ausente."""
+        if versao != self._versao:
+            self._invalidar(versao)
+        valor = self._itens.get(chave)
+        if valor is None:
+            self.falhas += 1
+            return None
+        self._itens.move_to_end(chave)
+        self.acertos += 1
+        return valor
+
+    def guardar(self, chave: ChavePreco, valor: float, versao: Hashable) -> None:
+        """Guarda o preço da chave, descartando o item menos usado se o cache estiver cheio."""
+        if versao != self._versao:
+            self._invalidar(versao)
+        itens = self._itens
+        itens[chave] = valor
+        itens.move_to_end(chave)
+        if len(itens) > self.capacidade:
+            itens.popitem(last=False)
+            self.descartes += 1
+
+    def limpar(self) -> None:
+        """Esvazia o cache (as estatísticas são mantidas)."""
+        self._itens.clear()
+
+    def estatisticas(self) -> Dict[str, Union[int, float]]:
+        """Resumo de uso do cache: acertos, falhas, taxa de acerto, descartes e tamanho."""
+        consultas = self.acertos + self.falhas
+        return {
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+            "descartes": self.descartes,
+            "invalidacoes": self.invalidacoes,
+            "tamanho": len(self._itens),
+            "capacidade": self.capacidade,
+        }
+
+    def _invalidar(self, versao: Hashable) -> None:
+        """Troca a versão das regras em vigor e descarta os preços antigos."""
+        if self._itens:
+            self.invalidacoes += 1
+            self._itens.clear()
+        self._versao = versao
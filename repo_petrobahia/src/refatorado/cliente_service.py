@@ -1,6 +1,21 @@
 """Módulo de serviço para gerenciamento e cadastro de clientes."""
 import re
-from typing import Dict
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from refatorado.escritor_clientes import EscritorClientes
+from refatorado.notificacoes import FilaNotificacoes, MensagemBoasVindas
+from refatorado.repositorio_clientes import POLITICA_REJEITAR, RepositorioClientes
+from refatorado.trava_arquivo import anexar_com_trava
+
+CAMPOS_OBRIGATORIOS = ("nome", "email", "cnpj")
+
+
+def dados_completos(cliente: Mapping[str, object]) -> bool:
+    """
+    Indica se os campos obrigatórios estão preenchidos: um campo ausente ou
+    None conta como faltante. Regra única do cadastro e da validação em lote.
+    """
+    return all(cliente.get(campo) is not None for campo in CAMPOS_OBRIGATORIOS)
 
 
 # pylint: disable=R0903
@@ -13,8 +28,25 @@ class ClienteService:
     # Pylint: o 'r' no início da string de regex garante que a string é tratada como raw (bruta).
     REGEX_EMAIL = re.compile(r"^[^\s@]+@[^\s@]+\.[^\s@]+$")
 
-    def __init__(self, arquivo_clientes: str = "clientes.txt") -> None:
+    def __init__(
+        self,
+        arquivo_clientes: str = "clientes.txt",
+        repositorio: Optional[RepositorioClientes] = None,
+        politica_duplicados: str = POLITICA_REJEITAR,
+        notificador: Optional[FilaNotificacoes] = None,
+        escrita_concorrente: bool = False,
+    ) -> None:
         self.arquivo_clientes = arquivo_clientes
+        # Com um repositório, os clientes são indexados por CNPJ em vez de
+        # anexados ao arquivo de texto, e duplicados seguem a política informada.
+        self.repositorio = repositorio
+        self.politica_duplicados = politica_duplicados
+        # Com um notificador, o email de boas-vindas é enfileirado e enviado em
+        # segundo plano; o cadastro retorna assim que o registro está gravado.
+        self.notificador = notificador
+        # Com escrita concorrente, cada gravação no arquivo de texto é feita sob
+        # trava exclusiva, e vários processos podem cadastrar no mesmo arquivo.
+        self.escrita_concorrente = escrita_concorrente
 
     def cadastrar_cliente(self, cliente: Dict[str, str]) -> bool:
         """Valida e cadastra um cliente no arquivo, e simula envio de email."""
@@ -26,19 +58,130 @@ class ClienteService:
             # Lógica de negócio: aceitar email inválido com aviso
             print(f"Email inválido ({cliente['email']}) — aceito mesmo assim.")
 
-        self._salvar_cliente(cliente)
-        print(f"Enviando email de boas-vindas para {cliente['email']}")
+        if not self._salvar_cliente(cliente):
+            print(f"Cliente com CNPJ {cliente['cnpj']} já cadastrado. Cadastro não realizado.")
+            return False
+
+        self._enviar_boas_vindas(cliente)
         return True
 
+    def cadastrar_clientes(
+        self,
+        clientes: Iterable[Dict[str, str]],
+        tamanho_flush: int = 1000,
+        intervalo_flush: float = 1.0,
+    ) -> List[bool]:
+        """
+        Cadastra clientes em lote com as mesmas regras de ``cadastrar_cliente``.
+        No arquivo de texto, cada cliente válido segue direto para um escritor
+        em buffer, sem guardar o lote em memória; no repositório, o lote é
+        gravado em uma única transação, que também filtra duplicados. Em vez de
+        uma mensagem por cliente, imprime um resumo ao final. Retorna, para
+        cada cliente, se ele foi cadastrado.
+        """
+        resultados: List[bool] = []
+        emails_invalidos = 0
+        duplicados = 0
+        validos = self._clientes_validos(clientes, resultados)
+        for indice, cliente, gravado in self._gravar_em_fluxo(
+            validos, tamanho_flush, intervalo_flush
+        ):
+            if not self._email_valido(cliente["email"]):
+                emails_invalidos += 1
+            if not gravado:
+                resultados[indice] = False
+                duplicados += 1
+            elif self.notificador is not None:
+                self.notificador.enviar(MensagemBoasVindas(cliente["email"], cliente["nome"]))
+
+        cadastrados = sum(resultados)
+        print(
+            f"{cadastrados} clientes cadastrados, "
+            f"{len(resultados) - cadastrados - duplicados} com dados incompletos, "
+            f"{duplicados} duplicados, "
+            f"{emails_invalidos} com email inválido (aceitos)."
+        )
+        if self.notificador is None:
+            print(f"Enviando email de boas-vindas para {cadastrados} clientes")
+        return resultados
+
+    def buscar_cliente(self, cnpj: str) -> Optional[Dict[str, str]]:
+        """Busca um cliente pelo CNPJ no repositório (requer repositório configurado)."""
+        if self.repositorio is None:
+            raise RuntimeError("Busca por CNPJ requer um RepositorioClientes.")
+        return self.repositorio.buscar(cnpj)
+
+    def escritor(self, tamanho_flush: int = 1000, intervalo_flush: float = 1.0) -> EscritorClientes:
+        """Abre um escritor em buffer de longa duração para o arquivo de clientes."""
+        return EscritorClientes(
+            self.arquivo_clientes,
+            tamanho_flush,
+            intervalo_flush,
+            travar=self.escrita_concorrente,
+        )
+
+    def _enviar_boas_vindas(self, cliente: Dict[str, str]) -> None:
+        """Enfileira o email de boas-vindas, ou apenas o simula sem notificador."""
+        if self.notificador is not None:
+            self.notificador.enviar(MensagemBoasVindas(cliente["email"], cliente["nome"]))
+            return
+        print(f"Enviando email de boas-vindas para {cliente['email']}")
+
     def _dados_validos(self, cliente: Dict[str, str]) -> bool:
-        """Verifica se os campos obrigatórios ('nome', 'email', 'cnpj') estão presentes."""
-        return all(campo in cliente for campo in ("nome", "email", "cnpj"))
+        """Verifica se os campos obrigatórios ('nome', 'email', 'cnpj') estão preenchidos."""
+        return dados_completos(cliente)
 
     def _email_valido(self, email: str) -> bool:
         """Valida o formato básico do email (usa regex para garantir um '@' e um '.')."""
-        return bool(self.REGEX_EMAIL.match(email))
+        return isinstance(email, str) and bool(self.REGEX_EMAIL.match(email))
 
-    def _salvar_cliente(self, cliente: Dict[str, str]) -> None:
-        """Registra o cliente no arquivo de texto 'clientes.txt' no modo append."""
+    def _salvar_cliente(self, cliente: Dict[str, str]) -> bool:
+        """
+        Registra o cliente no repositório, se houver, ou no arquivo de texto
+        'clientes.txt' no modo append. Retorna False se for um duplicado rejeitado.
+        """
+        if self.repositorio is not None:
+            return self.repositorio.salvar(cliente, self.politica_duplicados)
+        if self.escrita_concorrente:
+            anexar_com_trava(self.arquivo_clientes, str(cliente) + "\n")
+            return True
         with open(self.arquivo_clientes, "a", encoding="utf-8") as arquivo:
-            arquivo.write(str(cliente) + "\n")
\ No newline at end of file
+            arquivo.write(str(cliente) + "\n")
+        return True
+
+    def _clientes_validos(
+        self, clientes: Iterable[Dict[str, str]], resultados: List[bool]
+    ) -> Iterator[Tuple[int, Dict[str, str]]]:
+        """
+        Gera os clientes com os campos obrigatórios e a posição de cada um,
+        anotando em ``resultados`` se cada cliente da entrada é válido.
+        """
+        for cliente in clientes:
+            valido = self._dados_validos(cliente)
+            resultados.append(valido)
+            if valido:
+                yield len(resultados) - 1, cliente
+
+    def _gravar_em_fluxo(
+        self,
+        validos: Iterable[Tuple[int, Dict[str, str]]],
+        tamanho_flush: int,
+        intervalo_flush: float,
+    ) -> Iterator[Tuple[int, Dict[str, str], bool]]:
+        """
+        Versão em lote de ``_salvar_cliente``: gera cada cliente com sua
+        posição e se foi gravado. No repositório, é uma única transação; no
+        arquivo, um escritor em buffer que recebe um cliente por vez.
+        """
+        if self.repositorio is not None:
+            lote = list(validos)
+            gravados = self.repositorio.salvar_lote(
+                [cliente for _, cliente in lote], self.politica_duplicados
+            )
+            for (indice, cliente), gravado in zip(lote, gravados):
+                yield indice, cliente, gravado
+            return
+        with self.escritor(tamanho_flush, intervalo_flush) as escritor:
+            for indice, cliente in validos:
+                escritor.escrever(cliente)
+                yield indice, cliente, True
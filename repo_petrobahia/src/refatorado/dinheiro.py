@@ -0,0 +1,39 @@
+"""Módulo de aritmética monetária exata: ``decimal`` com contexto compartilhado e centavos."""
+from decimal import ROUND_DOWN, ROUND_HALF_EVEN, Context, Decimal
+
+# Contexto único para todo o cálculo exato. ROUND_HALF_EVEN é a mesma regra do round() do Python.
+CONTEXTO = Context(prec=28, rounding=ROUND_HALF_EVEN)
+
+CENTAVO = Decimal("0.01")
+UNIDADE = Decimal("1")
+ZERO = Decimal("0")
+
+
+def para_decimal(valor: float) -> Decimal:
+    """Converte um valor de configuração (float) para o decimal que ele representa, ex.: 3.99."""
+    return Decimal(repr(float(valor)))
+
+
+def para_centavos(valor: Decimal, arredondamento: str = ROUND_HALF_EVEN) -> int:
+    """Arredonda o valor para centavos e retorna a quantidade inteira de centavos."""
+    return int(valor.quantize(CENTAVO, rounding=arredondamento, context=CONTEXTO).scaleb(2))
+
+
+def para_reais_inteiros(valor: Decimal) -> int:
+    """Arredonda o valor para reais inteiros (meio para o par) e retorna em centavos."""
+    return int(valor.quantize(UNIDADE, rounding=ROUND_HALF_EVEN, context=CONTEXTO)) * 100
+
+
+def truncar_centavos(valor: Decimal) -> int:
+    """Trunca o valor em centavos (descarta as casas além da segunda)."""
+    return para_centavos(valor, ROUND_DOWN)
+
+
+def de_centavos(centavos: int) -> Decimal:
+    """Converte centavos inteiros em um ``Decimal`` exato em reais."""
+    return Decimal(centavos).scaleb(-2)
+
+
+def formatar_centavos(centavos: int) -> str:
+    """Formata centavos como texto com duas casas, ex.: 580352 -> '5803.52'."""
+    return f"{de_centavos(centavos):.2f}"
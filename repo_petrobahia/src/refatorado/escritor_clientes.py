@@ -0,0 +1,81 @@
+"""Módulo de escrita em buffer de registros de clientes no arquivo de texto."""
+import time
+from types import TracebackType
+from typing import Callable, Dict, List, Optional, Type
+
+from refatorado.trava_arquivo import trava_exclusiva
+
+
+class EscritorClientes:
+    """
+    Escritor de longa duração para o arquivo de clientes. Acumula as linhas
+    em memória e grava em uma única escrita quando o buffer atinge
+    ``tamanho_flush`` registros ou quando ``intervalo_flush`` segundos se
+    passaram desde a última gravação. Usado como context manager, garante o
+    flush final mesmo em caso de erro. Com ``travar``, cada gravação é feita
+    sob trava exclusiva do arquivo, permitindo vários processos escritores.
+    """
+
+    def __init__(
+        self,
+        caminho: str,
+        tamanho_flush: int = 1000,
+        intervalo_flush: float = 1.0,
+        relogio: Callable[[], float] = time.monotonic,
+        travar: bool = False,
+    ) -> None:
+        if tamanho_flush <= 0:
+            raise ValueError("tamanho_flush deve ser positivo.")
+        self.caminho = caminho
+        self.tamanho_flush = tamanho_flush
+        self.intervalo_flush = intervalo_flush
+        self.travar = travar
+        self._relogio = relogio
+        self._buffer: List[str] = []
+        self._ultimo_flush = relogio()
+        self._arquivo = open(caminho, "a", encoding="utf-8")  # pylint: disable=R1732
+
+    def escrever(self, cliente: Dict[str, str]) -> None:
+        """Adiciona o cliente ao buffer, no mesmo formato de ``_salvar_cliente``."""
+        self._buffer.append(str(cliente) + "\n")
+        if (
+            len(self._buffer) >= self.tamanho_flush
+            or self._relogio() - self._ultimo_flush >= self.intervalo_flush
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Grava o buffer no arquivo em uma única escrita."""
+        if self._buffer:
+            if self.travar:
+                with trava_exclusiva(self._arquivo):
+                    self._gravar_buffer()
+            else:
+                self._gravar_buffer()
+        self._ultimo_flush = self._relogio()
+
+    def _gravar_buffer(self) -> None:
+        """Escreve o buffer no arquivo e o esvazia."""
+        self._arquivo.write("".join(self._buffer))
+        self._arquivo.flush()
+        self._buffer.clear()
+
+    def fechar(self) -> None:
+        """Grava o que restou no buffer e fecha o arquivo."""
+        if self._arquivo.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._arquivo.close()
+
+    def __enter__(self) -> "EscritorClientes":
+        return self
+
+    def __exit__(
+        self,
+        tipo: Optional[Type[BaseException]],
+        erro: Optional[BaseException],
+        rastro: Optional[TracebackType],
+    ) -> None:
+        self.fechar()
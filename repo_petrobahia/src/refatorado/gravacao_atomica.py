@@ -0,0 +1,31 @@
+"""Módulo de gravação atômica de arquivos de estado (métricas, agregados, pontos de controle)."""
+import os
+
+
+def gravar_atomicamente(caminho: str, conteudo: str) -> None:
+    """
+    Grava em um arquivo temporário e o renomeia, para leitores nunca verem meio
+    arquivo. O temporário vai para o disco antes da renomeação, e a pasta
+    depois dela, para que uma queda de energia não deixe o arquivo vazio.
+    """
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        arquivo.write(conteudo)
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+    os.replace(temporario, caminho)
+    _sincronizar_pasta(os.path.dirname(os.path.abspath(caminho)))
+
+
+def _sincronizar_pasta(pasta: str) -> None:
+    """Grava no disco a entrada da pasta; onde pastas não podem ser abertas, não faz nada."""
+    try:
+        descritor = os.open(pasta, os.O_RDONLY)
+    except OSError:
+        return  # Windows não abre pastas com os.open
+    try:
+        os.fsync(descritor)
+    except OSError:
+        pass  # sistemas de arquivos que não sincronizam pastas
+    finally:
+        os.close(descritor)
@@ -0,0 +1,277 @@
+"""
+Módulo do índice de clientes cadastrados, para juntar pedidos à base do
+``clientes.txt`` sem consultar o arquivo a cada pedido.
+
+O índice é montado uma única vez com o ``LeitorClientes``. No modo padrão, é
+um dicionário ``nome -> DadosCliente``. No modo ``compacto``, para bases muito
+grandes, guarda só um hash de 64 bits e o offset de cada registro em vetores
+ordenados (16 bytes por cliente), com um filtro de Bloom na frente: nomes
+desconhecidos são recusados pelo filtro, sem busca, e os dados dos clientes
+encontrados são lidos do arquivo mapeado em memória.
+"""
+import math
+from array import array
+from bisect import bisect_left
+from hashlib import blake2b
+from types import TracebackType
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Type
+
+from refatorado.leitor_clientes import CAMPOS_PADRAO, LeitorClientes, Valores
+from refatorado.tabela_tarifas import np
+from refatorado.validacao_clientes import validar_lote
+
+TAXA_FALSOS_POSITIVOS_PADRAO = 0.01
+
+
+class DadosCliente(NamedTuple):
+    """Dados cadastrais anexados a um pedido."""
+
+    nome: str
+    email: Optional[str]
+    cnpj: Optional[str]
+
+
+def _hashes(nome: str) -> Tuple[int, int]:
+    """Dois hashes de 64 bits do nome, estáveis entre processos (ao contrário de ``hash``)."""
+    digest = blake2b(nome.encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+
+
+def _ordenar_por_hash(hashes: array, offsets: array) -> None:
+    """
+    Ordena os dois vetores por hash, no próprio lugar e sem um objeto Python
+    por cliente. Os offsets crescem na ordem do arquivo, então ordenar pelo
+    par (hash, offset) é uma ordenação estável: com nomes repetidos, o
+    primeiro registro fica na frente. Com NumPy, usa ``argsort`` estável;
+    sem ele, um heapsort sobre os próprios vetores.
+    """
+    if np is not None:
+        vetor_hashes = np.frombuffer(hashes, dtype=np.uint64)
+        vetor_offsets = np.frombuffer(offsets, dtype=np.uint64)
+        ordem = np.argsort(vetor_hashes, kind="stable")
+        vetor_hashes[:] = vetor_hashes[ordem]
+        vetor_offsets[:] = vetor_offsets[ordem]
+        return
+
+    def menor(i: int, j: int) -> bool:
+        hash_i, hash_j = hashes[i], hashes[j]
+        return hash_i < hash_j or (hash_i == hash_j and offsets[i] < offsets[j])
+
+    def descer(raiz: int, fim: int) -> None:
+        while True:
+            filho = 2 * raiz + 1
+            if filho >= fim:
+                return
+            if filho + 1 < fim and menor(filho, filho + 1):
+                filho += 1
+            if not menor(raiz, filho):
+                return
+            hashes[raiz], hashes[filho] = hashes[filho], hashes[raiz]
+            offsets[raiz], offsets[filho] = offsets[filho], offsets[raiz]
+            raiz = filho
+
+    total = len(hashes)
+    for raiz in range(total // 2 - 1, -1, -1):
+        descer(raiz, total)
+    for fim in range(total - 1, 0, -1):
+        hashes[0], hashes[fim] = hashes[fim], hashes[0]
+        offsets[0], offsets[fim] = offsets[fim], offsets[0]
+        descer(0, fim)
+
+
+class FiltroBloom:
+    """
+    Filtro de Bloom sobre um ``bytearray``: ``in`` nunca falha para um nome
+    adicionado e erra para um nome ausente com probabilidade próxima de
+    ``taxa_falsos_positivos``. As posições vêm de hashing duplo.
+    """
+
+    def __init__(
+        self, capacidade: int, taxa_falsos_positivos: float = TAXA_FALSOS_POSITIVOS_PADRAO
+    ) -> None:
+        if not 0 < taxa_falsos_positivos < 1:
+            raise ValueError("taxa_falsos_positivos deve estar entre 0 e 1.")
+        capacidade = max(capacidade, 1)
+        # Tamanho e número de funções ótimos para a capacidade e a taxa pedidas.
+        bits = -capacidade * math.log(taxa_falsos_positivos) / math.log(2) ** 2
+        self.bits = max(8, math.ceil(bits))
+        self.funcoes = max(1, round(self.bits / capacidade * math.log(2)))
+        self._mapa = bytearray((self.bits + 7) // 8)
+
+    def adicionar_hashes(self, h1: int, h2: int) -> None:
+        """Marca as posições de um item a partir dos seus dois hashes."""
+        mapa, bits = self._mapa, self.bits
+        for i in range(self.funcoes):
+            posicao = (h1 + i * h2) % bits
+            mapa[posicao >> 3] |= 1 << (posicao & 7)
+
+    def contem_hashes(self, h1: int, h2: int) -> bool:
+        """Indica se o item com esses hashes pode ter sido adicionado."""
+        mapa, bits = self._mapa, self.bits
+        for i in range(self.funcoes):
+            posicao = (h1 + i * h2) % bits
+            if not mapa[posicao >> 3] & (1 << (posicao & 7)):
+                return False
+        return True
+
+    def adicionar(self, nome: str) -> None:
+        """Adiciona o nome ao filtro."""
+        self.adicionar_hashes(*_hashes(nome))
+
+    def __contains__(self, nome: object) -> bool:
+        return isinstance(nome, str) and self.contem_hashes(*_hashes(nome))
+
+    def __len__(self) -> int:
+        """Tamanho do filtro em bytes."""
+        return len(self._mapa)
+
+
+class IndiceClientes:
+    """
+    Índice em memória dos clientes do arquivo, por nome (o campo ``cliente``
+    dos pedidos). Com nomes repetidos, vale o primeiro registro. Com
+    ``somente_validos``, registros com campo ausente, email ou CNPJ inválido
+    ficam de fora, como se não estivessem cadastrados.
+    """
+
+    def __init__(
+        self,
+        caminho: str,
+        compacto: bool = False,
+        taxa_falsos_positivos: float = TAXA_FALSOS_POSITIVOS_PADRAO,
+        somente_validos: bool = False,
+    ) -> None:
+        self.caminho = caminho
+        self.compacto = compacto
+        self.taxa_falsos_positivos = taxa_falsos_positivos
+        self.somente_validos = somente_validos
+        self._dados: Dict[str, DadosCliente] = {}
+        self._hashes = array("Q")
+        self._offsets = array("Q")
+        self._filtro: Optional[FiltroBloom] = None
+        self._leitor: Optional[LeitorClientes] = None
+        self._carregar()
+
+    def _carregar(self) -> None:
+        """Lê o arquivo uma vez e monta o dicionário ou os vetores do modo compacto."""
+        leitor = LeitorClientes(self.caminho)
+        try:
+            if self.compacto:
+                self._montar_compacto(leitor)
+            else:
+                for _, valores in self._registros(leitor, CAMPOS_PADRAO):
+                    self._dados.setdefault(valores[0], DadosCliente(*valores))
+        except BaseException:
+            leitor.fechar()
+            raise
+        if self.compacto:
+            self._leitor = leitor  # mantido aberto para ler os dados sob demanda
+        else:
+            leitor.fechar()
+
+    def _montar_compacto(self, leitor: LeitorClientes) -> None:
+        """
+        Lê os registros direto para os vetores de hash e offset (e para o
+        filtro de Bloom) e os ordena por hash, sem uma tupla por cliente.
+        """
+        # Só o nome é extraído, salvo quando a validação precisa de email e CNPJ.
+        campos = CAMPOS_PADRAO if self.somente_validos else ("nome",)
+        capacidade = sum(1 for _ in leitor.offsets())
+        filtro = FiltroBloom(capacidade, self.taxa_falsos_positivos)
+        hashes = array("Q")
+        offsets = array("Q")
+        for offset, valores in self._registros(leitor, campos):
+            h1, h2 = _hashes(valores[0])
+            filtro.adicionar_hashes(h1, h2)
+            hashes.append(h1)
+            offsets.append(offset)
+        _ordenar_por_hash(hashes, offsets)
+        self._hashes = hashes
+        self._offsets = offsets
+        self._filtro = filtro
+
+    def _registros(
+        self, leitor: LeitorClientes, campos: Tuple[str, ...]
+    ) -> Iterator[Tuple[int, Valores]]:
+        """
+        Registros com nome, na ordem do arquivo; com ``somente_validos``, só os
+        que passam na validação (``campos`` deve então trazer email e CNPJ).
+        """
+        for offset, valores in leitor.registros(campos):
+            if valores[0] is None:
+                continue
+            if self.somente_validos:
+                cliente = {c: v for c, v in zip(campos, valores) if v is not None}
+                if validar_lote((cliente,))[0]:
+                    continue
+            yield offset, valores
+
+    def __getstate__(self):
+        # O mapa de memória não é serializável; o outro processo reabre o arquivo.
+        estado = self.__dict__.copy()
+        estado["_leitor"] = None
+        return estado
+
+    def __setstate__(self, estado) -> None:
+        self.__dict__.update(estado)
+        if self.compacto:
+            self._leitor = LeitorClientes(self.caminho)
+
+    def __len__(self) -> int:
+        return len(self._hashes) if self.compacto else len(self._dados)
+
+    def __contains__(self, nome: object) -> bool:
+        return isinstance(nome, str) and self.buscar(nome) is not None
+
+    def buscar(self, nome: Optional[str]) -> Optional[DadosCliente]:
+        """Dados do cliente com esse nome, ou None se não estiver cadastrado."""
+        if not self.compacto:
+            return self._dados.get(nome)
+        if not nome:
+            return None
+        h1, h2 = _hashes(nome)
+        if not self._filtro.contem_hashes(h1, h2):
+            return None
+        hashes = self._hashes
+        posicao = bisect_left(hashes, h1)
+        # Hashes iguais ficam juntos; o nome é conferido no arquivo (colisões são raríssimas).
+        while posicao < len(hashes) and hashes[posicao] == h1:
+            dados = DadosCliente(*self._leitor.ler_em(self._offsets[posicao], CAMPOS_PADRAO))
+            if dados.nome == nome:
+                return dados
+            posicao += 1
+        return None
+
+    def juntar(self, nomes: Iterable[Optional[str]]) -> List[Optional[DadosCliente]]:
+        """
+        Junta um lote de nomes ao índice: dados de cada cliente, ou None para
+        os desconhecidos. Cada nome distinto é buscado uma única vez por lote.
+        """
+        if not self.compacto:
+            buscar = self._dados.get
+            return [buscar(nome) for nome in nomes]
+        encontrados: Dict[Optional[str], Optional[DadosCliente]] = {}
+        resultado = []
+        for nome in nomes:
+            if nome in encontrados:
+                resultado.append(encontrados[nome])
+            else:
+                resultado.append(encontrados.setdefault(nome, self.buscar(nome)))
+        return resultado
+
+    def fechar(self) -> None:
+        """Libera o arquivo mapeado do modo compacto."""
+        if self._leitor is not None:
+            self._leitor.fechar()
+            self._leitor = None
+
+    def __enter__(self) -> "IndiceClientes":
+        return self
+
+    def __exit__(
+        self,
+        tipo: Optional[Type[BaseException]],
+        erro: Optional[BaseException],
+        rastro: Optional[TracebackType],
+    ) -> None:
+        self.fechar()
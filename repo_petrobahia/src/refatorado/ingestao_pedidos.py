@@ -0,0 +1,288 @@
+"""Módulo de ingestão em fluxo (streaming) de pedidos a partir de arquivos JSONL ou CSV."""
+import csv
+import json
+import sys
+from contextlib import contextmanager
+from decimal import Decimal
+from itertools import islice
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+from refatorado.agregacao import Agregador
+from refatorado.dinheiro import de_centavos
+from refatorado.pedido import PedidoDict
+from refatorado.pedido_service import PedidoService, ResultadoLote, ResultadoLoteCentavos
+from refatorado.ponto_controle import PontosControle
+from refatorado.processamento_paralelo import precificar_em_paralelo_fixados
+from refatorado.saida_colunar import EscritorColunar
+
+FORMATOS = ("jsonl", "csv")
+TAMANHO_LOTE_PADRAO = 10_000
+
+
+def detectar_formato(caminho: str) -> str:
+    """Deduz o formato pela extensão do arquivo (stdin é tratado como JSONL)."""
+    return "csv" if caminho.lower().endswith(".csv") else "jsonl"
+
+
+@contextmanager
+def abrir_entrada(caminho: str) -> Iterator[TextIO]:
+    """Abre o arquivo de entrada, ou usa a entrada padrão quando o caminho for '-'."""
+    if caminho == "-":
+        yield sys.stdin
+        return
+    with open(caminho, "r", encoding="utf-8", newline="") as arquivo:
+        yield arquivo
+
+
+class EntradaPosicionada:
+    """
+    Linhas de um arquivo aberto em modo binário, decodificadas em UTF-8, com
+    a ``posicao`` (em bytes) logo após a última linha lida. Pode começar de
+    uma posição salva; com ``cabecalho``, a primeira linha do arquivo (o
+    cabeçalho do CSV) é repetida antes de continuar.
+    """
+
+    def __init__(self, arquivo: BinaryIO, posicao: int = 0, cabecalho: bool = False) -> None:
+        self._arquivo = arquivo
+        self.posicao = posicao
+        self._cabecalho = cabecalho
+
+    def __iter__(self) -> Iterator[str]:
+        arquivo = self._arquivo
+        posicao = self.posicao
+        if posicao and self._cabecalho:
+            arquivo.seek(0)
+            yield arquivo.readline().decode("utf-8")
+        arquivo.seek(posicao)
+        for linha in arquivo:
+            posicao += len(linha)
+            self.posicao = posicao
+            yield linha.decode("utf-8")
+
+
+@contextmanager
+def abrir_entrada_posicionada(
+    caminho: str, posicao: int = 0, cabecalho: bool = False
+) -> Iterator[EntradaPosicionada]:
+    """Abre o arquivo de entrada a partir de ``posicao`` (não vale para stdin)."""
+    if caminho == "-":
+        raise ValueError("A entrada padrão não pode ser lida a partir de uma posição.")
+    with open(caminho, "rb") as arquivo:
+        yield EntradaPosicionada(arquivo, posicao, cabecalho)
+
+
+def ler_pedidos(linhas: Iterable[str], formato: str = "jsonl") -> Iterator[PedidoDict]:
+    """
+    Gera os pedidos um a um, no mesmo formato de dicionário aceito por
+    ``PedidoService.processar_pedido``. Linhas em branco são ignoradas.
+    """
+    if formato == "jsonl":
+        return _ler_jsonl(linhas)
+    if formato == "csv":
+        return _ler_csv(linhas)
+    raise ValueError(f"Formato de entrada desconhecido: {formato!r}")
+
+
+def _ler_jsonl(linhas: Iterable[str]) -> Iterator[PedidoDict]:
+    """Lê um pedido JSON por linha."""
+    for linha in linhas:
+        if linha.strip():
+            yield json.loads(linha)
+
+
+def _ler_csv(linhas: Iterable[str]) -> Iterator[PedidoDict]:
+    """
+    Lê pedidos de um CSV com cabeçalho 'cliente,produto,qtd,cupom'. Uma linha
+    com quantidade vazia ou que não seja um número inteiro não interrompe o
+    fluxo: é registrada em stderr, com o número da linha, e segue com
+    quantidade 0, para que o serviço a marque como ``INVALIDO``.
+    """
+    leitor = csv.DictReader(linhas)
+    for registro in leitor:
+        yield {
+            "cliente": registro.get("cliente") or None,
+            "produto": registro.get("produto") or None,
+            "qtd": _quantidade_csv(registro.get("qtd"), leitor.line_num),
+            "cupom": registro.get("cupom") or None,
+        }
+
+
+def _quantidade_csv(texto: Optional[str], linha: int) -> int:
+    """Converte a quantidade de uma linha do CSV; inválida ou ausente, vale 0."""
+    texto = (texto or "").strip()
+    try:
+        return int(texto)
+    except ValueError:
+        print(
+            f"[ERRO] Linha {linha}: quantidade inválida {texto!r}; pedido marcado como inválido.",
+            file=sys.stderr,
+        )
+        return 0
+
+
+def em_lotes(
+    pedidos: Iterable[PedidoDict], tamanho_lote: int
+) -> Iterator[List[PedidoDict]]:
+    """Agrupa o fluxo de pedidos em listas de no máximo ``tamanho_lote`` itens."""
+    if tamanho_lote <= 0:
+        raise ValueError("tamanho_lote deve ser positivo.")
+    iterador = iter(pedidos)
+    while lote := list(islice(iterador, tamanho_lote)):
+        yield lote
+
+
+def processar_fluxo(
+    pedidos: Iterable[PedidoDict],
+    service: PedidoService,
+    saida: Optional[TextIO] = None,
+    tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+    workers: int = 1,
+    exato: bool = False,
+    agregador: Optional[Agregador] = None,
+    colunar: Optional[EscritorColunar] = None,
+    pontos: Optional[PontosControle] = None,
+) -> Union[float, Decimal]:
+    """
+    Precifica o fluxo de pedidos lote a lote e escreve cada resultado em
+    ``saida`` (JSONL) assim que o lote termina. Apenas um lote (ou alguns
+    por processo, com ``workers`` > 1) fica em memória por vez. Retorna o
+    TOTAL acumulado, somado na ordem de entrada em ambos os modos.
+
+    Com ``exato``, os valores são calculados e somados em centavos inteiros,
+    a saída traz ``valor_centavos`` e o TOTAL é um ``Decimal`` exato. Com um
+    ``agregador``, os totais por cliente, produto e cupom são atualizados a
+    cada lote. Com um escritor ``colunar``, cada lote também é gravado em
+    formato binário colunar, com a decomposição do valor de cada pedido.
+
+    Com ``pontos`` de controle, o TOTAL parte do valor registrado no ponto de
+    retomada e o estado é gravado periodicamente, após a escrita dos lotes.
+    """
+    total = 0 if exato else 0.0
+    lotes = em_lotes(pedidos, tamanho_lote)
+    if pontos is not None:
+        total = pontos.total
+        lotes = pontos.marcar(lotes)
+    campo_valor = "valor_centavos" if exato else "valor"
+    for lote, resultado, fixado in _precificar_em_lotes(
+        lotes, service, workers, exato, agregador
+    ):
+        for valor in resultado.valores:
+            total += valor
+        if saida is not None:
+            _escrever_resultados(saida, lote, resultado, campo_valor)
+        if colunar is not None:
+            colunar.escrever_lote(lote, resultado, fixado)
+        if pontos is not None:
+            pontos.concluir_lote(len(lote), total, saida, agregador)
+    return de_centavos(total) if exato else total
+
+
+def precificar_lotes(
+    pedidos: Iterable[PedidoDict],
+    service: PedidoService,
+    tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+    workers: int = 1,
+    exato: bool = False,
+    agregador: Optional[Agregador] = None,
+) -> Iterator[Tuple[List[PedidoDict], Union[ResultadoLote, ResultadoLoteCentavos]]]:
+    """
+    Gera cada lote com seu resultado, em sequência ou em um pool de processos,
+    somando-o ao ``agregador`` quando houver um.
+    """
+    lotes = _precificar_em_lotes(
+        em_lotes(pedidos, tamanho_lote), service, workers, exato, agregador
+    )
+    return ((lote, resultado) for lote, resultado, _ in lotes)
+
+
+def _precificar_em_lotes(
+    lotes: Iterable[List[PedidoDict]],
+    service: PedidoService,
+    workers: int = 1,
+    exato: bool = False,
+    agregador: Optional[Agregador] = None,
+) -> Iterator[
+    Tuple[List[PedidoDict], Union[ResultadoLote, ResultadoLoteCentavos], PedidoService]
+]:
+    """
+    Precifica lotes já montados, em sequência ou em um pool de processos, e
+    gera cada um com o resultado e o serviço fixado com que foi precificado.
+    """
+    if workers > 1:
+        yield from precificar_em_paralelo_fixados(
+            lotes, service, workers, exato=exato, agregador=agregador
+        )
+        return
+    for lote in lotes:
+        # Um instantâneo de regras por lote: uma recarga vale a partir do próximo.
+        fixado = service.fixar()
+        if exato:
+            resultado = fixado.processar_pedidos_centavos(lote, registrar_log=False)
+        else:
+            resultado = fixado.processar_pedidos(lote, registrar_log=False)
+        if agregador is not None:
+            agregador.adicionar_lote(lote, resultado, fixado)
+        yield lote, resultado, fixado
+
+
+def _escrever_resultados(
+    saida: TextIO,
+    lote: List[PedidoDict],
+    resultado: Union[ResultadoLote, ResultadoLoteCentavos],
+    campo_valor: str = "valor",
+) -> None:
+    """
+    Serializa os pedidos precificados de um lote em uma única escrita. Com
+    regras versionadas, cada linha traz a ``versao_regras`` usada no cálculo;
+    com índice de clientes, o ``cnpj`` e o ``email`` do cliente cadastrado.
+    """
+    extra = {} if resultado.versao_regras is None else {"versao_regras": resultado.versao_regras}
+    if resultado.clientes is not None:
+        _escrever_com_clientes(saida, lote, resultado, campo_valor, extra)
+        return
+    linhas = [
+        json.dumps(
+            {
+                "cliente": pedido.get("cliente"),
+                "produto": pedido.get("produto"),
+                "qtd": pedido.get("qtd"),
+                "cupom": pedido.get("cupom"),
+                campo_valor: valor,
+                "status": situacao,
+                **extra,
+            },
+            ensure_ascii=False,
+        )
+        for pedido, valor, situacao in zip(lote, resultado.valores, resultado.status)
+    ]
+    saida.write("\n".join(linhas) + "\n")
+
+
+def _escrever_com_clientes(
+    saida: TextIO,
+    lote: List[PedidoDict],
+    resultado: Union[ResultadoLote, ResultadoLoteCentavos],
+    campo_valor: str,
+    extra: Dict[str, int],
+) -> None:
+    """Versão de ``_escrever_resultados`` que anexa os dados do cliente a cada linha."""
+    linhas = [
+        json.dumps(
+            {
+                "cliente": pedido.get("cliente"),
+                "produto": pedido.get("produto"),
+                "qtd": pedido.get("qtd"),
+                "cupom": pedido.get("cupom"),
+                campo_valor: valor,
+                "status": situacao,
+                "cnpj": dados.cnpj if dados is not None else None,
+                "email": dados.email if dados is not None else None,
+                **extra,
+            },
+            ensure_ascii=False,
+        )
+        for pedido, valor, situacao, dados in zip(
+            lote, resultado.valores, resultado.status, resultado.clientes
+        )
+    ]
+    saida.write("\n".join(linhas) + "\n")
@@ -0,0 +1,156 @@
+"""Módulo de instrumentação opcional: tempos por etapa, contadores e histogramas de latência."""
+import json
+import math
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Protocol, Sequence
+
+from refatorado.gravacao_atomica import gravar_atomicamente
+
+# Limites (em segundos) dos baldes dos histogramas de latência, de 1us a 1s.
+LIMITES_LATENCIA = (1e-6, 2e-6, 5e-6, 1e-5, 2e-5, 5e-5, 1e-4, 2e-4, 5e-4, 1e-3, 1e-2, 1e-1, 1.0)
+
+Snapshot = Dict[str, Any]
+
+
+class Histograma:
+    """Histograma cumulativo de latências com baldes fixos (no estilo Prometheus)."""
+
+    def __init__(self, limites: Sequence[float] = LIMITES_LATENCIA) -> None:
+        self.limites = tuple(limites)
+        self.contagens = [0] * (len(self.limites) + 1)  # o último balde é +Inf
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float) -> None:
+        """Registra uma observação."""
+        self.contagens[bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+    def para_dict(self) -> Dict[str, Any]:
+        """Converte para um dicionário serializável, com contagens acumuladas por limite."""
+        acumulado = 0
+        baldes = []
+        for limite, contagem in zip(self.limites + (math.inf,), self.contagens):
+            acumulado += contagem
+            baldes.append(["+Inf" if limite == math.inf else limite, acumulado])
+        return {"baldes": baldes, "soma": self.soma, "total": self.total}
+
+
+class Sink(Protocol):  # pylint: disable=R0903
+    """Destino das métricas exportadas."""
+
+    def exportar(self, snapshot: Snapshot) -> None:
+        """Publica o snapshot das métricas."""
+
+
+class SinkMemoria:  # pylint: disable=R0903
+    """Guarda os snapshots em memória (útil em testes e depuração)."""
+
+    def __init__(self) -> None:
+        self.snapshots: List[Snapshot] = []
+
+    def exportar(self, snapshot: Snapshot) -> None:
+        """Guarda o snapshot."""
+        self.snapshots.append(snapshot)
+
+
+class SinkJson:  # pylint: disable=R0903
+    """Grava o snapshot mais recente em um arquivo JSON."""
+
+    def __init__(self, caminho: str) -> None:
+        self.caminho = caminho
+
+    def exportar(self, snapshot: Snapshot) -> None:
+        """Substitui o arquivo pelo snapshot atual."""
+        gravar_atomicamente(self.caminho, json.dumps(snapshot, indent=2, ensure_ascii=False))
+
+
+class SinkPrometheus:  # pylint: disable=R0903
+    """Grava as métricas no formato texto do Prometheus (para o textfile collector)."""
+
+    def __init__(self, caminho: str, prefixo: str = "petrobahia") -> None:
+        self.caminho = caminho
+        self.prefixo = prefixo
+
+    def exportar(self, snapshot: Snapshot) -> None:
+        """Substitui o arquivo pelas métricas do snapshot atual."""
+        gravar_atomicamente(self.caminho, self.formatar(snapshot))
+
+    def formatar(self, snapshot: Snapshot) -> str:
+        """Converte o snapshot para o formato de exposição em texto."""
+        eventos = f"{self.prefixo}_eventos_total"
+        linhas = [f"# TYPE {eventos} counter"]
+        for categoria, contagens in sorted(snapshot["contadores"].items()):
+            for chave, valor in sorted(contagens.items()):
+                rotulos = f'categoria="{_escapar(categoria)}",chave="{_escapar(chave)}"'
+                linhas.append(f"{eventos}{{{rotulos}}} {valor}")
+        linhas.append(f"# TYPE {self.prefixo}_etapa_segundos histogram")
+        for etapa, histograma in sorted(snapshot["histogramas"].items()):
+            metrica = f"{self.prefixo}_etapa_segundos"
+            rotulo = f'etapa="{_escapar(etapa)}"'
+            for limite, acumulado in histograma["baldes"]:
+                linhas.append(f'{metrica}_bucket{{{rotulo},le="{limite}"}} {acumulado}')
+            linhas.append(f'{metrica}_sum{{{rotulo}}} {histograma["soma"]}')
+            linhas.append(f'{metrica}_count{{{rotulo}}} {histograma["total"]}')
+        return "\n".join(linhas) + "\n"
+
+
+def _escapar(valor: str) -> str:
+    """Escapa barra invertida, aspas e quebra de linha em um valor de rótulo do Prometheus."""
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _chave(chave: Any) -> str:
+    """Chave de um contador; ausente (None) vira texto vazio, não ``"None"``."""
+    return "" if chave is None else str(chave)
+
+
+class Instrumentacao:
+    """
+    Coleta tempos por etapa (em histogramas de latência) e contadores por
+    categoria (produto, cupom, erro). Só é usada quando passada ao serviço;
+    desligada, o caminho quente não paga nada além de um teste de ``None``.
+    """
+
+    def __init__(self, sink: Optional[Sink] = None, relogio=time.perf_counter) -> None:
+        self.sink = sink
+        self._relogio = relogio
+        self.contadores: Dict[str, Counter] = defaultdict(Counter)
+        self.histogramas: Dict[str, Histograma] = defaultdict(Histograma)
+
+    @contextmanager
+    def etapa(self, nome: str) -> Iterator[None]:
+        """Mede a duração do bloco e a registra no histograma da etapa."""
+        inicio = self._relogio()
+        try:
+            yield
+        finally:
+            self.histogramas[nome].observar(self._relogio() - inicio)
+
+    def contar(self, categoria: str, chave: Any, quantidade: int = 1) -> None:
+        """Incrementa o contador ``categoria/chave``."""
+        self.contadores[categoria][_chave(chave)] += quantidade
+
+    def contar_varios(self, categoria: str, chaves: Sequence[Any]) -> None:
+        """Incrementa de uma vez os contadores de uma coluna de chaves."""
+        contador = self.contadores[categoria]
+        for chave, quantidade in Counter(chaves).items():
+            contador[_chave(chave)] += quantidade
+
+    def snapshot(self) -> Snapshot:
+        """Retorna uma cópia serializável das métricas atuais."""
+        return {
+            "contadores": {cat: dict(contagens) for cat, contagens in self.contadores.items()},
+            "histogramas": {nome: h.para_dict() for nome, h in self.histogramas.items()},
+        }
+
+    def exportar(self) -> Snapshot:
+        """Envia o snapshot atual ao sink configurado e o retorna."""
+        snapshot = self.snapshot()
+        if self.sink is not None:
+            self.sink.exportar(snapshot)
+        return snapshot
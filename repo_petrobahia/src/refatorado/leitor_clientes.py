@@ -0,0 +1,149 @@
+"""Módulo de leitura preguiçosa (memory-mapped) do arquivo de clientes."""
+import ast
+import mmap
+import re
+from types import TracebackType
+from typing import Dict, Iterator, Optional, Pattern, Sequence, Tuple, Type
+
+CAMPOS_PADRAO = ("nome", "email", "cnpj")
+
+Valores = Tuple[Optional[str], ...]
+
+
+# Texto entre aspas simples ou duplas, como o repr escreve as strings.
+_TEXTO = rb"(?:'(?:[^'\\\n]|\\.)*'|\"(?:[^\"\\\n]|\\.)*\")"
+
+# Um par ``chave: valor`` qualquer do repr; valores que não são texto (None,
+# números) são aceitos, estruturas aninhadas não.
+_PAR = _TEXTO + rb": (?:" + _TEXTO + rb"|[^,'\"{}\[\]()\n]*)"
+
+
+def _padrao_campo(campo: str) -> Pattern[bytes]:
+    """
+    Expressão que captura o valor (entre aspas simples ou duplas) de um campo
+    do repr. Ancorada no ``{``, percorre os pares anteriores um a um, então um
+    texto que imita ``'campo': 'valor'`` dentro de outro valor nunca casa.
+    """
+    chave = re.escape(repr(campo).encode("utf-8"))
+    return re.compile(rb"\{(?:" + _PAR + rb", )*?" + chave + rb": (" + _TEXTO + rb")")
+
+
+class LeitorClientes:
+    """
+    Leitor do ``clientes.txt`` (um ``str(dict)`` por linha) sobre um mapa de
+    memória do arquivo. As linhas são percorridas sob demanda e só os campos
+    pedidos são extraídos, direto dos bytes mapeados, sem ``literal_eval`` nem
+    um dicionário por linha. Cada registro pode ser relido pelo seu offset.
+    """
+
+    def __init__(self, caminho: str) -> None:
+        self.caminho = caminho
+        self._arquivo = open(caminho, "rb")  # pylint: disable=R1732
+        try:
+            # Arquivo vazio não pode ser mapeado; nesse caso não há registros.
+            self._mapa: Optional[mmap.mmap] = mmap.mmap(
+                self._arquivo.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        except ValueError:
+            self._mapa = None
+        self._padroes: Dict[str, Pattern[bytes]] = {}
+        self._campos: Dict[Pattern[bytes], str] = {}
+
+    def offsets(self) -> Iterator[int]:
+        """Gera o offset (em bytes) de cada registro não vazio."""
+        for inicio, _ in self._linhas():
+            yield inicio
+
+    def valores(self, campos: Sequence[str] = CAMPOS_PADRAO) -> Iterator[Valores]:
+        """Gera, para cada registro, a tupla com os valores dos campos pedidos."""
+        padroes = [self._padrao(campo) for campo in campos]
+        for inicio, fim in self._linhas():
+            yield self._extrair(padroes, inicio, fim)
+
+    def registros(
+        self, campos: Sequence[str] = CAMPOS_PADRAO
+    ) -> Iterator[Tuple[int, Valores]]:
+        """Gera ``(offset, valores)`` para cada registro, para reler depois com ``ler_em``."""
+        padroes = [self._padrao(campo) for campo in campos]
+        for inicio, fim in self._linhas():
+            yield inicio, self._extrair(padroes, inicio, fim)
+
+    def ler_em(self, offset: int, campos: Sequence[str] = CAMPOS_PADRAO) -> Valores:
+        """Lê os campos do registro que começa no offset informado."""
+        if self._mapa is None or not 0 <= offset < len(self._mapa):
+            raise IndexError(f"Offset fora do arquivo: {offset}")
+        fim = self._mapa.find(b"\n", offset)
+        fim = len(self._mapa) if fim == -1 else fim
+        return self._extrair([self._padrao(campo) for campo in campos], offset, fim)
+
+    def _linhas(self) -> Iterator[Tuple[int, int]]:
+        """Gera os intervalos ``[inicio, fim)`` de cada linha não vazia do mapa."""
+        mapa = self._mapa
+        if mapa is None:
+            return
+        tamanho = len(mapa)
+        inicio = 0
+        while inicio < tamanho:
+            fim = mapa.find(b"\n", inicio)
+            if fim == -1:
+                fim = tamanho
+            if fim > inicio:
+                yield inicio, fim
+            inicio = fim + 1
+
+    def _padrao(self, campo: str) -> Pattern[bytes]:
+        """Retorna (e guarda) a expressão compilada do campo."""
+        padrao = self._padroes.get(campo)
+        if padrao is None:
+            padrao = self._padroes[campo] = _padrao_campo(campo)
+            self._campos[padrao] = campo
+        return padrao
+
+    def _extrair(self, padroes: Sequence[Pattern[bytes]], inicio: int, fim: int) -> Valores:
+        """Extrai os valores dos campos dentro de ``[inicio, fim)`` do mapa."""
+        valores = []
+        for padrao in padroes:
+            achado = padrao.match(self._mapa, inicio, fim)
+            if achado is None:
+                valores.append(self._avaliar(padrao, inicio, fim))
+                continue
+            bruto = achado.group(1)
+            if b"\\" in bruto:
+                valores.append(ast.literal_eval(bruto.decode("utf-8")))
+            else:
+                valores.append(bruto[1:-1].decode("utf-8"))
+        return tuple(valores)
+
+    def _avaliar(self, padrao: Pattern[bytes], inicio: int, fim: int) -> Optional[str]:
+        """
+        Caminho lento para um campo que não casou: se a chave aparece na linha
+        (valor que não é texto ou estrutura aninhada antes dele), lê a linha
+        inteira com ``literal_eval``; senão, o campo está ausente.
+        """
+        campo = self._campos[padrao]
+        if self._mapa.find(repr(campo).encode("utf-8"), inicio, fim) == -1:
+            return None
+        try:
+            registro = ast.literal_eval(self._mapa[inicio:fim].decode("utf-8"))
+        except (SyntaxError, ValueError, UnicodeDecodeError):
+            return None
+        valor = registro.get(campo) if isinstance(registro, dict) else None
+        return valor if isinstance(valor, str) else None
+
+    def fechar(self) -> None:
+        """Libera o mapa de memória e fecha o arquivo."""
+        if self._mapa is not None:
+            self._mapa.close()
+            self._mapa = None
+        self._arquivo.close()
+
+    def __enter__(self) -> "LeitorClientes":
+        return self
+
+    def __exit__(
+        self,
+        tipo: Optional[Type[BaseException]],
+        erro: Optional[BaseException],
+        rastro: Optional[TracebackType],
+    ) -> None:
+        self.fechar()
@@ -0,0 +1,242 @@
+"""Módulo do motor de cupons: regras registradas uma vez em uma tabela imutável."""
+import json
+from datetime import date
+from decimal import Decimal
+from itertools import count
+from types import MappingProxyType
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from refatorado.dinheiro import CONTEXTO, para_decimal
+
+# Separador para combinar cupons em um mesmo pedido, ex.: "MEGA10+FROTA3".
+SEPARADOR_CUPONS = "+"
+
+# Cada motor criado recebe uma versão nova, usada para invalidar caches de preço.
+_VERSOES = count(1)
+
+Coeficientes = Tuple[Tuple[float, float], ...]
+SEM_DESCONTO: Coeficientes = ()
+
+
+class RegraCupom(NamedTuple):
+    """
+    Regra de um cupom: o preço passa a ser ``preco * multiplicador - deducao``.
+    Pode ser restrita a produtos e a um período (datas inclusivas). Cupons
+    ``cumulativo`` podem ser combinados com outros cupons cumulativos.
+    """
+
+    codigo: str
+    multiplicador: float = 1.0
+    deducao: float = 0.0
+    produtos: Optional[FrozenSet[str]] = None
+    cumulativo: bool = False
+    inicio: Optional[date] = None
+    fim: Optional[date] = None
+
+    def vale_para(self, produto: str, data: Optional[date]) -> bool:
+        """Indica se a regra se aplica ao produto na data informada."""
+        if self.produtos is not None and produto not in self.produtos:
+            return False
+        if self.inicio is None and self.fim is None:
+            return True
+        data = data or date.today()
+        return (self.inicio is None or self.inicio <= data) and (
+            self.fim is None or data <= self.fim
+        )
+
+
+CUPONS_PADRAO: Tuple[RegraCupom, ...] = (
+    RegraCupom("MEGA10", multiplicador=0.9),
+    RegraCupom("NOVO5", multiplicador=0.95),
+    # LUB2 é um desconto fixo de 2.00, mas SÓ para lubrificante
+    RegraCupom("LUB2", deducao=2.0, produtos=frozenset({"lubrificante"})),
+)
+
+
+class MotorCupons:
+    """
+    Motor de cupons com tabela de despacho imutável, montada uma única vez.
+    Cupons desconhecidos ou fora da validade não alteram o preço.
+    """
+
+    def __init__(self, regras: Iterable[RegraCupom] = CUPONS_PADRAO) -> None:
+        self.versao: int = next(_VERSOES)
+        self._regras: Mapping[str, RegraCupom] = MappingProxyType(
+            {regra.codigo: regra for regra in regras}
+        )
+        # Tabela de despacho: cada cupom já com a tupla de coeficientes que ``_resolver``
+        # devolve, sem alocar uma tupla nova por pedido.
+        self._despacho: Mapping[str, Tuple[RegraCupom, Coeficientes]] = MappingProxyType(
+            {
+                codigo: (regra, ((regra.multiplicador, regra.deducao),))
+                for codigo, regra in self._regras.items()
+            }
+        )
+        self._tem_validade = any(
+            regra.inicio is not None or regra.fim is not None for regra in self._regras.values()
+        )
+        # Coeficientes em decimal, convertidos uma vez para o modo de dinheiro exato.
+        self._decimais: Mapping[float, Decimal] = MappingProxyType(
+            {
+                valor: para_decimal(valor)
+                for regra in self._regras.values()
+                for valor in (regra.multiplicador, regra.deducao)
+            }
+        )
+
+    def __reduce__(self):
+        # MappingProxyType não é serializável; permite enviar o motor a outros processos.
+        # A versão acompanha a cópia, para que o cache do outro processo a reconheça.
+        return (self.__class__, (tuple(self._regras.values()),), {"versao": self.versao})
+
+    @property
+    def regras(self) -> Mapping[str, RegraCupom]:
+        """Tabela (somente leitura) de regras por código de cupom."""
+        return self._regras
+
+    @property
+    def tem_validade(self) -> bool:
+        """Indica se alguma regra tem período de validade (o resultado depende da data)."""
+        return self._tem_validade
+
+    @classmethod
+    def de_dict(cls, dados: Mapping[str, Mapping]) -> "MotorCupons":
+        """
+        Cria o motor a partir de um dicionário no formato
+        ``{"MEGA10": {"percentual": 10}, "LUB2": {"deducao": 2.0, "produtos": ["lubrificante"]}}``.
+        Também aceita ``multiplicador``, ``cumulativo``, ``inicio`` e ``fim`` (ISO 8601).
+        """
+        return cls(_regra_de_dict(codigo, item) for codigo, item in dados.items())
+
+    @classmethod
+    def de_arquivo(cls, caminho: str) -> "MotorCupons":
+        """Carrega as regras de um arquivo JSON no formato aceito por ``de_dict``."""
+        with open(caminho, "r", encoding="utf-8") as arquivo:
+            return cls.de_dict(json.load(arquivo))
+
+    def aplicar(
+        self, preco: float, cupom: Optional[str], produto: str, data: Optional[date] = None
+    ) -> float:
+        """Aplica o(s) cupom(ns) ao preço de um pedido."""
+        if not cupom:
+            return preco
+        for multiplicador, deducao in self._resolver(cupom, produto, data):
+            preco = preco * multiplicador - deducao
+        return preco
+
+    def aplicar_decimal(
+        self, preco: Decimal, cupom: Optional[str], produto: str, data: Optional[date] = None
+    ) -> Decimal:
+        """Versão exata de ``aplicar``, com aritmética decimal."""
+        if not cupom:
+            return preco
+        decimais = self._decimais
+        for multiplicador, deducao in self._resolver(cupom, produto, data):
+            preco = CONTEXTO.subtract(
+                CONTEXTO.multiply(preco, decimais[multiplicador]), decimais[deducao]
+            )
+        return preco
+
+    def aplicar_lote(
+        self,
+        precos: Sequence[float],
+        cupons: Sequence[Optional[str]],
+        produtos: Sequence[str],
+        data: Optional[date] = None,
+    ) -> List[float]:
+        """
+        Aplica os cupons a uma coluna de pedidos. Cada combinação distinta de
+        (cupom, produto) é resolvida uma única vez no lote.
+        """
+        data = data or date.today()
+        resolvidos: Dict[Tuple[Optional[str], str], Coeficientes] = {}
+        resultado: List[float] = []
+        for preco, cupom, produto in zip(precos, cupons, produtos):
+            if cupom:
+                chave = (cupom, produto)
+                coeficientes = resolvidos.get(chave)
+                if coeficientes is None:
+                    coeficientes = resolvidos[chave] = self._resolver(cupom, produto, data)
+                for multiplicador, deducao in coeficientes:
+                    preco = preco * multiplicador - deducao
+            resultado.append(preco)
+        return resultado
+
+    def aplicar_lote_codificado(
+        self,
+        precos: Sequence[float],
+        codigos_cupom: Sequence[int],
+        codigos_produto: Sequence[int],
+        nomes: Sequence[Optional[str]],
+        data: Optional[date] = None,
+    ) -> List[float]:
+        """
+        Versão de ``aplicar_lote`` para colunas codificadas, como as de um
+        ``LotePedidos`` (``nomes[codigo]`` é o texto): cada par distinto de
+        códigos é resolvido uma única vez, sem decodificar as linhas.
+        """
+        data = data or date.today()
+        resolvidos: Dict[Tuple[int, int], Coeficientes] = {}
+        resultado: List[float] = []
+        for preco, chave in zip(precos, zip(codigos_cupom, codigos_produto)):
+            coeficientes = resolvidos.get(chave)
+            if coeficientes is None:
+                cupom = nomes[chave[0]]
+                coeficientes = resolvidos[chave] = (
+                    self._resolver(cupom, nomes[chave[1]], data) if cupom else SEM_DESCONTO
+                )
+            for multiplicador, deducao in coeficientes:
+                preco = preco * multiplicador - deducao
+            resultado.append(preco)
+        return resultado
+
+    def _resolver(self, cupom: str, produto: str, data: Optional[date]) -> Coeficientes:
+        """
+        Converte o código do cupom nos coeficientes a aplicar, em ordem. Uma
+        combinação só vale se todos os cupons dela estiverem registrados como
+        cumulativos; caso contrário, como no código original, é um cupom
+        desconhecido. Cupons fora do período ou de outro produto não contam.
+        """
+        despacho = self._despacho.get(cupom)
+        if despacho is not None:
+            regra, coeficientes = despacho
+            return coeficientes if regra.vale_para(produto, data) else SEM_DESCONTO
+        if SEPARADOR_CUPONS not in cupom:
+            return SEM_DESCONTO
+
+        regras = [self._regras.get(codigo.strip()) for codigo in cupom.split(SEPARADOR_CUPONS)]
+        if not all(regra is not None and regra.cumulativo for regra in regras):
+            return SEM_DESCONTO
+        return tuple(
+            (regra.multiplicador, regra.deducao)
+            for regra in regras
+            if regra.vale_para(produto, data)
+        )
+
+
+def _regra_de_dict(codigo: str, item: Mapping) -> RegraCupom:
+    """Converte a configuração de um cupom em ``RegraCupom``."""
+    if "percentual" in item:
+        multiplicador = (100 - float(item["percentual"])) / 100
+    else:
+        multiplicador = float(item.get("multiplicador", 1.0))
+    produtos = item.get("produtos")
+    return RegraCupom(
+        codigo=codigo,
+        multiplicador=multiplicador,
+        deducao=float(item.get("deducao", 0.0)),
+        produtos=frozenset(produtos) if produtos is not None else None,
+        cumulativo=bool(item.get("cumulativo", False)),
+        inicio=date.fromisoformat(item["inicio"]) if item.get("inicio") else None,
+        fim=date.fromisoformat(item["fim"]) if item.get("fim") else None,
+    )
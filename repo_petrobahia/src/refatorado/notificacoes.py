@@ -0,0 +1,211 @@
+"""Módulo da fila de notificações (email de boas-vindas) enviadas em segundo plano."""
+import atexit
+import queue
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+from types import TracebackType
+from typing import Callable, List, NamedTuple, Optional, Protocol, Type
+
+
+class MensagemBoasVindas(NamedTuple):
+    """Email de boas-vindas a ser enviado a um cliente recém-cadastrado."""
+
+    destinatario: str
+    nome: str
+
+
+class Transporte(Protocol):  # pylint: disable=R0903
+    """Interface de envio: recebe um lote de mensagens e levanta OSError em caso de falha."""
+
+    def enviar_lote(self, mensagens: List[MensagemBoasVindas]) -> None:
+        """Envia todas as mensagens do lote."""
+
+
+class SmtpLocal:
+    """
+    Substituto local do relay SMTP, para testes e execução sem rede: guarda
+    as mensagens em memória e pode simular falhas nas primeiras ``falhas``
+    tentativas de envio.
+    """
+
+    def __init__(self, falhas: int = 0) -> None:
+        self.enviadas: List[MensagemBoasVindas] = []
+        self.tentativas = 0
+        self._falhas = falhas
+        self._trava = threading.Lock()
+
+    def enviar_lote(self, mensagens: List[MensagemBoasVindas]) -> None:
+        """Registra o lote como enviado (ou falha, se ainda houver falhas simuladas)."""
+        with self._trava:
+            self.tentativas += 1
+            if self._falhas > 0:
+                self._falhas -= 1
+                raise ConnectionError("Falha simulada no relay SMTP.")
+            self.enviadas.extend(mensagens)
+
+
+class TransporteSmtp:  # pylint: disable=R0903
+    """Envia o lote por um relay SMTP real, com uma conexão por lote."""
+
+    def __init__(
+        self, host: str, porta: int = 25, remetente: str = "nao-responda@petrobahia.com"
+    ) -> None:
+        self.host = host
+        self.porta = porta
+        self.remetente = remetente
+
+    def enviar_lote(self, mensagens: List[MensagemBoasVindas]) -> None:
+        """Abre uma conexão com o relay e envia todas as mensagens do lote."""
+        with smtplib.SMTP(self.host, self.porta, timeout=30) as smtp:
+            for mensagem in mensagens:
+                email = EmailMessage()
+                email["From"] = self.remetente
+                email["To"] = mensagem.destinatario
+                email["Subject"] = "Bem-vindo à PetroBahia"
+                email.set_content(f"Olá, {mensagem.nome}! Seu cadastro foi realizado.")
+                smtp.send_message(email)
+
+
+_FIM = object()  # sentinela que encerra uma thread de envio
+
+
+class FilaNotificacoes:
+    """
+    Fila de envio em segundo plano. ``enviar`` só enfileira e retorna; até
+    ``workers`` threads retiram lotes de até ``tamanho_lote`` mensagens e os
+    entregam ao transporte, com novas tentativas e espera exponencial. A
+    fila é limitada a ``capacidade`` mensagens (quem enfileira espera se ela
+    encher). ``encerrar`` entrega o que estiver pendente antes de parar.
+    """
+
+    # pylint: disable=R0913
+    def __init__(
+        self,
+        transporte: Transporte,
+        workers: int = 4,
+        tamanho_lote: int = 50,
+        max_tentativas: int = 5,
+        espera_inicial: float = 0.5,
+        capacidade: int = 10_000,
+        dormir: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.transporte = transporte
+        self.tamanho_lote = tamanho_lote
+        self.max_tentativas = max_tentativas
+        self.espera_inicial = espera_inicial
+        self.nao_entregues: List[MensagemBoasVindas] = []
+        self._dormir = dormir
+        self._fila: "queue.Queue" = queue.Queue(maxsize=capacidade)
+        # Protege a passagem para "encerrada" e conta quem ainda está enfileirando:
+        # os sentinelas só entram depois da última mensagem aceita.
+        self._condicao = threading.Condition()
+        self._encerrada = False
+        self._enfileirando = 0
+        self._threads = [
+            threading.Thread(target=self._trabalhar, name=f"notificacoes-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def enviar(self, mensagem: MensagemBoasVindas) -> None:
+        """
+        Enfileira a mensagem para envio em segundo plano. Levanta RuntimeError
+        se a fila já foi encerrada, em vez de perder a mensagem.
+        """
+        with self._condicao:
+            if self._encerrada:
+                raise RuntimeError("A fila de notificações já foi encerrada.")
+            self._enfileirando += 1
+        try:
+            # Fora da trava: com a fila cheia, só quem enfileira espera.
+            self._fila.put(mensagem)
+        finally:
+            with self._condicao:
+                self._enfileirando -= 1
+                self._condicao.notify_all()
+
+    def instalar_no_encerramento(self) -> None:
+        """Garante que as mensagens pendentes sejam entregues ao fim do programa."""
+        atexit.register(self.encerrar)
+
+    def encerrar(self, drenar: bool = True) -> None:
+        """
+        Para as threads de envio. Com ``drenar``, espera a entrega de todas as
+        mensagens pendentes; sem ele, descarta as que ainda não foram retiradas.
+        """
+        with self._condicao:
+            if self._encerrada:
+                return
+            self._encerrada = True
+            self._condicao.wait_for(lambda: self._enfileirando == 0)
+        if not drenar:
+            self._descartar_pendentes()
+        for _ in self._threads:
+            self._fila.put(_FIM)
+        for thread in self._threads:
+            thread.join()
+
+    def _trabalhar(self) -> None:
+        """Laço de cada thread: retira um lote da fila e o entrega."""
+        while True:
+            lote: List[MensagemBoasVindas] = []
+            item = self._fila.get()
+            encerrar = item is _FIM
+            if not encerrar:
+                lote.append(item)
+            while not encerrar and len(lote) < self.tamanho_lote:
+                try:
+                    item = self._fila.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _FIM:
+                    encerrar = True
+                else:
+                    lote.append(item)
+            if lote:
+                self._entregar(lote)
+            for _ in range(len(lote) + encerrar):
+                self._fila.task_done()
+            if encerrar:
+                return
+
+    def _entregar(self, lote: List[MensagemBoasVindas]) -> None:
+        """
+        Tenta entregar o lote, esperando 1x, 2x, 4x... ``espera_inicial`` entre
+        tentativas. Outros erros do transporte não são repetidos: o lote vai
+        direto para ``nao_entregues`` e a thread segue atendendo a fila.
+        """
+        for tentativa in range(self.max_tentativas):
+            try:
+                self.transporte.enviar_lote(lote)
+                return
+            except OSError:
+                if tentativa + 1 < self.max_tentativas:
+                    self._dormir(self.espera_inicial * 2**tentativa)
+            except Exception as erro:  # pylint: disable=broad-except
+                print(f"[ERRO] Falha ao enviar {len(lote)} notificações: {erro!r}")
+                break
+        self.nao_entregues.extend(lote)
+
+    def _descartar_pendentes(self) -> None:
+        """Remove da fila as mensagens ainda não retiradas pelas threads."""
+        while True:
+            try:
+                self._fila.get_nowait()
+            except queue.Empty:
+                return
+            self._fila.task_done()
+
+    def __enter__(self) -> "FilaNotificacoes":
+        return self
+
+    def __exit__(
+        self,
+        tipo: Optional[Type[BaseException]],
+        erro: Optional[BaseException],
+        rastro: Optional[TracebackType],
+    ) -> None:
+        self.encerrar()
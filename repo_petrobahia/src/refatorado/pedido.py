@@ -0,0 +1,144 @@
+"""Módulo de representação compacta de pedidos: registro com slots e lote em colunas."""
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Union
+
+PedidoDict = Dict[str, Union[str, int, None]]
+
+# Código reservado para campos ausentes (produto ou cupom nulo).
+CODIGO_AUSENTE = 0
+
+
+def _internar(texto: Optional[str]) -> Optional[str]:
+    """Interna o texto, para que códigos repetidos compartilhem um único objeto."""
+    return sys.intern(texto) if isinstance(texto, str) else texto
+
+
+@dataclass(slots=True)
+class Pedido:
+    """
+    Pedido tipado e compacto: sem ``__dict__`` por instância e com os textos
+    internados. Tem os mesmos campos do dicionário aceito pelos serviços.
+    """
+
+    cliente: Optional[str] = None
+    produto: Optional[str] = None
+    qtd: int = 0
+    cupom: Optional[str] = None
+
+    @classmethod
+    def de_dict(cls, dados: Mapping[str, Union[str, int, None]]) -> "Pedido":
+        """Cria o pedido a partir do dicionário usado pela API original."""
+        return cls(
+            _internar(dados.get("cliente")),
+            _internar(dados.get("produto")),
+            dados.get("qtd", 0),
+            _internar(dados.get("cupom")),
+        )
+
+    def para_dict(self) -> PedidoDict:
+        """Converte para o dicionário usado pela API original."""
+        return {
+            "cliente": self.cliente,
+            "produto": self.produto,
+            "qtd": self.qtd,
+            "cupom": self.cupom,
+        }
+
+
+# Formas aceitas pelos serviços para um pedido avulso.
+EntradaPedido = Union[PedidoDict, Pedido]
+
+
+def como_pedido(pedido: EntradaPedido) -> Pedido:
+    """Adaptador da API de dicionários: devolve o próprio ``Pedido`` ou o converte."""
+    return pedido if isinstance(pedido, Pedido) else Pedido.de_dict(pedido)
+
+
+class LotePedidos:
+    """
+    Lote de pedidos em colunas (struct of arrays). Produto e cupom são
+    guardados como códigos inteiros de um vocabulário compartilhado e a
+    quantidade em um ``array`` de inteiros de 64 bits, o que custa poucas
+    dezenas de bytes por pedido em vez de um dicionário inteiro.
+
+    Por isso a quantidade precisa ser inteira: um float (ex.: 10.5, que os
+    dicionários aceitam) levanta TypeError; esses pedidos devem seguir como
+    dicionários ou ``Pedido``.
+    """
+
+    def __init__(self) -> None:
+        # Vocabulário de produtos e cupons: ``nomes[codigo]``.
+        self.nomes: List[Optional[str]] = [None]
+        self._codigos: Dict[Optional[str], int] = {None: CODIGO_AUSENTE}
+        self.clientes: List[Optional[str]] = []
+        self.codigos_produto = array("I")
+        self.quantidades = array("q")
+        self.codigos_cupom = array("I")
+
+    @classmethod
+    def de_pedidos(cls, pedidos: Iterable["EntradaPedido"]) -> "LotePedidos":
+        """Monta o lote a partir de dicionários ou de ``Pedido``."""
+        lote = cls()
+        for pedido in pedidos:
+            if isinstance(pedido, Pedido):
+                lote.adicionar(pedido.cliente, pedido.produto, pedido.qtd, pedido.cupom)
+            else:
+                lote.adicionar(
+                    pedido.get("cliente"),
+                    pedido.get("produto"),
+                    pedido.get("qtd", 0),
+                    pedido.get("cupom"),
+                )
+        return lote
+
+    def adicionar(
+        self, cliente: Optional[str], produto: Optional[str], qtd: int, cupom: Optional[str]
+    ) -> None:
+        """Acrescenta um pedido ao fim do lote (a quantidade deve ser inteira)."""
+        if not isinstance(qtd, int):
+            raise TypeError(f"LotePedidos exige quantidade inteira, recebeu {qtd!r}.")
+        self.clientes.append(_internar(cliente))
+        self.codigos_produto.append(self._codificar(produto))
+        self.quantidades.append(qtd)
+        self.codigos_cupom.append(self._codificar(cupom))
+
+    def __len__(self) -> int:
+        return len(self.quantidades)
+
+    def __getitem__(self, indice: int) -> Pedido:
+        nomes = self.nomes
+        return Pedido(
+            self.clientes[indice],
+            nomes[self.codigos_produto[indice]],
+            self.quantidades[indice],
+            nomes[self.codigos_cupom[indice]],
+        )
+
+    def __iter__(self) -> Iterator[Pedido]:
+        nomes = self.nomes
+        for cliente, produto, qtd, cupom in zip(
+            self.clientes, self.codigos_produto, self.quantidades, self.codigos_cupom
+        ):
+            yield Pedido(cliente, nomes[produto], qtd, nomes[cupom])
+
+    @property
+    def produtos(self) -> List[Optional[str]]:
+        """Coluna de produtos decodificada."""
+        nomes = self.nomes
+        return [nomes[codigo] for codigo in self.codigos_produto]
+
+    @property
+    def cupons(self) -> List[Optional[str]]:
+        """Coluna de cupons decodificada."""
+        nomes = self.nomes
+        return [nomes[codigo] for codigo in self.codigos_cupom]
+
+    def _codificar(self, texto: Optional[str]) -> int:
+        """Código do texto no vocabulário do lote, incluindo-o se for novo."""
+        codigo = self._codigos.get(texto)
+        if codigo is None:
+            codigo = self._codigos[texto] = len(self.nomes)
+            self.nomes.append(_internar(texto))
+        return codigo
@@ -1,7 +1,61 @@
 """Módulo de serviço para processamento de pedidos e aplicação de regras de negócio."""
-from typing import Dict, Optional, Union
+import copy
+from contextlib import nullcontext
+from datetime import date
+from decimal import Decimal
+from typing import (
+    ContextManager,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
+from refatorado.cache_precos import CachePrecos
+from refatorado.dinheiro import (
+    de_centavos,
+    formatar_centavos,
+    para_centavos,
+    para_reais_inteiros,
+    truncar_centavos,
+)
+from refatorado.indice_clientes import DadosCliente, IndiceClientes
+from refatorado.instrumentacao import Instrumentacao
+from refatorado.motor_cupons import MotorCupons
+from refatorado.pedido import EntradaPedido, LotePedidos, Pedido, como_pedido
 from refatorado.preco_calculadora import PrecoCalculadora
+from refatorado.regras_precos import PublicadorRegras, RegrasPreco
+
+STATUS_OK = "OK"
+STATUS_INVALIDO = "INVALIDO"
+STATUS_PRODUTO_DESCONHECIDO = "PRODUTO_DESCONHECIDO"
+STATUS_CLIENTE_DESCONHECIDO = "CLIENTE_DESCONHECIDO"
+
+_SEM_MEDICAO = nullcontext()
+
+
+class ResultadoLote(NamedTuple):
+    """Resultado compacto do processamento de um lote de pedidos."""
+
+    valores: List[float]
+    status: List[str]
+    total: float
+    versao_regras: Optional[int] = None  # instantâneo de regras usado, se versionadas
+    clientes: Optional[List[Optional[DadosCliente]]] = None  # dados anexados, com índice
+
+
+class ResultadoLoteCentavos(NamedTuple):
+    """Resultado de um lote no modo de dinheiro exato: valores e total em centavos."""
+
+    valores: List[int]
+    status: List[str]
+    total: int
+    versao_regras: Optional[int] = None
+    clientes: Optional[List[Optional[DadosCliente]]] = None
 
 
 # pylint: disable=R0903
@@ -9,20 +63,87 @@ class PedidoService:
     """
     Serviço responsável pela orquestração do pedido, aplicação de
     cupons e regras de arredondamento.
+
+    Com um publicador de ``regras``, tarifas e cupons vêm do instantâneo em
+    vigor, pego uma única vez por pedido ou lote: uma recarga no meio do
+    processamento vale a partir do próximo, e cada lote registra a versão usada.
+
+    Com um índice de ``clientes``, cada lote é juntado à base cadastrada antes
+    da precificação: pedidos de clientes desconhecidos são recusados em bloco
+    (``CLIENTE_DESCONHECIDO``) e os demais recebem os dados do cliente.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        cupons: Optional[MotorCupons] = None,
+        instrumentacao: Optional[Instrumentacao] = None,
+        cache: Optional[CachePrecos] = None,
+        regras: Optional[PublicadorRegras] = None,
+        clientes: Optional[IndiceClientes] = None,
+    ) -> None:
         self.calculadora = PrecoCalculadora()
+        self.cupons = cupons or MotorCupons()
+        self.instrumentacao = instrumentacao
+        self.cache = cache
+        self.regras = regras
+        self.clientes = clientes
+        self.versao_regras: Optional[int] = None
+        self.instantaneo: Optional[RegrasPreco] = None  # o instantâneo, se fixado
+        self._fixado: Optional[Tuple[RegrasPreco, "PedidoService"]] = None
+
+    def com_regras(self, regras: RegrasPreco) -> "PedidoService":
+        """
+        Cópia rasa do serviço presa ao instantâneo ``regras`` (mesmo cache e
+        instrumentação), que ignora recargas posteriores. A cópia guarda o
+        próprio instantâneo: quem a recebe junto com um lote não depende do
+        histórico do publicador para detalhar ou agregar esse lote.
+        """
+        fixado = copy.copy(self)
+        fixado.calculadora = PrecoCalculadora(regras.tabela)
+        fixado.cupons = regras.cupons
+        fixado.regras = None
+        fixado.versao_regras = regras.versao
+        fixado.instantaneo = regras
+        fixado._fixado = None  # pylint: disable=protected-access
+        return fixado
+
+    def fixar(self, versao: Optional[int] = None) -> "PedidoService":
+        """
+        Serviço preso ao instantâneo em vigor (ou ao da ``versao`` informada,
+        se ainda estiver no histórico do publicador); sem regras versionadas,
+        ou se já fixado, o próprio serviço. A cópia do instantâneo em vigor é
+        reaproveitada enquanto ele não mudar. Para usar um lote depois de
+        precificado, prefira o serviço fixado com que ele foi precificado: a
+        versão pode ter saído do histórico.
+        """
+        if self.regras is None:
+            return self
+        if versao is not None and versao != self.regras.versao:
+            return self.com_regras(self.regras.instantaneo(versao))
+        regras = self.regras.atual()
+        fixado = self._fixado
+        if fixado is None or fixado[0] is not regras:
+            fixado = self._fixado = (regras, self.com_regras(regras))
+        return fixado[1]
 
-    def processar_pedido(self, pedido: Dict[str, Union[str, int, None]]) -> float:
+    def processar_pedido(self, pedido: EntradaPedido) -> float:
         """
         Processa o pedido (calcula preço base + descontos de cupom + arredondamento)
-        e retorna o valor final.
+        e retorna o valor final. Aceita um ``Pedido`` ou o dicionário equivalente.
         """
-        produto = pedido.get("produto")
-        quantidade = pedido.get("qtd", 0)
-        cupom = pedido.get("cupom")
-        cliente_nome = pedido.get("cliente")
+        if self.regras is not None:
+            return self.fixar().processar_pedido(pedido)
+        if self.instrumentacao is not None:
+            return self._processar_pedido_instrumentado(como_pedido(pedido), self.instrumentacao)
+
+        if isinstance(pedido, Pedido):
+            produto, quantidade, cupom = pedido.produto, pedido.qtd, pedido.cupom
+            cliente_nome = pedido.cliente
+        else:
+            produto = pedido.get("produto")
+            quantidade = pedido.get("qtd", 0)
+            cupom = pedido.get("cupom")
+            cliente_nome = pedido.get("cliente")
 
         if not produto or quantidade <= 0:
             # O cliente_nome pode ser None/Opcional no pedido.
@@ -30,36 +151,423 @@ class PedidoService:
             print(f"[ERRO] Pedido inválido {log_cliente}: quantidade 0 ou produto ausente.")
             return 0.0
 
-        # 1. Preço com descontos de quantidade
-        preco = self.calculadora.calcular_preco(produto, quantidade)
+        if self.clientes is not None and self.clientes.buscar(cliente_nome) is None:
+            print(f"[ERRO] Pedido recusado: cliente {cliente_nome!r} não cadastrado.")
+            return 0.0
+
+        preco = self._consultar_cache(produto, quantidade, cupom)
+        if preco is None:
+            # 1. Preço com descontos de quantidade
+            preco = self.calculadora.calcular_preco(produto, quantidade)
+
+            # 2. Aplicação de cupom
+            preco = self._aplicar_cupom(preco, cupom, produto)
+
+            # 3. Arredondamento final
+            preco = self._arredondar_valor(preco, produto)
+            self._guardar_cache(produto, quantidade, cupom, preco)
+
+        print(f"Pedido OK: {cliente_nome} | {produto} x{quantidade} => R${preco:.2f}")
+        return preco
+
+    def _processar_pedido_instrumentado(
+        self, pedido: Pedido, instr: Instrumentacao
+    ) -> float:
+        """Mesmo fluxo de ``processar_pedido``, medindo cada etapa e contando eventos."""
+        with instr.etapa("validacao"):
+            produto = pedido.produto
+            quantidade = pedido.qtd
+            cupom = pedido.cupom
+            cliente_nome = pedido.cliente
+            valido = bool(produto) and quantidade > 0
+
+        if not valido:
+            instr.contar("erro", STATUS_INVALIDO)
+            log_cliente = f"de {cliente_nome}" if cliente_nome else ""
+            print(f"[ERRO] Pedido inválido {log_cliente}: quantidade 0 ou produto ausente.")
+            return 0.0
+
+        if self.clientes is not None:
+            with instr.etapa("clientes"):
+                conhecido = self.clientes.buscar(cliente_nome) is not None
+            if not conhecido:
+                instr.contar("erro", STATUS_CLIENTE_DESCONHECIDO)
+                print(f"[ERRO] Pedido recusado: cliente {cliente_nome!r} não cadastrado.")
+                return 0.0
 
-        # 2. Aplicação de cupom
-        preco = self._aplicar_cupom(preco, cupom, produto)
+        instr.contar("produto", produto)
+        instr.contar("cupom", cupom)
+        if produto not in self.calculadora.tabela:
+            instr.contar("erro", STATUS_PRODUTO_DESCONHECIDO)
 
-        # 3. Arredondamento final
-        preco = self._arredondar_valor(preco, produto)
+        preco = None
+        if self.cache is not None:
+            with instr.etapa("cache"):
+                preco = self._consultar_cache(produto, quantidade, cupom)
+            instr.contar("cache", "falha" if preco is None else "acerto")
+        if preco is None:
+            with instr.etapa("preco_base"):
+                preco = self.calculadora.calcular_preco(produto, quantidade)
+            with instr.etapa("cupom"):
+                preco = self._aplicar_cupom(preco, cupom, produto)
+            with instr.etapa("arredondamento"):
+                preco = self._arredondar_valor(preco, produto)
+            self._guardar_cache(produto, quantidade, cupom, preco)
 
         print(f"Pedido OK: {cliente_nome} | {produto} x{quantidade} => R${preco:.2f}")
         return preco
 
+    def processar_pedidos(
+        self,
+        pedidos: Union[Iterable[EntradaPedido], LotePedidos],
+        registrar_log: bool = True,
+    ) -> ResultadoLote:
+        """
+        Processa um lote de pedidos de uma só vez, com as mesmas regras de
+        ``processar_pedido``, mas sem log por pedido: no máximo uma linha de
+        resumo é impressa ao final (nenhuma se ``registrar_log`` for False).
+        Aceita dicionários, ``Pedido`` ou um ``LotePedidos`` em colunas.
+        """
+        if self.regras is not None:
+            return self.fixar().processar_pedidos(pedidos, registrar_log)
+        dados_clientes = None
+        with self._etapa("lote.validacao"):
+            if self.clientes is not None:
+                pedidos = self._como_sequencia(pedidos)
+            status, indices, produtos, quantidades, cupons = self._separar_validos(pedidos)
+            valores = [0.0] * len(status)
+        if self.clientes is not None:
+            with self._etapa("lote.clientes"):
+                dados_clientes, colunas = self._juntar_clientes(
+                    pedidos, status, indices, produtos, quantidades, cupons
+                )
+                indices, produtos, quantidades, cupons = colunas
+
+        if self.cache is not None:
+            precos = self._precificar_colunas_com_cache(produtos, quantidades, cupons)
+        elif isinstance(pedidos, LotePedidos):
+            precos = self._precificar_lote(pedidos, indices, produtos)
+        else:
+            precos = self._precificar_colunas(produtos, quantidades, cupons)
+
+        tabela = self.calculadora.tabela
+        for indice, preco, produto in zip(indices, precos, produtos):
+            if produto not in tabela:
+                status[indice] = STATUS_PRODUTO_DESCONHECIDO
+            valores[indice] = preco
+
+        if self.instrumentacao is not None:
+            self._contar_lote(status, produtos, cupons)
+
+        total = sum(valores, 0.0)
+        if registrar_log:
+            print(
+                f"Lote processado: {len(indices)} pedidos precificados, "
+                f"{len(valores) - len(indices)} inválidos | TOTAL = R${total:.2f}"
+            )
+        return ResultadoLote(valores, status, total, self.versao_regras, dados_clientes)
+
+    def processar_pedidos_centavos(
+        self,
+        pedidos: Union[Iterable[EntradaPedido], LotePedidos],
+        registrar_log: bool = True,
+    ) -> ResultadoLoteCentavos:
+        """
+        Versão exata de ``processar_pedidos``: preço, cupom e arredondamento
+        são calculados em decimal, com as mesmas regras por produto, e os
+        valores e o TOTAL são acumulados em centavos inteiros.
+        """
+        if self.regras is not None:
+            return self.fixar().processar_pedidos_centavos(pedidos, registrar_log)
+        dados_clientes = None
+        if self.clientes is not None:
+            pedidos = self._como_sequencia(pedidos)
+        status, indices, produtos, quantidades, cupons = self._separar_validos(pedidos)
+        valores = [0] * len(status)
+        if self.clientes is not None:
+            dados_clientes, colunas = self._juntar_clientes(
+                pedidos, status, indices, produtos, quantidades, cupons
+            )
+            indices, produtos, quantidades, cupons = colunas
+
+        calculadora = self.calculadora
+        tabela = calculadora.tabela
+        hoje = date.today()
+        for indice, produto, quantidade, cupom in zip(indices, produtos, quantidades, cupons):
+            if produto not in tabela:
+                status[indice] = STATUS_PRODUTO_DESCONHECIDO
+            preco = de_centavos(calculadora.calcular_preco_centavos(produto, quantidade))
+            preco = self.cupons.aplicar_decimal(preco, cupom, produto, hoje)
+            valores[indice] = self._arredondar_centavos(preco, produto)
+
+        total = sum(valores)
+        if registrar_log:
+            print(
+                f"Lote processado: {len(indices)} pedidos precificados, "
+                f"{len(valores) - len(indices)} inválidos | TOTAL = R${formatar_centavos(total)}"
+            )
+        return ResultadoLoteCentavos(
+            valores, status, total, self.versao_regras, dados_clientes
+        )
+
+    def precos_sem_cupom_centavos(
+        self, produtos: List[str], quantidades: List[int], exato: bool = False
+    ) -> List[int]:
+        """
+        Preço de cada pedido sem cupom (faixas de quantidade e arredondamento
+        aplicados), em centavos. Comparado ao valor final, dá o desconto
+        concedido pelos cupons. Com ``exato``, segue o cálculo em decimal.
+        """
+        if self.regras is not None:
+            return self.fixar().precos_sem_cupom_centavos(produtos, quantidades, exato)
+        if exato:
+            arredondar_centavos = self._arredondar_centavos
+            centavos = self.calculadora.calcular_precos_centavos(produtos, quantidades)
+            return [
+                arredondar_centavos(de_centavos(preco), produto)
+                for preco, produto in zip(centavos, produtos)
+            ]
+        precos = self.calculadora.calcular_precos(produtos, quantidades)
+        if hasattr(precos, "tolist"):
+            precos = precos.tolist()
+        arredondar = self._arredondar_valor
+        return [round(arredondar(preco, produto) * 100) for preco, produto in zip(precos, produtos)]
+
+    def _precificar_colunas(
+        self, produtos: List[str], quantidades: List[int], cupons: List[Optional[str]]
+    ) -> List[float]:
+        """Preço base, cupom e arredondamento de uma coluna de pedidos válidos."""
+        with self._etapa("lote.preco_base"):
+            precos = self.calculadora.calcular_precos(produtos, quantidades)
+            if hasattr(precos, "tolist"):
+                precos = precos.tolist()
+
+        with self._etapa("lote.cupom"):
+            precos = self.cupons.aplicar_lote(precos, cupons, produtos)
+
+        with self._etapa("lote.arredondamento"):
+            arredondar = self._arredondar_valor
+            return [arredondar(preco, produto) for preco, produto in zip(precos, produtos)]
+
+    def _precificar_lote(
+        self, lote: LotePedidos, indices: List[int], produtos: List[str]
+    ) -> List[float]:
+        """
+        Versão de ``_precificar_colunas`` para um ``LotePedidos``: preço base e
+        cupons são calculados pelos códigos de produto e cupom do lote.
+        """
+        codigos_produto, codigos_cupom = lote.codigos_produto, lote.codigos_cupom
+        todos = len(indices) == len(lote)
+        with self._etapa("lote.preco_base"):
+            precos = self.calculadora.calcular_precos_lote(lote)
+            if hasattr(precos, "tolist"):
+                precos = precos.tolist()
+            if not todos:
+                precos = [precos[indice] for indice in indices]
+                codigos_produto = [codigos_produto[indice] for indice in indices]
+                codigos_cupom = [codigos_cupom[indice] for indice in indices]
+
+        with self._etapa("lote.cupom"):
+            precos = self.cupons.aplicar_lote_codificado(
+                precos, codigos_cupom, codigos_produto, lote.nomes
+            )
+
+        with self._etapa("lote.arredondamento"):
+            arredondar = self._arredondar_valor
+            return [arredondar(preco, produto) for preco, produto in zip(precos, produtos)]
+
+    def _precificar_colunas_com_cache(
+        self, produtos: List[str], quantidades: List[int], cupons: List[Optional[str]]
+    ) -> List[float]:
+        """
+        Igual a ``_precificar_colunas``, mas só precifica as linhas ausentes do
+        cache, uma vez por combinação distinta; as demais vêm direto do cache.
+        Como em ``processar_pedido``, produtos desconhecidos não passam pelo
+        cache, para que não expulsem os preços reais.
+        """
+        cache = self.cache
+        tabela = self.calculadora.tabela
+        versao = self._versao_regras()
+        precos: List[Optional[float]] = []
+        faltantes: Dict[Tuple[str, int, Optional[str]], List[int]] = {}
+        with self._etapa("lote.cache"):
+            for posicao, chave in enumerate(zip(produtos, quantidades, cupons)):
+                preco = cache.obter(chave, versao) if chave[0] in tabela else None
+                if preco is None:
+                    faltantes.setdefault(chave, []).append(posicao)
+                precos.append(preco)
+
+        if faltantes:
+            chaves = list(faltantes)
+            calculados = self._precificar_colunas(
+                [chave[0] for chave in chaves],
+                [chave[1] for chave in chaves],
+                [chave[2] for chave in chaves],
+            )
+            for chave, preco in zip(chaves, calculados):
+                if chave[0] in tabela:
+                    cache.guardar(chave, preco, versao)
+                for posicao in faltantes[chave]:
+                    precos[posicao] = preco
+        return precos
+
+    def _versao_regras(self) -> Tuple:
+        """
+        Versão das regras de preço em vigor, usada como chave de validade do
+        cache: muda quando a tabela de tarifas ou o motor de cupons são trocados
+        e, se algum cupom tem período de validade, também a cada dia.
+        """
+        cupons = self.cupons
+        return (
+            self.calculadora.tabela.versao,
+            cupons.versao,
+            date.today() if cupons.tem_validade else None,
+        )
+
+    def _consultar_cache(
+        self, produto: str, quantidade: int, cupom: Optional[str]
+    ) -> Optional[float]:
+        """Preço em cache do pedido, ou None sem cache, sem acerto ou com produto desconhecido."""
+        if self.cache is None or produto not in self.calculadora.tabela:
+            return None
+        return self.cache.obter((produto, quantidade, cupom), self._versao_regras())
+
+    def _guardar_cache(
+        self, produto: str, quantidade: int, cupom: Optional[str], preco: float
+    ) -> None:
+        """Guarda o preço do pedido no cache, se houver um e o produto for conhecido."""
+        if self.cache is not None and produto in self.calculadora.tabela:
+            self.cache.guardar((produto, quantidade, cupom), preco, self._versao_regras())
+
+    def _etapa(self, nome: str) -> ContextManager[None]:
+        """Mede a etapa quando há instrumentação; caso contrário, não faz nada."""
+        if self.instrumentacao is None:
+            return _SEM_MEDICAO
+        return self.instrumentacao.etapa(nome)
+
+    def _contar_lote(
+        self, status: List[str], produtos: List[str], cupons: List[Optional[str]]
+    ) -> None:
+        """Atualiza os contadores de produto, cupom e erro com o lote inteiro."""
+        self.instrumentacao.contar_varios("produto", produtos)
+        self.instrumentacao.contar_varios("cupom", cupons)
+        self.instrumentacao.contar_varios("erro", [s for s in status if s != STATUS_OK])
+
     @staticmethod
-    def _aplicar_cupom(preco: float, cupom: Optional[str], produto: str) -> float:
+    def _como_sequencia(
+        pedidos: Union[Iterable[EntradaPedido], LotePedidos]
+    ) -> Union[Sequence[EntradaPedido], LotePedidos]:
+        """Materializa o lote, que é percorrido duas vezes quando há junção de clientes."""
+        if isinstance(pedidos, (list, tuple, LotePedidos)):
+            return pedidos
+        return list(pedidos)
+
+    def _juntar_clientes(
+        self,
+        pedidos: Union[Sequence[EntradaPedido], LotePedidos],
+        status: List[str],
+        indices: List[int],
+        produtos: List[str],
+        quantidades: List[int],
+        cupons: List[Optional[str]],
+    ) -> Tuple[
+        List[Optional[DadosCliente]],
+        Tuple[List[int], List[str], List[int], List[Optional[str]]],
+    ]:
         """
-        Aplica descontos de cupom percentuais ou fixos, se o cupom for conhecido.
+        Junta o lote ao índice de clientes. Retorna os dados do cliente de cada
+        linha e as colunas de pedidos válidos sem os de clientes desconhecidos,
+        cujo status passa a ``CLIENTE_DESCONHECIDO``.
         """
-        if not cupom:
-            return preco
+        if isinstance(pedidos, LotePedidos):
+            nomes = pedidos.clientes
+        else:
+            nomes = [
+                pedido.cliente if isinstance(pedido, Pedido) else pedido.get("cliente")
+                for pedido in pedidos
+            ]
+        dados = self.clientes.juntar(nomes)
+        mantidos = [k for k, indice in enumerate(indices) if dados[indice] is not None]
+        if len(mantidos) == len(indices):
+            return dados, (indices, produtos, quantidades, cupons)
+        for indice in indices:
+            if dados[indice] is None:
+                status[indice] = STATUS_CLIENTE_DESCONHECIDO
+        return dados, (
+            [indices[k] for k in mantidos],
+            [produtos[k] for k in mantidos],
+            [quantidades[k] for k in mantidos],
+            [cupons[k] for k in mantidos],
+        )
 
-        descontos = {
-            "MEGA10": lambda p: p * 0.9,
-            "NOVO5": lambda p: p * 0.95,
-            # LUB2 é um desconto fixo de 2.00, mas SÓ para lubrificante
-            "LUB2": lambda p: p - 2.0 if produto == "lubrificante" else p,
-        }
+    @staticmethod
+    def _separar_validos(
+        pedidos: Union[Iterable[EntradaPedido], LotePedidos]
+    ) -> Tuple[List[str], List[int], List[str], List[int], List[Optional[str]]]:
+        """
+        Valida o lote e separa em colunas os pedidos precificáveis. Retorna o
+        status de cada linha e, para os válidos, índice, produto, quantidade e cupom.
+        """
+        if isinstance(pedidos, LotePedidos):
+            return PedidoService._separar_validos_colunas(pedidos)
 
-        # Retorna a função de desconto do dicionário, ou uma função que retorna o preço
-        # original se o cupom não for encontrado.
-        return descontos.get(cupom, lambda p: p)(preco)
+        status: List[str] = []
+        indices: List[int] = []
+        produtos: List[str] = []
+        quantidades: List[int] = []
+        cupons: List[Optional[str]] = []
+
+        for indice, pedido in enumerate(pedidos):
+            if isinstance(pedido, Pedido):
+                produto, quantidade, cupom = pedido.produto, pedido.qtd, pedido.cupom
+            else:
+                produto = pedido.get("produto")
+                quantidade = pedido.get("qtd", 0)
+                cupom = pedido.get("cupom")
+            if not produto or quantidade <= 0:
+                status.append(STATUS_INVALIDO)
+                continue
+            status.append(STATUS_OK)
+            indices.append(indice)
+            produtos.append(produto)
+            quantidades.append(quantidade)
+            cupons.append(cupom)
+
+        return status, indices, produtos, quantidades, cupons
+
+    @staticmethod
+    def _separar_validos_colunas(
+        lote: LotePedidos,
+    ) -> Tuple[List[str], List[int], List[str], List[int], List[Optional[str]]]:
+        """Versão de ``_separar_validos`` que lê direto das colunas de um ``LotePedidos``."""
+        nomes = lote.nomes
+        status: List[str] = []
+        indices: List[int] = []
+        produtos: List[str] = []
+        quantidades: List[int] = []
+        cupons: List[Optional[str]] = []
+
+        for indice, (codigo_produto, quantidade, codigo_cupom) in enumerate(
+            zip(lote.codigos_produto, lote.quantidades, lote.codigos_cupom)
+        ):
+            produto = nomes[codigo_produto]
+            if not produto or quantidade <= 0:
+                status.append(STATUS_INVALIDO)
+                continue
+            status.append(STATUS_OK)
+            indices.append(indice)
+            produtos.append(produto)
+            quantidades.append(quantidade)
+            cupons.append(nomes[codigo_cupom])
+
+        return status, indices, produtos, quantidades, cupons
+
+    def _aplicar_cupom(self, preco: float, cupom: Optional[str], produto: str) -> float:
+        """
+        Aplica descontos de cupom percentuais ou fixos, se o cupom for conhecido.
+        As regras ficam registradas no motor de cupons do serviço.
+        """
+        return self.cupons.aplicar(preco, cupom, produto)
 
     @staticmethod
     def _arredondar_valor(preco: float, produto: str) -> float:
@@ -74,4 +582,18 @@ class PedidoService:
             case _:
                 # Implementação de truncamento:
                 # Multiplica por 100, pega a parte inteira, e divide por 100
-                return float(int(preco * 100) / 100.0)
\ No newline at end of file
+                return float(int(preco * 100) / 100.0)
+
+    @staticmethod
+    def _arredondar_centavos(preco: Decimal, produto: str) -> int:
+        """
+        Versão exata de ``_arredondar_valor``: mesmas regras por produto,
+        com o resultado em centavos inteiros.
+        """
+        match produto:
+            case "diesel":
+                return para_reais_inteiros(preco)
+            case "gasolina":
+                return para_centavos(preco)
+            case _:
+                return truncar_centavos(preco)
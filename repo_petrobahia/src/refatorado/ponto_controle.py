@@ -0,0 +1,168 @@
+"""
+Módulo de pontos de controle (checkpoints) do processamento em fluxo.
+
+A cada ``a_cada`` lotes concluídos, grava de forma atômica a posição da
+entrada (em bytes, após o último pedido concluído), os pedidos já
+precificados, o TOTAL acumulado, o tamanho da saída e o estado dos
+agregados. Na retomada, a saída é truncada para o tamanho registrado e a
+entrada volta à posição salva, então cada pedido aparece exatamente uma vez
+na saída, mesmo que o processo tenha caído depois do ponto de controle.
+"""
+import json
+import os
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Union
+
+from refatorado.agregacao import Agregador
+from refatorado.gravacao_atomica import gravar_atomicamente
+
+FORMATO = 1
+INTERVALO_PADRAO = 10  # lotes entre pontos de controle
+
+
+class PontoControle(NamedTuple):
+    """Estado de um processamento em fluxo após o último lote registrado."""
+
+    entrada: str
+    exato: bool
+    posicao: int = 0  # bytes da entrada já consumidos
+    pedidos: int = 0
+    total: Union[float, int] = 0  # reais (float) ou, com ``exato``, centavos
+    saida_bytes: int = 0
+    agregados: Optional[Dict[str, Any]] = None  # ``Agregador.para_dict()``
+
+    def para_dict(self) -> Dict[str, Any]:
+        """Estado serializável em JSON."""
+        return {"formato": FORMATO, **self._asdict()}
+
+    @classmethod
+    def de_dict(cls, dados: Dict[str, Any]) -> "PontoControle":
+        """Reconstrói o ponto de controle a partir de ``para_dict``."""
+        if dados.get("formato") != FORMATO:
+            raise ValueError(f"Formato de ponto de controle não suportado: {dados.get('formato')}")
+        return cls(**{campo: dados[campo] for campo in cls._fields if campo in dados})
+
+    def validar_retomada(self, entrada: str, exato: bool, agregar: bool) -> None:
+        """Confere se a execução retomada usa a mesma entrada e as mesmas opções."""
+        if os.path.abspath(self.entrada) != os.path.abspath(entrada):
+            raise ValueError(f"O ponto de controle é da entrada {self.entrada!r}.")
+        if self.exato != exato:
+            raise ValueError("O ponto de controle foi gravado com outro valor de --exato.")
+        if (self.agregados is not None) != agregar:
+            raise ValueError("O ponto de controle foi gravado com outro uso de --agregados.")
+
+
+def salvar_ponto_controle(caminho: str, ponto: PontoControle) -> None:
+    """Grava o ponto de controle de forma atômica."""
+    gravar_atomicamente(caminho, json.dumps(ponto.para_dict(), ensure_ascii=False))
+
+
+def carregar_ponto_controle(caminho: str) -> Optional[PontoControle]:
+    """Lê o ponto de controle, ou None se não houver um."""
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, "r", encoding="utf-8") as arquivo:
+        return PontoControle.de_dict(json.load(arquivo))
+
+
+def abrir_saida_retomada(caminho: str, tamanho: int) -> TextIO:
+    """
+    Abre a saída para continuar após o ponto de controle, descartando o que
+    foi escrito depois dele (lotes que serão precificados de novo).
+    """
+    if os.path.getsize(caminho) < tamanho:
+        raise ValueError(f"A saída {caminho!r} é menor que a registrada no ponto de controle.")
+    saida = open(caminho, "r+", encoding="utf-8")  # pylint: disable=consider-using-with
+    saida.truncate(tamanho)
+    saida.seek(tamanho)
+    return saida
+
+
+class PontosControle:
+    """
+    Registra os lotes concluídos de um processamento em fluxo e grava um
+    ponto de controle a cada ``a_cada`` lotes. ``leitor`` é a entrada
+    posicionada, cuja ``posicao`` é anotada quando cada lote é lido: como os
+    lotes são concluídos na ordem de leitura (também em paralelo), a posição
+    gravada é sempre a do fim do último lote já escrito na saída.
+    """
+
+    def __init__(
+        self,
+        caminho: str,
+        leitor: Any,
+        inicial: PontoControle,
+        a_cada: int = INTERVALO_PADRAO,
+    ) -> None:
+        if a_cada <= 0:
+            raise ValueError("a_cada deve ser positivo.")
+        self.caminho = caminho
+        self.leitor = leitor
+        self.ponto = inicial
+        self.a_cada = a_cada
+        self.gravacoes = 0
+        self._posicoes: Deque[int] = deque()
+        self._posicao = inicial.posicao
+        self._pedidos = inicial.pedidos
+        self._sem_gravar = 0
+
+    @property
+    def total(self) -> Union[float, int]:
+        """TOTAL acumulado até o ponto de controle de partida."""
+        return self.ponto.total
+
+    def marcar(self, lotes: Iterable[List[Any]]) -> Iterator[List[Any]]:
+        """Repassa os lotes, anotando a posição da entrada ao fim de cada um."""
+        for lote in lotes:
+            self._posicoes.append(self.leitor.posicao)
+            yield lote
+
+    def concluir_lote(
+        self,
+        tamanho: int,
+        total: Union[float, int],
+        saida: Optional[TextIO] = None,
+        agregador: Optional[Agregador] = None,
+    ) -> None:
+        """Registra o próximo lote concluído e grava o ponto de controle, se for a hora."""
+        self._posicao = self._posicoes.popleft()
+        self._pedidos += tamanho
+        self._sem_gravar += 1
+        if self._sem_gravar >= self.a_cada:
+            self.gravar(total, saida, agregador)
+
+    def gravar(
+        self,
+        total: Union[float, int],
+        saida: Optional[TextIO] = None,
+        agregador: Optional[Agregador] = None,
+    ) -> PontoControle:
+        """
+        Grava o estado após o último lote concluído. A saída é descarregada
+        (e sincronizada em disco) antes, para que o ponto de controle nunca
+        registre bytes que ainda não foram escritos.
+        """
+        saida_bytes = 0
+        if saida is not None:
+            saida.flush()
+            try:
+                os.fsync(saida.fileno())
+            except (AttributeError, OSError, ValueError):
+                pass  # saída em memória ou sem descritor de arquivo
+            saida_bytes = saida.tell()
+        self.ponto = self.ponto._replace(
+            posicao=self._posicao,
+            pedidos=self._pedidos,
+            total=total,
+            saida_bytes=saida_bytes,
+            agregados=agregador.para_dict() if agregador is not None else None,
+        )
+        salvar_ponto_controle(self.caminho, self.ponto)
+        self.gravacoes += 1
+        self._sem_gravar = 0
+        return self.ponto
+
+    def encerrar(self) -> None:
+        """Remove o ponto de controle ao fim de um processamento concluído."""
+        if os.path.exists(self.caminho):
+            os.remove(self.caminho)
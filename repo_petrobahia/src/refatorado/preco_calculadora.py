@@ -1,5 +1,10 @@
 """Módulo de serviço para cálculo do preço base de produtos e descontos por quantidade."""
-from typing import Dict
+from itertools import repeat
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from refatorado.dinheiro import para_centavos
+from refatorado.pedido import LotePedidos
+from refatorado.tabela_tarifas import FaixaDesconto, TabelaTarifas, np
 
 
 # pylint: disable=R0903
@@ -7,6 +12,10 @@ class PrecoCalculadora:
     """
     Responsável por calcular o preço de produtos aplicando descontos por quantidade.
     Seguindo o Princípio da Responsabilidade Única (SRP).
+
+    ``BASES`` e ``FAIXAS`` são compilados em uma ``TabelaTarifas`` na criação
+    da instância: alterá-los depois não muda as calculadoras já criadas até
+    que ``recompilar`` seja chamado.
     """
 
     BASES: Dict[str, float] = {
@@ -16,46 +25,93 @@ class PrecoCalculadora:
         "lubrificante": 25.00,
     }
 
+    # Faixas de desconto por quantidade (lubrificante não tem desconto).
+    FAIXAS: Dict[str, Tuple[FaixaDesconto, ...]] = {
+        "diesel": (FaixaDesconto(500, 0.95), FaixaDesconto(1000, 0.9)),
+        "gasolina": (FaixaDesconto(200, deducao=100.0),),
+        "etanol": (FaixaDesconto(80, 0.97),),
+    }
+
+    def __init__(self, tabela: Optional[TabelaTarifas] = None) -> None:
+        self.tabela = tabela or TabelaTarifas(self.BASES, self.FAIXAS)
+
+    @classmethod
+    def de_arquivo(cls, caminho: str) -> "PrecoCalculadora":
+        """Cria a calculadora com a tabela de tarifas de um arquivo JSON."""
+        return cls(TabelaTarifas.de_arquivo(caminho))
+
+    def recompilar(self) -> None:
+        """
+        Recompila a tabela a partir dos ``BASES`` e ``FAIXAS`` atuais,
+        substituindo inclusive uma tabela recebida no construtor. A tabela
+        nova tem outra versão, o que invalida os caches de preço.
+        """
+        self.tabela = TabelaTarifas(self.BASES, self.FAIXAS)
+
     def calcular_preco(self, produto: str, quantidade: int) -> float:
         """Calcula o preço total de acordo com produto e quantidade."""
-        if produto not in self.BASES:
+        if produto not in self.tabela:
             print(f"Produto '{produto}' desconhecido. Retornando 0.")
             return 0.0
 
-        preco_base = self.BASES[produto]
-        preco_total = preco_base * quantidade
-
-        match produto:
-            case "diesel":
-                preco_total = self._aplicar_desconto_diesel(preco_total, quantidade)
-            case "gasolina":
-                preco_total = self._aplicar_desconto_gasolina(preco_total, quantidade)
-            case "etanol":
-                preco_total = self._aplicar_desconto_etanol(preco_total, quantidade)
-            case "lubrificante":
-                pass  # sem desconto por quantidade
-
-        return round(preco_total, 2)
-
-    @staticmethod
-    def _aplicar_desconto_diesel(preco_total: float, qtd: int) -> float:
-        """Aplica desconto de 5% ou 10% para diesel dependendo da quantidade."""
-        if qtd > 1000:
-            return preco_total * 0.9  # 10% de desconto
-        if qtd > 500:
-            return preco_total * 0.95  # 5% de desconto
-        return preco_total
-
-    @staticmethod
-    def _aplicar_desconto_gasolina(preco_total: float, qtd: int) -> float:
-        """Aplica desconto fixo de R$100.00 para gasolina acima de 200."""
-        if qtd > 200:
-            return preco_total - 100.0
-        return preco_total
-
-    @staticmethod
-    def _aplicar_desconto_etanol(preco_total: float, qtd: int) -> float:
-        """Aplica desconto de 3% para etanol acima de 80."""
-        if qtd > 80:
-            return preco_total * 0.97
-        return preco_total
\ No newline at end of file
+        return round(self.tabela.preco_total(produto, quantidade), 2)
+
+    def calcular_precos(self, produtos: Sequence[str], quantidades: Sequence[int]):
+        """
+        Calcula o preço total de um lote de pedidos em formato colunar.
+
+        Retorna um ``numpy.ndarray`` quando o NumPy está disponível e uma
+        ``list[float]`` caso contrário. Os valores são idênticos aos de
+        ``calcular_preco`` item a item; produtos desconhecidos valem 0.0 e
+        não geram log.
+        """
+        if len(produtos) != len(quantidades):
+            raise ValueError("produtos e quantidades devem ter o mesmo tamanho.")
+
+        if np is None:
+            return [self._preco_total(p, q) for p, q in zip(produtos, quantidades)]
+
+        totais = self.tabela.precos_totais_numpy(produtos, quantidades)
+        # np.round não arredonda como o round() do Python em todos os casos;
+        # o map mantém o laço em C e garante o mesmo resultado do caminho escalar.
+        arredondados: List[float] = list(map(round, totais.tolist(), repeat(2)))
+        return np.array(arredondados, dtype=np.float64)
+
+    def calcular_precos_lote(self, lote: LotePedidos):
+        """
+        Versão de ``calcular_precos`` que lê direto as colunas de um
+        ``LotePedidos``, usando os códigos de produto do lote. Pedidos sem
+        produto ou desconhecidos valem 0.0.
+        """
+        if np is None:
+            return self.calcular_precos(lote.produtos, lote.quantidades)
+        nomes = ["" if nome is None else nome for nome in lote.nomes]
+        totais = self.tabela.precos_totais_codificados_numpy(
+            lote.codigos_produto, nomes, lote.quantidades
+        )
+        arredondados: List[float] = list(map(round, totais.tolist(), repeat(2)))
+        return np.array(arredondados, dtype=np.float64)
+
+    def calcular_preco_centavos(self, produto: str, quantidade: int) -> int:
+        """
+        Versão exata de ``calcular_preco``: calcula em decimal e retorna
+        centavos inteiros, com o mesmo arredondamento para duas casas.
+        Produtos desconhecidos valem 0, sem log.
+        """
+        if produto not in self.tabela:
+            return 0
+        return para_centavos(self.tabela.preco_total_decimal(produto, quantidade))
+
+    def calcular_precos_centavos(
+        self, produtos: Sequence[str], quantidades: Sequence[int]
+    ) -> List[int]:
+        """Versão em lote de ``calcular_preco_centavos``."""
+        if len(produtos) != len(quantidades):
+            raise ValueError("produtos e quantidades devem ter o mesmo tamanho.")
+        return [self.calcular_preco_centavos(p, q) for p, q in zip(produtos, quantidades)]
+
+    def _preco_total(self, produto: str, quantidade: int) -> float:
+        """Calcula o preço com descontos por quantidade, sem efeitos colaterais."""
+        if produto not in self.tabela:
+            return 0.0
+        return round(self.tabela.preco_total(produto, quantidade), 2)
@@ -0,0 +1,112 @@
+"""Módulo de precificação de lotes de pedidos em paralelo, com um pool de processos."""
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Iterable, Iterator, List, Optional, Tuple, Union
+
+from refatorado.agregacao import Agregador
+from refatorado.pedido import PedidoDict
+from refatorado.pedido_service import PedidoService, ResultadoLote, ResultadoLoteCentavos
+from refatorado.regras_precos import RegrasPreco
+
+# Serviço de cada processo trabalhador, criado uma única vez pelo initializer.
+_SERVICE_DO_PROCESSO: Optional[PedidoService] = None
+
+
+def _inicializar_processo(service: PedidoService) -> None:
+    """Guarda no processo trabalhador a cópia do serviço recebida do processo principal."""
+    global _SERVICE_DO_PROCESSO  # pylint: disable=global-statement
+    _SERVICE_DO_PROCESSO = service
+
+
+def _precificar_lote(
+    lote: List[PedidoDict],
+    exato: bool = False,
+    agregar: bool = False,
+    regras: Optional[RegrasPreco] = None,
+) -> Tuple[Union[ResultadoLote, ResultadoLoteCentavos], Optional[Agregador]]:
+    """
+    Precifica um lote dentro do processo trabalhador, sem log, com o instantâneo
+    de ``regras`` vigente no processo principal quando o lote foi enviado. Com
+    ``agregar``, devolve também os totais parciais do lote, para mesclar no
+    processo principal.
+    """
+    service = _SERVICE_DO_PROCESSO
+    if regras is not None:
+        service = service.com_regras(regras)
+    if exato:
+        resultado = service.processar_pedidos_centavos(lote, registrar_log=False)
+    else:
+        resultado = service.processar_pedidos(lote, registrar_log=False)
+    if not agregar:
+        return resultado, None
+    parcial = Agregador()
+    parcial.adicionar_lote(lote, resultado, service)
+    return resultado, parcial
+
+
+def precificar_em_paralelo(
+    lotes: Iterable[List[PedidoDict]],
+    service: PedidoService,
+    workers: Optional[int] = None,
+    lotes_pendentes: Optional[int] = None,
+    exato: bool = False,
+    agregador: Optional[Agregador] = None,
+) -> Iterator[Tuple[List[PedidoDict], Union[ResultadoLote, ResultadoLoteCentavos]]]:
+    """
+    Precifica os lotes em um pool de ``workers`` processos e devolve cada lote
+    com seu resultado, na ordem de entrada. No máximo ``lotes_pendentes``
+    lotes (padrão: 2 por processo) ficam em voo, então a memória não cresce
+    com o tamanho do fluxo. O serviço é copiado uma vez para cada processo.
+    Com ``exato``, os lotes são precificados em centavos inteiros. Com um
+    ``agregador``, cada processo agrega o próprio lote e os totais parciais
+    são mesclados nele, na ordem de entrada. Com regras versionadas, cada
+    lote leva o instantâneo em vigor no momento do envio.
+    """
+    for lote, resultado, _ in precificar_em_paralelo_fixados(
+        lotes, service, workers, lotes_pendentes, exato, agregador
+    ):
+        yield lote, resultado
+
+
+def precificar_em_paralelo_fixados(
+    lotes: Iterable[List[PedidoDict]],
+    service: PedidoService,
+    workers: Optional[int] = None,
+    lotes_pendentes: Optional[int] = None,
+    exato: bool = False,
+    agregador: Optional[Agregador] = None,
+) -> Iterator[
+    Tuple[List[PedidoDict], Union[ResultadoLote, ResultadoLoteCentavos], PedidoService]
+]:
+    """
+    Igual a ``precificar_em_paralelo``, mas gera também o serviço fixado no
+    instantâneo com que cada lote foi precificado, que continua válido mesmo
+    depois de muitas recargas das regras.
+    """
+    workers = workers or os.cpu_count() or 1
+    limite = lotes_pendentes or 2 * workers
+    pendentes: Deque[Tuple[List[PedidoDict], Future, PedidoService]] = deque()
+    agregar = agregador is not None
+
+    def concluir(
+        lote_pronto: List[PedidoDict], futuro: Future, fixado: PedidoService
+    ) -> Tuple[List[PedidoDict], Union[ResultadoLote, ResultadoLoteCentavos], PedidoService]:
+        resultado, parcial = futuro.result()
+        if parcial is not None:
+            agregador.mesclar(parcial)
+        return lote_pronto, resultado, fixado
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_inicializar_processo,
+        initargs=(service,),
+    ) as executor:
+        for lote in lotes:
+            fixado = service.fixar()
+            futuro = executor.submit(_precificar_lote, lote, exato, agregar, fixado.instantaneo)
+            pendentes.append((lote, futuro, fixado))
+            if len(pendentes) >= limite:
+                yield concluir(*pendentes.popleft())
+        while pendentes:
+            yield concluir(*pendentes.popleft())
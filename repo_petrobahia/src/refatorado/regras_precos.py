@@ -0,0 +1,231 @@
+"""
+Módulo das regras de preço versionadas: tabela de tarifas e motor de cupons
+publicados juntos como um instantâneo imutável, que pode ser trocado em
+execução (copy-on-write) sem travar quem está precificando.
+
+O arquivo de regras é um JSON com as chaves opcionais ``tarifas`` (formato de
+``TabelaTarifas.de_dict``) e ``cupons`` (formato de ``MotorCupons.de_dict``);
+a parte ausente continua a do instantâneo anterior.
+"""
+import argparse
+import json
+import os
+import threading
+from types import TracebackType
+from typing import Dict, NamedTuple, Optional, Tuple, Type
+
+from refatorado.motor_cupons import MotorCupons
+from refatorado.preco_calculadora import PrecoCalculadora
+from refatorado.tabela_tarifas import TabelaTarifas
+
+# Instantâneos recentes mantidos para consulta por versão (ex.: lotes ainda em voo).
+HISTORICO = 8
+
+
+class RegrasPreco(NamedTuple):
+    """Instantâneo imutável das regras de preço, identificado por ``versao``."""
+
+    versao: int
+    tabela: TabelaTarifas
+    cupons: MotorCupons
+
+
+class PublicadorRegras:
+    """
+    Mantém a referência ao instantâneo de regras em vigor. Leitores chamam
+    ``atual()`` uma vez por pedido ou lote e usam sempre o mesmo instantâneo,
+    sem trava: publicar monta um instantâneo novo e troca a referência numa
+    única atribuição, então quem já pegou o anterior termina com ele.
+
+    Com ``caminho`` e ``verificar_a_cada`` (segundos), uma thread vigia confere
+    o arquivo a cada intervalo e, se ele mudou, lê, compila e publica as regras
+    novas; ``atual()`` é só uma leitura, sem ``stat`` nem leitura de arquivo no
+    caminho de quem precifica. Um arquivo inválido não derruba ninguém: o
+    instantâneo anterior segue em vigor e o erro é registrado. ``parar()`` (ou
+    o fim do bloco ``with``) encerra a vigia.
+    """
+
+    def __init__(
+        self,
+        tabela: Optional[TabelaTarifas] = None,
+        cupons: Optional[MotorCupons] = None,
+        caminho: Optional[str] = None,
+        verificar_a_cada: Optional[float] = None,
+    ) -> None:
+        if verificar_a_cada is not None and caminho is None:
+            raise ValueError("verificar_a_cada exige o caminho do arquivo de regras.")
+        if verificar_a_cada is not None and verificar_a_cada <= 0:
+            raise ValueError("verificar_a_cada deve ser positivo.")
+        self.caminho = caminho
+        self.verificar_a_cada = verificar_a_cada
+        self._trava = threading.Lock()  # só entre quem publica; leitores não a usam
+        self._trava_arquivo = threading.Lock()  # uma recarga do arquivo por vez
+        self._parar = threading.Event()
+        self._vigia: Optional[threading.Thread] = None
+        self._assinatura: Optional[Tuple[int, int]] = None
+        self._atual = RegrasPreco(
+            1, tabela or PrecoCalculadora().tabela, cupons or MotorCupons()
+        )
+        self._historico: Dict[int, RegrasPreco] = {1: self._atual}
+        if caminho is not None:
+            self.recarregar()
+        if verificar_a_cada is not None:
+            self._vigia = threading.Thread(
+                target=self._vigiar, name="vigia-regras", daemon=True
+            )
+            self._vigia.start()
+
+    @classmethod
+    def de_arquivo(
+        cls, caminho: str, verificar_a_cada: Optional[float] = None
+    ) -> "PublicadorRegras":
+        """Cria o publicador com as regras do arquivo, recarregando-as se ele mudar."""
+        return cls(caminho=caminho, verificar_a_cada=verificar_a_cada)
+
+    def __getstate__(self):
+        # Travas e threads não são serializáveis; a cópia enviada a outro
+        # processo não vigia o arquivo (recebe os instantâneos de quem a enviou).
+        estado = self.__dict__.copy()
+        for atributo in ("_trava", "_trava_arquivo", "_parar", "_vigia"):
+            del estado[atributo]
+        return estado
+
+    def __setstate__(self, estado) -> None:
+        self.__dict__.update(estado)
+        self._trava = threading.Lock()
+        self._trava_arquivo = threading.Lock()
+        self._parar = threading.Event()
+        self._vigia = None
+
+    @property
+    def versao(self) -> int:
+        """Versão do instantâneo em vigor."""
+        return self._atual.versao
+
+    def atual(self) -> RegrasPreco:
+        """Instantâneo em vigor."""
+        return self._atual
+
+    def instantaneo(self, versao: int) -> RegrasPreco:
+        """Instantâneo da ``versao`` informada, entre os ``HISTORICO`` mais recentes."""
+        try:
+            return self._historico[versao]
+        except KeyError:
+            raise KeyError(f"Versão de regras {versao} fora do histórico.") from None
+
+    def publicar(
+        self, tabela: Optional[TabelaTarifas] = None, cupons: Optional[MotorCupons] = None
+    ) -> RegrasPreco:
+        """
+        Publica um instantâneo novo com a tabela e/ou os cupons informados (o
+        que faltar é mantido do anterior) e o retorna.
+        """
+        with self._trava:
+            anterior = self._atual
+            novo = RegrasPreco(
+                anterior.versao + 1, tabela or anterior.tabela, cupons or anterior.cupons
+            )
+            # Cópia do histórico: quem o consulta nunca vê um dicionário em mutação.
+            historico = dict(list(self._historico.items())[1 - HISTORICO :])
+            historico[novo.versao] = novo
+            self._historico = historico
+            self._atual = novo
+        return novo
+
+    def recarregar(self) -> RegrasPreco:
+        """Lê o arquivo de regras e publica o conteúdo como um instantâneo novo."""
+        if self.caminho is None:
+            raise ValueError("Publicador sem arquivo de regras.")
+        assinatura = _assinatura(self.caminho)
+        tabela, cupons = ler_regras(self.caminho)
+        if self._assinatura is None:
+            # Carga inicial: substitui as regras padrão sem criar uma versão nova.
+            novo = self._atual._replace(
+                tabela=tabela or self._atual.tabela, cupons=cupons or self._atual.cupons
+            )
+            self._historico = {novo.versao: novo}
+            self._atual = novo
+        else:
+            novo = self.publicar(tabela, cupons)
+        self._assinatura = assinatura
+        return novo
+
+    def recarregar_se_mudou(self) -> bool:
+        """Recarrega as regras se o arquivo mudou desde a última leitura."""
+        if self.caminho is None:
+            return False
+        with self._trava_arquivo:
+            if _assinatura(self.caminho) == self._assinatura:
+                return False
+            self.recarregar()
+        return True
+
+    def verificar(self) -> bool:
+        """
+        Uma verificação da vigia: recarrega o arquivo se ele mudou e, se ele
+        não puder ser lido, registra o erro e mantém as regras em vigor.
+        """
+        try:
+            return self.recarregar_se_mudou()
+        except (OSError, ValueError, KeyError, TypeError) as erro:
+            print(f"[ERRO] Regras de {self.caminho} não recarregadas: {erro}")
+            return False
+
+    def parar(self) -> None:
+        """Encerra a thread vigia, se houver uma."""
+        self._parar.set()
+        if self._vigia is not None:
+            self._vigia.join()
+            self._vigia = None
+
+    def _vigiar(self) -> None:
+        """Laço da thread vigia: confere o arquivo a cada ``verificar_a_cada`` segundos."""
+        while not self._parar.wait(self.verificar_a_cada):
+            self.verificar()
+
+    def __enter__(self) -> "PublicadorRegras":
+        return self
+
+    def __exit__(
+        self,
+        tipo: Optional[Type[BaseException]],
+        erro: Optional[BaseException],
+        rastro: Optional[TracebackType],
+    ) -> None:
+        self.parar()
+
+
+def ler_regras(caminho: str) -> Tuple[Optional[TabelaTarifas], Optional[MotorCupons]]:
+    """Lê o arquivo de regras e devolve a tabela e o motor de cupons (None se ausentes)."""
+    with open(caminho, "r", encoding="utf-8") as arquivo:
+        dados = json.load(arquivo)
+    if not isinstance(dados, dict) or not {"tarifas", "cupons"} & set(dados):
+        raise ValueError("O arquivo de regras deve ter as chaves 'tarifas' e/ou 'cupons'.")
+    tabela = TabelaTarifas.de_dict(dados["tarifas"]) if "tarifas" in dados else None
+    cupons = MotorCupons.de_dict(dados["cupons"]) if "cupons" in dados else None
+    return tabela, cupons
+
+
+def _assinatura(caminho: str) -> Tuple[int, int]:
+    """Data de modificação e tamanho do arquivo, para detectar mudanças sem lê-lo."""
+    estado = os.stat(caminho)
+    return estado.st_mtime_ns, estado.st_size
+
+
+def adicionar_argumentos_regras(parser: argparse.ArgumentParser, ajuda: str) -> None:
+    """Acrescenta ao parser as opções ``--regras`` (ajuda em ``ajuda``) e ``--intervalo-regras``."""
+    parser.add_argument("--regras", metavar="ARQUIVO", help=ajuda)
+    parser.add_argument(
+        "--intervalo-regras",
+        type=float,
+        default=1.0,
+        metavar="SEGUNDOS",
+        help="Intervalo entre verificações do arquivo de regras (padrão: 1 s).",
+    )
+
+
+def criar_publicador(args: argparse.Namespace) -> Optional[PublicadorRegras]:
+    """Publicador das regras pedidas em ``--regras``, ou None sem a opção."""
+    if not args.regras:
+        return None
+    return PublicadorRegras.de_arquivo(args.regras, args.intervalo_regras)
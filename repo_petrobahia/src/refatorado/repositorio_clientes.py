@@ -0,0 +1,92 @@
+"""Módulo do repositório de clientes indexado por CNPJ (SQLite)."""
+import ast
+import sqlite3
+from types import TracebackType
+from typing import Dict, Iterable, List, Optional, Type
+
+POLITICA_REJEITAR = "rejeitar"
+POLITICA_MESCLAR = "mesclar"
+POLITICAS = (POLITICA_REJEITAR, POLITICA_MESCLAR)
+
+_SQL_INSERIR = {
+    POLITICA_REJEITAR: "INSERT OR IGNORE INTO clientes (cnpj, nome, email) VALUES (?, ?, ?)",
+    POLITICA_MESCLAR: (
+        "INSERT INTO clientes (cnpj, nome, email) VALUES (?, ?, ?) "
+        "ON CONFLICT(cnpj) DO UPDATE SET nome = excluded.nome, email = excluded.email"
+    ),
+}
+
+
+class RepositorioClientes:
+    """
+    Armazena os clientes em uma tabela SQLite com o CNPJ como chave primária:
+    cadastro e consulta são buscas no índice, sem varrer o arquivo. Duplicados
+    são rejeitados (``rejeitar``) ou têm nome e email atualizados (``mesclar``).
+    """
+
+    def __init__(self, caminho: str = ":memory:") -> None:
+        self.caminho = caminho
+        self._conexao = sqlite3.connect(caminho)
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS clientes ("
+            "cnpj TEXT PRIMARY KEY, nome TEXT NOT NULL, email TEXT NOT NULL)"
+        )
+        self._conexao.commit()
+
+    def salvar(self, cliente: Dict[str, str], politica: str = POLITICA_REJEITAR) -> bool:
+        """Grava o cliente; retorna False se ele foi rejeitado por já existir."""
+        return self.salvar_lote([cliente], politica)[0]
+
+    def salvar_lote(
+        self, clientes: Iterable[Dict[str, str]], politica: str = POLITICA_REJEITAR
+    ) -> List[bool]:
+        """Grava os clientes em uma única transação e informa quais foram gravados."""
+        sql = _SQL_INSERIR[politica]
+        with self._conexao:
+            return [
+                self._conexao.execute(sql, (c["cnpj"], c["nome"], c["email"])).rowcount > 0
+                for c in clientes
+            ]
+
+    def buscar(self, cnpj: str) -> Optional[Dict[str, str]]:
+        """Retorna o cliente com o CNPJ informado, ou None."""
+        linha = self._conexao.execute(
+            "SELECT nome, email, cnpj FROM clientes WHERE cnpj = ?", (cnpj,)
+        ).fetchone()
+        if linha is None:
+            return None
+        return {"nome": linha[0], "email": linha[1], "cnpj": linha[2]}
+
+    def __contains__(self, cnpj: object) -> bool:
+        return (
+            self._conexao.execute("SELECT 1 FROM clientes WHERE cnpj = ?", (cnpj,)).fetchone()
+            is not None
+        )
+
+    def __len__(self) -> int:
+        return self._conexao.execute("SELECT COUNT(*) FROM clientes").fetchone()[0]
+
+    def importar_arquivo(self, caminho: str, politica: str = POLITICA_REJEITAR) -> int:
+        """
+        Importa um ``clientes.txt`` legado (um ``str(dict)`` por linha) e
+        retorna quantos registros foram gravados. Linhas repetidas são
+        tratadas pela política de duplicados.
+        """
+        with open(caminho, "r", encoding="utf-8") as arquivo:
+            clientes = (ast.literal_eval(linha) for linha in arquivo if linha.strip())
+            return sum(self.salvar_lote(clientes, politica))
+
+    def fechar(self) -> None:
+        """Fecha a conexão com o banco."""
+        self._conexao.close()
+
+    def __enter__(self) -> "RepositorioClientes":
+        return self
+
+    def __exit__(
+        self,
+        tipo: Optional[Type[BaseException]],
+        erro: Optional[BaseException],
+        rastro: Optional[TracebackType],
+    ) -> None:
+        self.fechar()
@@ -0,0 +1,335 @@
+"""
+Módulo de saída binária em colunas dos pedidos precificados, gravada em blocos.
+
+Com o ``pyarrow`` instalado, o formato padrão é o arquivo IPC do Arrow
+(``.arrow``), que pode ser mapeado em memória com
+``pyarrow.ipc.open_file(pyarrow.memory_map(caminho))``. Sem ele, usa-se o
+formato PBCOL abaixo, gravado só com ``array`` e ``struct`` e lido por
+``LeitorColunar``.
+
+Formato PBCOL (todos os inteiros em little-endian)::
+
+    arquivo  = MAGICA (8 bytes) + bloco*
+    bloco    = "<4sII": b"BLOC", linhas, bytes do corpo  (12 bytes)
+               + 4 bytes de preenchimento + corpo
+    corpo    = uma seção por coluna, na ordem de ``COLUNAS``
+    inteira  = linhas × int64
+    texto    = "<I" quantidade de nomes, e para cada nome "<I" tamanho + UTF-8,
+               preenchido com zeros até múltiplo de 8; depois linhas × uint32
+               com o índice do nome (``NULO`` = valor nulo), preenchido até 8
+
+Toda seção começa em um múltiplo de 8 bytes, então as colunas podem ser lidas
+direto do arquivo mapeado, sem cópia. Valores monetários são centavos inteiros.
+"""
+import mmap
+import struct
+import sys
+from array import array
+from decimal import Decimal
+from types import TracebackType
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Type, Union
+
+try:  # pyarrow é opcional: sem ele, usa-se o formato PBCOL.
+    import pyarrow as pa
+    from pyarrow import ipc
+except ImportError:  # pragma: no cover - depende do ambiente
+    pa = None
+    ipc = None
+
+from refatorado.dinheiro import CONTEXTO, para_centavos, para_decimal
+from refatorado.pedido import EntradaPedido, LotePedidos, como_pedido
+from refatorado.pedido_service import (
+    STATUS_OK,
+    PedidoService,
+    ResultadoLote,
+    ResultadoLoteCentavos,
+)
+
+FORMATO_ARROW = "arrow"
+FORMATO_PBCOL = "pbcol"
+
+MAGICA = b"PBCOL\x00\x01\x00"  # nome do formato, versão 1
+NULO = 0xFFFFFFFF
+
+COLUNAS_TEXTO = ("cliente", "produto", "cupom", "status")
+COLUNAS = (
+    "cliente",
+    "produto",
+    "cupom",
+    "qtd",
+    "preco_base_centavos",
+    "desconto_quantidade_centavos",
+    "desconto_cupom_centavos",
+    "valor_centavos",
+    "status",
+)
+
+_CABECALHO_BLOCO = struct.Struct("<4sII")
+_INICIO_BLOCO = b"BLOC"
+_TAMANHO = struct.Struct("<I")
+
+Colunas = Dict[str, list]
+
+
+def detalhar_lote(
+    lote: Union[List[EntradaPedido], LotePedidos],
+    resultado: Union[ResultadoLote, ResultadoLoteCentavos],
+    service: PedidoService,
+) -> Colunas:
+    """
+    Decompõe o valor de cada pedido de um lote precificado por ``service`` em
+    colunas: preço de tabela (preço base × quantidade), desconto por
+    quantidade (faixas e arredondamento), desconto de cupom e valor final,
+    todos em centavos, de modo que ``base - descontos = valor``. Pedidos que
+    não foram precificados ficam com zero.
+    """
+    # Mesmo instantâneo de regras usado para precificar o lote.
+    service = service.fixar(resultado.versao_regras)
+    exato = isinstance(resultado, ResultadoLoteCentavos)
+    pedidos = [como_pedido(pedido) for pedido in lote]
+    validos = [i for i, situacao in enumerate(resultado.status) if situacao == STATUS_OK]
+
+    valores = [0] * len(pedidos)
+    bases = [0] * len(pedidos)
+    descontos_quantidade = [0] * len(pedidos)
+    descontos_cupom = [0] * len(pedidos)
+    if validos:
+        sem_cupom = service.precos_sem_cupom_centavos(
+            [pedidos[i].produto for i in validos], [pedidos[i].qtd for i in validos], exato
+        )
+        tabela = service.calculadora.tabela
+        bases_decimais: Dict[str, Decimal] = {}
+        for indice, preco_sem_cupom in zip(validos, sem_cupom):
+            pedido = pedidos[indice]
+            base = bases_decimais.get(pedido.produto)
+            if base is None:
+                base = bases_decimais[pedido.produto] = para_decimal(
+                    tabela.preco_base(pedido.produto)
+                )
+            valor = resultado.valores[indice]
+            valores[indice] = valor if exato else round(valor * 100)
+            bases[indice] = para_centavos(CONTEXTO.multiply(base, pedido.qtd))
+            descontos_quantidade[indice] = bases[indice] - preco_sem_cupom
+            descontos_cupom[indice] = preco_sem_cupom - valores[indice]
+
+    return {
+        "cliente": [pedido.cliente for pedido in pedidos],
+        "produto": [pedido.produto for pedido in pedidos],
+        "cupom": [pedido.cupom for pedido in pedidos],
+        "qtd": [pedido.qtd for pedido in pedidos],
+        "preco_base_centavos": bases,
+        "desconto_quantidade_centavos": descontos_quantidade,
+        "desconto_cupom_centavos": descontos_cupom,
+        "valor_centavos": valores,
+        "status": list(resultado.status),
+    }
+
+
+class EscritorColunar:
+    """
+    Grava pedidos precificados em formato binário colunar, um bloco por lote.
+    ``formato`` é ``"arrow"`` (requer pyarrow) ou ``"pbcol"``; por padrão,
+    usa Arrow quando disponível. Usado como context manager, fecha o arquivo
+    (e o rodapé do Arrow) mesmo em caso de erro.
+    """
+
+    def __init__(self, caminho: str, formato: Optional[str] = None) -> None:
+        formato = formato or (FORMATO_ARROW if pa is not None else FORMATO_PBCOL)
+        if formato not in (FORMATO_ARROW, FORMATO_PBCOL):
+            raise ValueError(f"Formato colunar desconhecido: {formato!r}")
+        if formato == FORMATO_ARROW and pa is None:
+            raise ValueError("O formato Arrow requer o pacote pyarrow.")
+        self.caminho = caminho
+        self.formato = formato
+        self.linhas = 0
+        if formato == FORMATO_ARROW:
+            self._esquema = _esquema_arrow()
+            self._arrow = ipc.new_file(caminho, self._esquema)
+            self._arquivo = None
+        else:
+            self._arrow = None
+            self._arquivo = open(caminho, "wb")  # pylint: disable=R1732
+            self._arquivo.write(MAGICA)
+
+    def escrever_lote(
+        self,
+        lote: Union[List[EntradaPedido], LotePedidos],
+        resultado: Union[ResultadoLote, ResultadoLoteCentavos],
+        service: PedidoService,
+    ) -> None:
+        """Detalha o lote precificado e o grava como um novo bloco."""
+        self.escrever_colunas(detalhar_lote(lote, resultado, service))
+
+    def escrever_colunas(self, colunas: Colunas) -> None:
+        """Grava um bloco com as colunas de ``COLUNAS`` (listas do mesmo tamanho)."""
+        linhas = len(colunas["valor_centavos"])
+        if not linhas:
+            return
+        if self._arrow is not None:
+            esquema = self._esquema
+            self._arrow.write_batch(
+                pa.record_batch(
+                    [pa.array(colunas[campo.name], campo.type) for campo in esquema],
+                    schema=esquema,
+                )
+            )
+        else:
+            secoes = [
+                _secao_texto(colunas[nome])
+                if nome in COLUNAS_TEXTO
+                else _secao_inteira(colunas[nome])
+                for nome in COLUNAS
+            ]
+            corpo = b"".join(secoes)
+            self._arquivo.write(_CABECALHO_BLOCO.pack(_INICIO_BLOCO, linhas, len(corpo)))
+            self._arquivo.write(bytes(4))
+            self._arquivo.write(corpo)
+        self.linhas += linhas
+
+    def fechar(self) -> None:
+        """Finaliza e fecha o arquivo."""
+        if self._arrow is not None:
+            self._arrow.close()
+            self._arrow = None
+        elif self._arquivo is not None and not self._arquivo.closed:
+            self._arquivo.close()
+
+    def __enter__(self) -> "EscritorColunar":
+        return self
+
+    def __exit__(
+        self,
+        tipo: Optional[Type[BaseException]],
+        erro: Optional[BaseException],
+        rastro: Optional[TracebackType],
+    ) -> None:
+        self.fechar()
+
+
+class LeitorColunar:
+    """
+    Leitor do formato PBCOL sobre um mapa de memória do arquivo. As colunas
+    inteiras são ``memoryview`` direto dos bytes mapeados (sem cópia) e as de
+    texto são decodificadas sob demanda. As views de um bloco valem até
+    ``fechar``; converta-as (ex.: ``list``) se precisar delas depois.
+    """
+
+    def __init__(self, caminho: str) -> None:
+        self.caminho = caminho
+        self._arquivo = open(caminho, "rb")  # pylint: disable=R1732
+        self._mapa = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mapa[: len(MAGICA)] != MAGICA:
+            self.fechar()
+            raise ValueError(f"{caminho} não é um arquivo PBCOL.")
+
+    def blocos(self) -> Iterator[Dict[str, Sequence]]:
+        """Gera cada bloco como um dicionário de colunas."""
+        visao = memoryview(self._mapa)
+        posicao = len(MAGICA)
+        try:
+            while posicao < len(visao):
+                inicio, linhas, tamanho = _CABECALHO_BLOCO.unpack_from(visao, posicao)
+                if inicio != _INICIO_BLOCO:
+                    raise ValueError(f"Bloco inválido na posição {posicao}.")
+                cursor = posicao + _CABECALHO_BLOCO.size + 4
+                colunas: Dict[str, Sequence] = {}
+                for nome in COLUNAS:
+                    if nome in COLUNAS_TEXTO:
+                        colunas[nome], cursor = _ler_secao_texto(visao, cursor, linhas)
+                    else:
+                        fim = cursor + 8 * linhas
+                        colunas[nome] = visao[cursor:fim].cast("q")
+                        cursor = fim
+                yield colunas
+                posicao += _CABECALHO_BLOCO.size + 4 + tamanho
+        finally:
+            visao.release()
+
+    def linhas(self) -> Iterator[Dict[str, Union[str, int, None]]]:
+        """Gera cada pedido gravado como um dicionário (útil em testes e depuração)."""
+        for colunas in self.blocos():
+            yield from (dict(zip(COLUNAS, valores)) for valores in zip(*colunas.values()))
+
+    def fechar(self) -> None:
+        """Fecha o mapa de memória e o arquivo."""
+        if not self._mapa.closed:
+            self._mapa.close()
+        self._arquivo.close()
+
+    def __enter__(self) -> "LeitorColunar":
+        return self
+
+    def __exit__(
+        self,
+        tipo: Optional[Type[BaseException]],
+        erro: Optional[BaseException],
+        rastro: Optional[TracebackType],
+    ) -> None:
+        self.fechar()
+
+
+def _esquema_arrow():
+    """Esquema Arrow equivalente às colunas do formato PBCOL."""
+    return pa.schema(
+        [(nome, pa.string() if nome in COLUNAS_TEXTO else pa.int64()) for nome in COLUNAS]
+    )
+
+
+def _preencher(dados: bytes) -> bytes:
+    """Completa os bytes com zeros até um múltiplo de 8."""
+    return dados + bytes(-len(dados) % 8)
+
+
+def _little_endian(valores: array) -> bytes:
+    """Bytes do array em little-endian, qualquer que seja a máquina."""
+    if sys.byteorder == "big":  # pragma: no cover - depende da máquina
+        valores.byteswap()
+    return valores.tobytes()
+
+
+def _secao_inteira(valores: Sequence[int]) -> bytes:
+    """Seção de uma coluna inteira: int64 por linha."""
+    return _little_endian(array("q", valores))
+
+
+def _secao_texto(valores: Sequence[Optional[str]]) -> bytes:
+    """Seção de uma coluna de texto: vocabulário do bloco seguido dos códigos."""
+    codigos: Dict[str, int] = {}
+    indices = array("I")
+    for valor in valores:
+        if valor is None:
+            indices.append(NULO)
+            continue
+        codigo = codigos.get(valor)
+        if codigo is None:
+            codigo = codigos[valor] = len(codigos)
+        indices.append(codigo)
+
+    vocabulario = [_TAMANHO.pack(len(codigos))]
+    for nome in codigos:
+        dados = nome.encode("utf-8")
+        vocabulario.append(_TAMANHO.pack(len(dados)))
+        vocabulario.append(dados)
+    return _preencher(b"".join(vocabulario)) + _preencher(_little_endian(indices))
+
+
+def _ler_secao_texto(
+    visao: memoryview, cursor: int, linhas: int
+) -> Tuple[List[Optional[str]], int]:
+    """Lê uma seção de texto e retorna os valores decodificados e a posição seguinte."""
+    inicio = cursor
+    (quantidade,) = _TAMANHO.unpack_from(visao, cursor)
+    cursor += _TAMANHO.size
+    nomes: List[str] = []
+    for _ in range(quantidade):
+        (tamanho,) = _TAMANHO.unpack_from(visao, cursor)
+        cursor += _TAMANHO.size
+        nomes.append(str(visao[cursor : cursor + tamanho], "utf-8"))
+        cursor += tamanho
+    cursor += -(cursor - inicio) % 8
+    codigos = visao[cursor : cursor + 4 * linhas].cast("I")
+    valores = [None if codigo == NULO else nomes[codigo] for codigo in codigos]
+    codigos.release()
+    cursor += 4 * linhas
+    cursor += -(4 * linhas) % 8
+    return valores, cursor
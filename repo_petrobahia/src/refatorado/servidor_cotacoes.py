@@ -0,0 +1,319 @@
+"""
+Servidor de cotações assíncrono (asyncio) com protocolo de linhas sobre TCP.
+
+Cada linha recebida é um pedido em JSON, no mesmo formato de
+``PedidoService.processar_pedido``; cada linha devolvida, na mesma ordem, é
+``{"valor": ..., "status": ...}`` (com o ``id`` do pedido, se enviado, e a
+``versao_regras``, com regras versionadas) ou ``{"erro": ...}``. Os pedidos
+de todas as conexões são reunidos em micro-lotes e precificados por um único
+``PedidoService`` aquecido.
+
+Uso (a partir de ``src/``)::
+
+    python -m refatorado.servidor_cotacoes --porta 8765
+    python -m refatorado.servidor_cotacoes --regras regras.json --intervalo-regras 1
+    python -m bench.gerador_carga --porta 8765 --conexoes 50 --pedidos 2000
+"""
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from refatorado.pedido_service import PedidoService
+from refatorado.regras_precos import adicionar_argumentos_regras, criar_publicador
+
+TAMANHO_LOTE_PADRAO = 256
+JANELA_PADRAO = 0.002  # segundos
+CAPACIDADE_PADRAO = 10_000
+EM_VOO_POR_CONEXAO = 1_000
+
+Cotacao = Dict[str, Any]
+
+
+class Microlotes:
+    """
+    Reúne pedidos concorrentes em lotes: um lote é precificado quando atinge
+    ``tamanho_lote`` pedidos ou quando ``janela`` segundos se passaram desde o
+    primeiro pedido do lote. A precificação roda em uma thread própria, fora do
+    loop de eventos, que segue lendo conexões e montando o próximo lote
+    enquanto isso. A fila tem no máximo ``capacidade`` pedidos; cheia,
+    ``enfileirar`` espera, o que para a leitura das conexões e propaga a
+    contrapressão até os clientes via TCP.
+    """
+
+    def __init__(
+        self,
+        service: PedidoService,
+        tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+        janela: float = JANELA_PADRAO,
+        capacidade: int = CAPACIDADE_PADRAO,
+    ) -> None:
+        if tamanho_lote <= 0:
+            raise ValueError("tamanho_lote deve ser positivo.")
+        self.service = service
+        self.tamanho_lote = tamanho_lote
+        self.janela = janela
+        self._fila: "asyncio.Queue[Tuple[Dict[str, Any], asyncio.Future]]" = asyncio.Queue(
+            capacidade
+        )
+        self._consumidor: Optional[asyncio.Task] = None
+        # Uma única thread: os lotes são precificados um por vez, na ordem.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="precificacao")
+        self.lotes = 0
+        self.pedidos = 0
+
+    def iniciar(self) -> None:
+        """Inicia a tarefa que consome a fila (requer um loop em execução)."""
+        if self._consumidor is None:
+            self._consumidor = asyncio.create_task(self._consumir())
+
+    async def encerrar(self) -> None:
+        """Para o consumo da fila; pedidos ainda não precificados são cancelados."""
+        if self._consumidor is not None:
+            self._consumidor.cancel()
+            try:
+                await self._consumidor
+            except asyncio.CancelledError:
+                pass
+            self._consumidor = None
+        while not self._fila.empty():
+            _, futuro = self._fila.get_nowait()
+            futuro.cancel()
+        self._executor.shutdown(wait=True)
+
+    async def enfileirar(self, pedido: Dict[str, Any]) -> asyncio.Future:
+        """Põe o pedido na fila (espera se ela estiver cheia) e devolve o futuro da cotação."""
+        futuro = asyncio.get_running_loop().create_future()
+        await self._fila.put((pedido, futuro))
+        return futuro
+
+    async def cotar(self, pedido: Dict[str, Any]) -> Cotacao:
+        """Cota um pedido, esperando o lote em que ele entrar."""
+        return await (await self.enfileirar(pedido))
+
+    async def _consumir(self) -> None:
+        """Monta e precifica lotes enquanto houver pedidos."""
+        loop = asyncio.get_running_loop()
+        while True:
+            fila = self._fila
+            itens = [await fila.get()]
+            prazo = loop.time() + self.janela
+            while len(itens) < self.tamanho_lote:
+                # Sob carga a fila já tem pedidos e o lote se completa sem esperar.
+                if not fila.empty():
+                    itens.append(fila.get_nowait())
+                    continue
+                restante = prazo - loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    itens.append(await asyncio.wait_for(fila.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+            await self._precificar(itens)
+
+    async def _precificar(self, itens: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        """Precifica um lote na thread de precificação e resolve o futuro de cada pedido."""
+        pedidos = [pedido for pedido, _ in itens]
+        try:
+            resultado = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self.service.processar_pedidos, pedidos, False
+            )
+        except Exception as erro:  # pylint: disable=broad-except
+            # Um pedido malformado não derruba o servidor: o lote inteiro recebe o erro.
+            for _, futuro in itens:
+                if not futuro.done():
+                    futuro.set_result({"erro": str(erro)})
+            return
+        versao = resultado.versao_regras
+        for (pedido, futuro), valor, situacao in zip(itens, resultado.valores, resultado.status):
+            if futuro.done():  # cancelado (ex.: a conexão caiu)
+                continue
+            cotacao: Cotacao = {"valor": valor, "status": situacao}
+            if "id" in pedido:
+                cotacao["id"] = pedido["id"]
+            if versao is not None:
+                cotacao["versao_regras"] = versao
+            futuro.set_result(cotacao)
+        self.lotes += 1
+        self.pedidos += len(itens)
+
+
+class ServidorCotacoes:
+    """Servidor TCP de cotações: uma linha JSON por pedido e por resposta."""
+
+    def __init__(
+        self,
+        service: Optional[PedidoService] = None,
+        host: str = "127.0.0.1",
+        porta: int = 8765,
+        tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+        janela: float = JANELA_PADRAO,
+        capacidade: int = CAPACIDADE_PADRAO,
+    ) -> None:
+        self.service = service or PedidoService()
+        self.host = host
+        self.porta = porta
+        self._parametros = (tamanho_lote, janela, capacidade)
+        self.microlotes: Optional[Microlotes] = None
+        self._servidor: Optional[asyncio.AbstractServer] = None
+
+    async def iniciar(self) -> None:
+        """Abre a porta e começa a aceitar conexões (com porta 0, escolhe uma porta livre)."""
+        self.microlotes = Microlotes(self.service, *self._parametros)
+        self.microlotes.iniciar()
+        self._servidor = await asyncio.start_server(self._atender, self.host, self.porta)
+        self.porta = self._servidor.sockets[0].getsockname()[1]
+
+    async def servir(self) -> None:
+        """Inicia o servidor e atende até ser cancelado."""
+        await self.iniciar()
+        try:
+            await self._servidor.serve_forever()
+        finally:
+            await self.encerrar()
+
+    async def encerrar(self) -> None:
+        """Para de aceitar conexões e encerra o consumo dos micro-lotes."""
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+            self._servidor = None
+        if self.microlotes is not None:
+            await self.microlotes.encerrar()
+
+    async def _atender(
+        self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter
+    ) -> None:
+        """
+        Lê os pedidos de uma conexão e responde na mesma ordem. Há no máximo
+        ``EM_VOO_POR_CONEXAO`` respostas pendentes por conexão; além disso, a
+        leitura espera, assim como espera quando o cliente não lê as respostas.
+        """
+        pendentes: "asyncio.Queue[Optional[asyncio.Future]]" = asyncio.Queue(EM_VOO_POR_CONEXAO)
+        respostas = asyncio.create_task(self._responder(pendentes, escritor))
+        try:
+            while True:
+                linha, longa = await _ler_linha(leitor)
+                if not linha and not longa:
+                    break  # fim da conexão
+                if not linha.strip() and not longa:
+                    continue
+                try:
+                    if longa:
+                        raise ValueError("linha maior que o limite do servidor")
+                    pedido = _validar_pedido(json.loads(linha))
+                except ValueError as erro:
+                    futuro = asyncio.get_running_loop().create_future()
+                    futuro.set_result({"erro": f"Pedido inválido: {erro}"})
+                else:
+                    futuro = await self.microlotes.enfileirar(pedido)
+                await pendentes.put(futuro)
+        except ConnectionError:
+            pass
+        finally:
+            if not respostas.done():
+                await pendentes.put(None)
+            await respostas
+            escritor.close()
+
+    @staticmethod
+    async def _responder(
+        pendentes: "asyncio.Queue[Optional[asyncio.Future]]", escritor: asyncio.StreamWriter
+    ) -> None:
+        """Escreve as cotações de uma conexão na ordem dos pedidos."""
+        try:
+            while (futuro := await pendentes.get()) is not None:
+                cotacao = await futuro
+                escritor.write(json.dumps(cotacao, ensure_ascii=False).encode("utf-8") + b"\n")
+                await escritor.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+
+async def _ler_linha(leitor: asyncio.StreamReader) -> Tuple[bytes, bool]:
+    """
+    Lê a próxima linha da conexão (``b""`` no fim). Uma linha maior que o
+    limite do ``StreamReader`` é descartada inteira, até a quebra de linha,
+    e devolvida como ``(b"", True)``, para que só ela receba o erro.
+    """
+    longa = False
+    while True:
+        try:
+            linha = await leitor.readuntil(b"\n")
+        except asyncio.IncompleteReadError as erro:
+            return (b"" if longa else erro.partial), longa
+        except asyncio.LimitOverrunError as erro:
+            await leitor.readexactly(erro.consumed)
+            longa = True
+            continue
+        return (b"" if longa else linha), longa
+
+
+def _validar_pedido(pedido: Any) -> Dict[str, Any]:
+    """Confere os tipos dos campos, para que um pedido malformado não afete o lote."""
+    if not isinstance(pedido, dict):
+        raise ValueError("o pedido deve ser um objeto JSON")
+    qtd = pedido.get("qtd", 0)
+    if not isinstance(qtd, int) or isinstance(qtd, bool):
+        raise ValueError("qtd deve ser um número inteiro")
+    for campo in ("cliente", "produto", "cupom"):
+        valor = pedido.get(campo)
+        if valor is not None and not isinstance(valor, str):
+            raise ValueError(f"{campo} deve ser texto")
+    return pedido
+
+
+def _criar_parser() -> argparse.ArgumentParser:
+    """Define os argumentos de linha de comando do servidor."""
+    parser = argparse.ArgumentParser(description="Servidor de cotações PetroBahia.")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço de escuta.")
+    parser.add_argument("--porta", type=int, default=8765, help="Porta TCP (padrão: 8765).")
+    parser.add_argument(
+        "--tamanho-lote",
+        type=int,
+        default=TAMANHO_LOTE_PADRAO,
+        help=f"Máximo de pedidos por micro-lote (padrão: {TAMANHO_LOTE_PADRAO}).",
+    )
+    parser.add_argument(
+        "--janela-ms",
+        type=float,
+        default=JANELA_PADRAO * 1000,
+        help=f"Espera máxima para completar um micro-lote (padrão: {JANELA_PADRAO * 1000:g} ms).",
+    )
+    parser.add_argument(
+        "--capacidade",
+        type=int,
+        default=CAPACIDADE_PADRAO,
+        help=f"Pedidos na fila antes de aplicar contrapressão (padrão: {CAPACIDADE_PADRAO}).",
+    )
+    adicionar_argumentos_regras(
+        parser, "Arquivo JSON de tarifas e cupons, recarregado sem parar o servidor se mudar."
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Executa o servidor até ser interrompido (Ctrl+C)."""
+    args = _criar_parser().parse_args(argv)
+    regras = criar_publicador(args)
+    servidor = ServidorCotacoes(
+        PedidoService(regras=regras),
+        host=args.host,
+        porta=args.porta,
+        tamanho_lote=args.tamanho_lote,
+        janela=args.janela_ms / 1000,
+        capacidade=args.capacidade,
+    )
+    try:
+        asyncio.run(servidor.servir())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if regras is not None:
+            regras.parar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Módulo da tabela de tarifas compilada: preços base e faixas de desconto por quantidade."""
+import json
+from bisect import bisect_left
+from decimal import Decimal
+from itertools import count
+from typing import Dict, List, Mapping, NamedTuple, Sequence, Tuple
+
+try:  # NumPy é opcional: sem ele, o cálculo em lote usa Python puro.
+    import numpy as np
+except ImportError:  # pragma: no cover - depende do ambiente
+    np = None
+
+from refatorado.dinheiro import CONTEXTO, para_decimal
+
+# Cada tabela criada recebe uma versão nova, usada para invalidar caches de preço.
+_VERSOES = count(1)
+
+
+class FaixaDesconto(NamedTuple):
+    """
+    Faixa de desconto por quantidade: vale quando ``qtd > limite`` e o preço
+    passa a ser ``preco_base * qtd * multiplicador - deducao``.
+    """
+
+    limite: int
+    multiplicador: float = 1.0
+    deducao: float = 0.0
+
+
+class _EntradaProduto(NamedTuple):
+    """Posição de um produto nos vetores planos da tabela."""
+
+    base: float
+    inicio: int  # primeiro limite do produto em ``_limites``
+    fim: int  # posição após o último limite do produto
+    inicio_coef: int  # coeficiente "sem desconto" do produto em ``_multiplicadores``
+
+
+class TabelaTarifas:
+    """
+    Tabela de tarifas pré-compilada. As faixas de todos os produtos ficam em
+    vetores planos e a busca da faixa é um ``bisect`` no trecho do produto, sem
+    ramificação por produto: o custo de consulta não cresce com o catálogo.
+    """
+
+    def __init__(
+        self,
+        bases: Mapping[str, float],
+        faixas: Mapping[str, Sequence[FaixaDesconto]],
+    ) -> None:
+        desconhecidos = set(faixas) - set(bases)
+        if desconhecidos:
+            raise ValueError(f"Faixas para produtos sem preço base: {sorted(desconhecidos)}")
+
+        self.versao: int = next(_VERSOES)
+        self._produtos: Dict[str, _EntradaProduto] = {}
+        limites: List[int] = []
+        multiplicadores: List[float] = []
+        deducoes: List[float] = []
+
+        for produto, base in bases.items():
+            faixas_produto = sorted(faixas.get(produto, ()), key=lambda f: f.limite)
+            self._produtos[produto] = _EntradaProduto(
+                base, len(limites), len(limites) + len(faixas_produto), len(multiplicadores)
+            )
+            # Coeficiente 0 de cada produto: quantidade abaixo de todas as faixas.
+            multiplicadores.append(1.0)
+            deducoes.append(0.0)
+            for faixa in faixas_produto:
+                limites.append(faixa.limite)
+                multiplicadores.append(float(faixa.multiplicador))
+                deducoes.append(float(faixa.deducao))
+
+        # Coeficiente neutro usado pelo cálculo em lote para produtos desconhecidos.
+        multiplicadores.append(1.0)
+        deducoes.append(0.0)
+
+        self._limites: Tuple[int, ...] = tuple(limites)
+        self._multiplicadores: Tuple[float, ...] = tuple(multiplicadores)
+        self._deducoes: Tuple[float, ...] = tuple(deducoes)
+
+        # Mesmos coeficientes em decimal, para o modo de dinheiro exato.
+        self._bases_decimais: Dict[str, Decimal] = {
+            produto: para_decimal(entrada.base) for produto, entrada in self._produtos.items()
+        }
+        self._multiplicadores_decimais = tuple(map(para_decimal, multiplicadores))
+        self._deducoes_decimais = tuple(map(para_decimal, deducoes))
+
+    @classmethod
+    def de_dict(cls, dados: Mapping[str, Mapping]) -> "TabelaTarifas":
+        """
+        Cria a tabela a partir de um dicionário no formato
+        ``{"diesel": {"base": 3.99, "faixas": [[500, 0.95, 0.0], ...]}}``.
+        """
+        bases = {produto: float(item["base"]) for produto, item in dados.items()}
+        faixas = {
+            produto: [FaixaDesconto(*faixa) for faixa in item.get("faixas", ())]
+            for produto, item in dados.items()
+        }
+        return cls(bases, faixas)
+
+    @classmethod
+    def de_arquivo(cls, caminho: str) -> "TabelaTarifas":
+        """Carrega a tabela de um arquivo JSON no formato aceito por ``de_dict``."""
+        with open(caminho, "r", encoding="utf-8") as arquivo:
+            return cls.de_dict(json.load(arquivo))
+
+    def __contains__(self, produto: object) -> bool:
+        return produto in self._produtos
+
+    def preco_base(self, produto: str) -> float:
+        """Retorna o preço unitário do produto (KeyError se desconhecido)."""
+        return self._produtos[produto].base
+
+    def preco_total(self, produto: str, quantidade: int) -> float:
+        """Calcula o preço com desconto por quantidade, sem arredondamento."""
+        base, inicio, fim, inicio_coef = self._produtos[produto]
+        coef = inicio_coef + bisect_left(self._limites, quantidade, inicio, fim) - inicio
+        return base * quantidade * self._multiplicadores[coef] - self._deducoes[coef]
+
+    def preco_total_decimal(self, produto: str, quantidade: int) -> Decimal:
+        """
+        Versão exata de ``preco_total``, em ``Decimal``, sem arredondamento.
+        Uma quantidade fracionária (float, como vem do JSON) é convertida para
+        o decimal que ela representa, ex.: 10.5.
+        """
+        inicio, fim, inicio_coef = self._produtos[produto][1:]
+        coef = inicio_coef + bisect_left(self._limites, quantidade, inicio, fim) - inicio
+        if not isinstance(quantidade, int):
+            quantidade = para_decimal(quantidade)
+        bruto = CONTEXTO.multiply(self._bases_decimais[produto], quantidade)
+        return CONTEXTO.subtract(
+            CONTEXTO.multiply(bruto, self._multiplicadores_decimais[coef]),
+            self._deducoes_decimais[coef],
+        )
+
+    def precos_totais_numpy(self, produtos: Sequence[str], quantidades: Sequence[int]):
+        """
+        Versão vetorizada de ``preco_total`` (requer NumPy). Produtos
+        desconhecidos resultam em 0.0. Os pedidos são agrupados por produto
+        com uma ordenação estável e cada grupo faz um único ``searchsorted``.
+        """
+        indices = {produto: i for i, produto in enumerate(self._produtos)}
+        codigos = np.fromiter(
+            (indices.get(p, -1) for p in produtos), dtype=np.int64, count=len(produtos)
+        )
+        return self._precos_por_indice(codigos, np.asarray(quantidades, dtype=np.float64))
+
+    def precos_totais_codificados_numpy(
+        self, codigos: Sequence[int], nomes: Sequence[str], quantidades: Sequence[int]
+    ):
+        """
+        Igual a ``precos_totais_numpy``, com os produtos já codificados
+        (``nomes[codigos[i]]`` é o produto do pedido ``i``): cada nome distinto
+        é procurado uma única vez e as colunas são lidas sem cópia por item.
+        """
+        indices = {produto: i for i, produto in enumerate(self._produtos)}
+        mapa = np.array([indices.get(nome, -1) for nome in nomes], dtype=np.int64)
+        return self._precos_por_indice(
+            mapa[np.asarray(codigos, dtype=np.int64)], np.asarray(quantidades, dtype=np.float64)
+        )
+
+    def _precos_por_indice(self, codigos, qtds):
+        """Cálculo vetorizado pelo índice de cada produto na tabela (-1 se desconhecido)."""
+        entradas = list(self._produtos.values())
+        bases = np.array([e.base for e in entradas] + [0.0], dtype=np.float64)
+        coeficientes = self._coeficientes_por_indice(codigos, qtds, entradas)
+        multiplicadores = np.asarray(self._multiplicadores, dtype=np.float64)
+        deducoes = np.asarray(self._deducoes, dtype=np.float64)
+        return bases[codigos] * qtds * multiplicadores[coeficientes] - deducoes[coeficientes]
+
+    def _coeficientes_por_indice(self, codigos, qtds, entradas: List[_EntradaProduto]):
+        """
+        Posição do coeficiente de cada pedido: os pedidos são agrupados por
+        produto e cada grupo faz um ``searchsorted`` no trecho de limites dele.
+        """
+        limites = np.asarray(self._limites, dtype=np.float64)
+        coeficientes = np.full(len(codigos), len(self._multiplicadores) - 1, dtype=np.int64)
+        ordem = np.argsort(codigos, kind="stable")
+        fronteiras = np.flatnonzero(np.diff(codigos[ordem])) + 1
+        for grupo in np.split(ordem, fronteiras):
+            if grupo.size == 0 or codigos[grupo[0]] < 0:
+                continue
+            _, inicio, fim, inicio_coef = entradas[codigos[grupo[0]]]
+            faixa = np.searchsorted(limites[inicio:fim], qtds[grupo], side="left")
+            coeficientes[grupo] = inicio_coef + faixa
+        return coeficientes
@@ -0,0 +1,49 @@
+"""Módulo de trava de arquivo entre processos, para gravações concorrentes sem intercalação."""
+import os
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+try:  # POSIX
+    import fcntl
+except ImportError:  # pragma: no cover - depende do sistema operacional
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def trava_exclusiva(arquivo: IO) -> Iterator[None]:
+    """
+    Mantém uma trava exclusiva sobre o arquivo aberto enquanto o bloco executa.
+    Outros processos que pedirem a mesma trava esperam a sua vez; a trava é
+    liberada mesmo em caso de erro. Usa ``flock`` no POSIX e ``msvcrt.locking``
+    (sobre o primeiro byte do arquivo) no Windows.
+    """
+    descritor = arquivo.fileno()
+    if fcntl is not None:
+        fcntl.flock(descritor, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(descritor, fcntl.LOCK_UN)
+        return
+
+    # Windows: a trava vale para uma faixa de bytes a partir da posição atual;
+    # no modo append, a escrita continua indo para o fim do arquivo.
+    os.lseek(descritor, 0, os.SEEK_SET)
+    msvcrt.locking(descritor, msvcrt.LK_LOCK, 1)
+    try:
+        yield
+    finally:
+        os.lseek(descritor, 0, os.SEEK_SET)
+        msvcrt.locking(descritor, msvcrt.LK_UNLCK, 1)
+
+
+def anexar_com_trava(caminho: str, texto: str) -> None:
+    """
+    Anexa o texto ao arquivo em uma única escrita feita sob trava exclusiva,
+    de modo que gravações de vários processos nunca se intercalam.
+    """
+    with open(caminho, "a", encoding="utf-8") as arquivo:
+        with trava_exclusiva(arquivo):
+            arquivo.write(texto)
+            arquivo.flush()
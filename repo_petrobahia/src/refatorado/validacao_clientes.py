@@ -0,0 +1,83 @@
+"""Módulo de validação em lote de clientes, incluindo dígitos verificadores do CNPJ."""
+from typing import Dict, Iterable, List, Tuple
+
+from refatorado.cliente_service import ClienteService, dados_completos
+
+# Flags de status por registro (combináveis). 0 significa registro válido.
+VALIDO = 0
+FALTA_CAMPO = 1
+EMAIL_INVALIDO = 2
+CNPJ_INVALIDO = 4
+
+_DESCRICOES = (
+    (FALTA_CAMPO, "campo obrigatório ausente"),
+    (EMAIL_INVALIDO, "email inválido"),
+    (CNPJ_INVALIDO, "CNPJ inválido"),
+)
+
+PESOS_DV1 = (5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+PESOS_DV2 = (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+
+
+def _tabela_produtos(pesos: Tuple[int, ...]) -> Tuple[Tuple[int, ...], ...]:
+    """Pré-calcula peso * dígito para cada posição, indexado pelo byte ASCII do dígito."""
+    return tuple(
+        tuple(peso * (byte - 48) if 48 <= byte <= 57 else 0 for byte in range(58))
+        for peso in pesos
+    )
+
+
+_PRODUTOS_DV1 = _tabela_produtos(PESOS_DV1)
+_PRODUTOS_DV2 = _tabela_produtos(PESOS_DV2)
+_PONTUACAO_CNPJ = str.maketrans("", "", "./- ")
+_DIGITOS = frozenset(b"0123456789")
+
+
+def _digito_verificador(soma: int) -> int:
+    """Converte a soma ponderada no dígito verificador (módulo 11)."""
+    resto = soma % 11
+    return 0 if resto < 2 else 11 - resto
+
+
+def cnpj_valido(cnpj: str) -> bool:
+    """Valida o CNPJ (com ou sem pontuação) pelos dois dígitos verificadores."""
+    if not isinstance(cnpj, str):
+        return False
+    digitos = cnpj.translate(_PONTUACAO_CNPJ).encode("ascii", "replace")
+    if len(digitos) != 14 or not _DIGITOS.issuperset(digitos):
+        return False
+    if digitos.count(digitos[0]) == 14:  # ex.: 00000000000000 passa no cálculo, mas é inválido
+        return False
+    dv1 = _digito_verificador(sum(t[b] for t, b in zip(_PRODUTOS_DV1, digitos)))
+    if dv1 != digitos[12] - 48:
+        return False
+    dv2 = _digito_verificador(sum(t[b] for t, b in zip(_PRODUTOS_DV2, digitos)))
+    return dv2 == digitos[13] - 48
+
+
+def validar_lote(clientes: Iterable[Dict[str, str]]) -> bytearray:
+    """
+    Valida um lote de clientes e retorna um ``bytearray`` com as flags de
+    cada registro (``FALTA_CAMPO``, ``EMAIL_INVALIDO``, ``CNPJ_INVALIDO``).
+    Campos ausentes (ou None) não são validados novamente como email ou CNPJ
+    inválidos; campos que não são texto contam como inválidos.
+    """
+    validar_email = ClienteService.REGEX_EMAIL.match
+    status = bytearray()
+    for cliente in clientes:
+        flags = VALIDO
+        email = cliente.get("email")
+        cnpj = cliente.get("cnpj")
+        if not dados_completos(cliente):
+            flags |= FALTA_CAMPO
+        if email is not None and not (isinstance(email, str) and validar_email(email)):
+            flags |= EMAIL_INVALIDO
+        if cnpj is not None and not cnpj_valido(cnpj):
+            flags |= CNPJ_INVALIDO
+        status.append(flags)
+    return status
+
+
+def descrever_status(flags: int) -> List[str]:
+    """Traduz as flags de um registro em descrições legíveis."""
+    return [descricao for flag, descricao in _DESCRICOES if flags & flag]
@@ -0,0 +1,89 @@
+import io
+import os
+import tempfile
+import unittest
+
+from refatorado.agregacao import Agregador, Totais, mesclar_todos
+from refatorado.ingestao_pedidos import processar_fluxo
+from refatorado.pedido_service import STATUS_INVALIDO, STATUS_PRODUTO_DESCONHECIDO, PedidoService
+
+
+class TestAgregador(unittest.TestCase):
+    """Testes da agregação incremental por cliente, produto e cupom."""
+
+    def setUp(self):
+        """Configura o serviço e um lote de pedidos variados."""
+        self.service = PedidoService()
+        self.pedidos = [
+            {"cliente": "TransLog", "produto": "diesel", "qtd": 1200, "cupom": "MEGA10"},
+            {"cliente": "MoveMais", "produto": "gasolina", "qtd": 300, "cupom": None},
+            {"cliente": "Falho", "produto": "etanol", "qtd": 0},
+            {"cliente": "TransLog", "produto": "etanol", "qtd": 50, "cupom": "NOVO5"},
+            {"cliente": "Aqua", "produto": "agua", "qtd": 10},
+            {"cliente": "PetroPark", "produto": "lubrificante", "qtd": 12, "cupom": "LUB2"},
+        ]
+
+    def _agregar(self, pedidos, exato=False):
+        agregador = Agregador()
+        if exato:
+            resultado = self.service.processar_pedidos_centavos(pedidos, registrar_log=False)
+        else:
+            resultado = self.service.processar_pedidos(pedidos, registrar_log=False)
+        agregador.adicionar_lote(pedidos, resultado, self.service)
+        return agregador, resultado
+
+    def test_totais_por_dimensao(self):
+        """Deve acumular pedidos, quantidade, desconto e total por chave."""
+        agregador, resultado = self._agregar(self.pedidos)
+        clientes = agregador.totais("cliente")
+        # diesel x1200: 4309.00 sem cupom, 3878.00 com MEGA10; etanol x50: 179.50 e 170.52.
+        self.assertEqual(clientes["TransLog"], Totais(2, 1250, 43100 + 898, 387800 + 17052))
+        self.assertEqual(agregador.totais("cupom")[None], Totais(1, 300, 0, 145700))
+        self.assertEqual(agregador.totais("cupom")["LUB2"].desconto_centavos, 200)
+        self.assertEqual(agregador.total_centavos, round(resultado.total * 100))
+
+    def test_rejeitados_por_status(self):
+        """Pedidos inválidos ou de produto desconhecido não entram nos totais."""
+        agregador, _ = self._agregar(self.pedidos)
+        self.assertEqual(
+            dict(agregador.rejeitados), {STATUS_INVALIDO: 1, STATUS_PRODUTO_DESCONHECIDO: 1}
+        )
+        self.assertNotIn("agua", agregador.totais("produto"))
+
+    def test_modo_exato(self):
+        """No modo exato, os totais devem vir dos centavos calculados em decimal."""
+        agregador, resultado = self._agregar(self.pedidos, exato=True)
+        self.assertEqual(agregador.total_centavos, resultado.total)
+        self.assertEqual(agregador.totais("produto")["diesel"].desconto_centavos, 43100)
+
+    def test_mesclar_igual_a_agregar_tudo(self):
+        """Agregar em partes e mesclar deve dar o mesmo que agregar o lote inteiro."""
+        completo, _ = self._agregar(self.pedidos)
+        partes = [self._agregar(self.pedidos[:3])[0], self._agregar(self.pedidos[3:])[0]]
+        self.assertEqual(mesclar_todos(partes), completo)
+
+    def test_salvar_e_carregar(self):
+        """O estado salvo deve ser recarregado igual, inclusive chaves nulas."""
+        agregador, _ = self._agregar(self.pedidos)
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "agregados.json")
+            agregador.salvar(caminho)
+            self.assertEqual(Agregador.carregar(caminho), agregador)
+
+    def test_dimensao_desconhecida(self):
+        """Deve rejeitar uma dimensão inexistente."""
+        with self.assertRaises(ValueError):
+            Agregador().totais("regiao")
+
+    def test_fluxo_paralelo_igual_ao_sequencial(self):
+        """A agregação feita nos processos trabalhadores deve igualar a sequencial."""
+        pedidos = self.pedidos * 20
+        sequencial, paralelo = Agregador(), Agregador()
+        total = processar_fluxo(pedidos, self.service, io.StringIO(), 7, agregador=sequencial)
+        processar_fluxo(pedidos, self.service, None, 7, workers=2, agregador=paralelo)
+        self.assertEqual(paralelo, sequencial)
+        self.assertEqual(sequencial.total_centavos, round(total * 100))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from bench.benchmark import comparar, executar
+from bench.cargas import gerar_clientes, gerar_pedidos
+from bench.legado import carregar_legado
+
+
+class TestBenchmark(unittest.TestCase):
+    """Testes para o carregador do código legado e o executor de benchmarks."""
+
+    def test_carregar_legado(self):
+        """O código legado (comentado) deve ser executável e silencioso."""
+        legado = carregar_legado()
+        self.assertAlmostEqual(legado.calcular_preco("diesel", 1200), 4309.2, 2)
+        self.assertEqual(legado.calcular_preco("lubrificante", 12), 300.0)
+        pedido = {"cliente": "TransLog", "produto": "diesel", "qtd": 1200, "cupom": "MEGA10"}
+        self.assertEqual(legado.processar_pedido(pedido), 3878.0)
+
+    def test_cargas_deterministicas(self):
+        """A mesma semente deve gerar a mesma carga."""
+        self.assertEqual(gerar_pedidos(50, semente=7), gerar_pedidos(50, semente=7))
+        self.assertEqual(gerar_clientes(20, semente=7), gerar_clientes(20, semente=7))
+
+    def test_executar_todos_os_casos(self):
+        """Deve medir todos os casos, inclusive as etapas do lote."""
+        resultados = executar(n_pedidos=50, n_clientes=10, repeticoes=1)
+        for caso in ("preco.legado", "pedido.lote", "pedido.etapa.cupom", "cliente.lote"):
+            self.assertIn(caso, resultados)
+            self.assertGreater(resultados[caso]["itens"], 0)
+
+    def test_comparar_detecta_regressao(self):
+        """Só deve apontar casos que pioraram além da tolerância."""
+        base = {"a": {"us_por_item": 1.0}, "b": {"us_por_item": 1.0}}
+        atual = {"a": {"us_por_item": 1.1}, "b": {"us_por_item": 1.5}, "c": {"us_por_item": 9.0}}
+        regressoes = comparar(atual, base, tolerancia=0.2)
+        self.assertEqual(len(regressoes), 1)
+        self.assertTrue(regressoes[0].startswith("b:"))
@@ -0,0 +1,106 @@
+import unittest
+from unittest.mock import patch
+
+from refatorado.cache_precos import CachePrecos
+from refatorado.motor_cupons import MotorCupons, RegraCupom
+from refatorado.pedido_service import PedidoService
+from refatorado.tabela_tarifas import TabelaTarifas
+
+
+class TestCachePrecos(unittest.TestCase):
+    """Testes do cache LRU de preços."""
+
+    def test_acerto_e_falha(self):
+        """Deve contar falha na primeira consulta e acerto após guardar."""
+        cache = CachePrecos()
+        chave = ("diesel", 10, None)
+        self.assertIsNone(cache.obter(chave, 1))
+        cache.guardar(chave, 39.0, 1)
+        self.assertEqual(cache.obter(chave, 1), 39.0)
+        self.assertEqual(cache.acertos, 1)
+        self.assertEqual(cache.falhas, 1)
+        self.assertEqual(cache.estatisticas()["taxa_acerto"], 0.5)
+
+    def test_descarta_menos_usado(self):
+        """Com o cache cheio, deve descartar o item usado há mais tempo."""
+        cache = CachePrecos(capacidade=2)
+        cache.guardar(("a", 1, None), 1.0, 1)
+        cache.guardar(("b", 1, None), 2.0, 1)
+        cache.obter(("a", 1, None), 1)
+        cache.guardar(("c", 1, None), 3.0, 1)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.obter(("b", 1, None), 1))
+        self.assertEqual(cache.obter(("a", 1, None), 1), 1.0)
+        self.assertEqual(cache.descartes, 1)
+
+    def test_troca_de_versao_esvazia(self):
+        """Uma versão diferente das regras deve invalidar os preços guardados."""
+        cache = CachePrecos()
+        cache.guardar(("diesel", 10, None), 39.0, 1)
+        self.assertIsNone(cache.obter(("diesel", 10, None), 2))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.invalidacoes, 1)
+
+    def test_capacidade_invalida(self):
+        """Deve rejeitar capacidade não positiva."""
+        with self.assertRaises(ValueError):
+            CachePrecos(capacidade=0)
+
+
+@patch("builtins.print")
+class TestPedidoServiceComCache(unittest.TestCase):
+    """Testes do serviço de pedidos com cache de preços."""
+
+    def setUp(self):
+        """Configura um serviço com cache e um lote com linhas repetidas."""
+        self.cache = CachePrecos()
+        self.service = PedidoService(cache=self.cache)
+        self.pedidos = [
+            {"cliente": "A", "produto": "diesel", "qtd": 1200, "cupom": "MEGA10"},
+            {"cliente": "B", "produto": "etanol", "qtd": 81, "cupom": None},
+            {"cliente": "C", "produto": "diesel", "qtd": 1200, "cupom": "MEGA10"},
+            {"cliente": "D", "produto": "agua", "qtd": 10},
+            {"cliente": "E", "produto": "gasolina", "qtd": 0},
+            {"cliente": "F", "produto": "etanol", "qtd": 81, "cupom": None},
+        ]
+
+    def test_lote_igual_sem_cache(self, mock_print):
+        """Os valores com cache devem ser idênticos aos calculados sem cache."""
+        esperado = PedidoService().processar_pedidos(self.pedidos)
+        primeiro = self.service.processar_pedidos(self.pedidos)
+        segundo = self.service.processar_pedidos(self.pedidos)
+        self.assertEqual(primeiro, esperado)
+        self.assertEqual(segundo, esperado)
+        # Linhas repetidas no mesmo lote são precificadas uma única vez, e o
+        # produto desconhecido ("agua") não entra no cache.
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.falhas, 4)
+        self.assertEqual(self.cache.acertos, 4)
+
+    def test_pedido_individual_usa_cache(self, mock_print):
+        """Pedidos repetidos devem ser respondidos pelo cache, mantendo o log."""
+        primeiro = self.service.processar_pedido(self.pedidos[0])
+        segundo = self.service.processar_pedido(self.pedidos[2])
+        self.assertEqual(primeiro, segundo)
+        self.assertEqual(self.cache.acertos, 1)
+        self.assertEqual(mock_print.call_count, 2)
+
+    def test_nova_tabela_invalida_cache(self, mock_print):
+        """Trocar a tabela de tarifas deve descartar os preços em cache."""
+        pedido = {"cliente": "A", "produto": "diesel", "qtd": 10, "cupom": None}
+        self.assertEqual(self.service.processar_pedido(pedido), 40.0)
+        self.service.calculadora.tabela = TabelaTarifas({"diesel": 5.0}, {})
+        self.assertEqual(self.service.processar_pedido(pedido), 50.0)
+        self.assertEqual(self.cache.acertos, 0)
+
+    def test_novos_cupons_invalidam_cache(self, mock_print):
+        """Trocar o motor de cupons deve descartar os preços em cache."""
+        pedido = {"cliente": "A", "produto": "gasolina", "qtd": 10, "cupom": "MEGA10"}
+        self.assertEqual(self.service.processar_pedido(pedido), 46.71)
+        self.service.cupons = MotorCupons((RegraCupom("MEGA10", multiplicador=0.5),))
+        self.assertEqual(self.service.processar_pedido(pedido), 25.95)
+        self.assertEqual(self.cache.invalidacoes, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 from unittest.mock import mock_open, patch
 
@@ -87,3 +89,49 @@ class TestClienteService(unittest.TestCase):
         handle = mock_file()
         expected_content = str(self.cliente_valido) + "\n"
         handle.write.assert_called_once_with(expected_content)
+
+    # Testes de Cadastro em Lote
+    @patch("builtins.print")
+    def test_cadastrar_clientes_em_lote(self, mock_print):
+        """Deve gravar os clientes válidos no mesmo formato e imprimir só o resumo."""
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "clientes.txt")
+            service = ClienteService(arquivo_clientes=caminho)
+            clientes = [self.cliente_valido, self.cliente_incompleto, self.cliente_invalido_email]
+
+            resultados = service.cadastrar_clientes(clientes, tamanho_flush=2)
+
+            with open(caminho, encoding="utf-8") as arquivo:
+                linhas = arquivo.readlines()
+
+        self.assertEqual(resultados, [True, False, True])
+        self.assertEqual(
+            linhas,
+            [str(self.cliente_valido) + "\n", str(self.cliente_invalido_email) + "\n"],
+        )
+        self.assertEqual(mock_print.call_count, 2)
+        mock_print.assert_any_call("Enviando email de boas-vindas para 2 clientes")
+
+    @patch("builtins.print")
+    def test_cadastrar_clientes_grava_em_fluxo(self, mock_print):
+        """O lote deve ser gravado durante a leitura, sem esperar o fim da entrada."""
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "clientes.txt")
+            service = ClienteService(arquivo_clientes=caminho)
+            gravados_antes_do_terceiro = []
+
+            def clientes():
+                yield self.cliente_valido
+                yield self.cliente_invalido_email
+                with open(caminho, encoding="utf-8") as arquivo:
+                    gravados_antes_do_terceiro.extend(arquivo.readlines())
+                yield self.cliente_valido
+
+            resultados = service.cadastrar_clientes(clientes(), tamanho_flush=2)
+
+        self.assertEqual(resultados, [True, True, True])
+        self.assertEqual(len(gravados_antes_do_terceiro), 2)
+        mock_print.assert_any_call(
+            "3 clientes cadastrados, 0 com dados incompletos, 0 duplicados, "
+            "1 com email inválido (aceitos)."
+        )
@@ -0,0 +1,87 @@
+import unittest
+
+from bench.cargas import gerar_pedidos
+from bench.diferencial import (
+    CUPONS_DIFERENCIAL,
+    DIVERGENCIAS_LEGADO,
+    IMPLEMENTACOES,
+    TOLERADAS,
+    PADRAO,
+    REFERENCIA,
+    caso_do_legado,
+    minimizar,
+    primeira_divergencia,
+    verificar,
+)
+
+
+class TestDiferencial(unittest.TestCase):
+    """Testes para o teste diferencial entre implementações."""
+
+    def setUp(self):
+        """Cria a referência e uma implementação propositalmente errada."""
+        self.referencia = IMPLEMENTACOES[REFERENCIA]()
+
+        def errada(pedidos):
+            valores = self.referencia(pedidos)
+            return [
+                valor + 0.01 if p["produto"] == "gasolina" and p["qtd"] > 200 else valor
+                for p, valor in zip(pedidos, valores)
+            ]
+
+        self.implementacoes = {REFERENCIA: self.referencia, "errada": errada}
+
+    def test_caminhos_refatorados_concordam(self):
+        """Lote, colunas, cache e modo exato devem concordar com as referências em paralelo."""
+        self.assertNotIn("legado", PADRAO)
+        self.assertIsNone(verificar(3000, PADRAO, workers=2, tamanho_bloco=1000))
+
+    def test_detecta_primeira_divergencia(self):
+        """Deve apontar o primeiro pedido divergente com os valores de cada implementação."""
+        pedidos = [
+            {"cliente": "A", "produto": "diesel", "qtd": 900, "cupom": None},
+            {"cliente": "B", "produto": "gasolina", "qtd": 300, "cupom": "MEGA10"},
+            {"cliente": "C", "produto": "gasolina", "qtd": 900, "cupom": None},
+        ]
+        divergencia = primeira_divergencia(pedidos, self.implementacoes, inicio=10)
+        self.assertEqual(divergencia.indice, 11)
+        self.assertEqual(divergencia.pedido, pedidos[1])
+        self.assertNotEqual(divergencia.valores["errada"], divergencia.valores[REFERENCIA])
+
+    def test_minimizar_reproducao(self):
+        """O caso mínimo deve ficar na borda da faixa que causa a divergência."""
+        pedido = {"cliente": "B", "produto": "gasolina", "qtd": 1733, "cupom": "MEGA10"}
+        minimo = minimizar(pedido, self.implementacoes)
+        self.assertEqual(minimo, {"cliente": "X", "produto": "gasolina", "qtd": 201, "cupom": None})
+
+    def test_legado_diverge_no_arredondamento_intermediario(self):
+        """O legado não arredonda antes de truncar (etanol x81); a divergência é tolerada."""
+        implementacoes = {REFERENCIA: self.referencia, "legado": IMPLEMENTACOES["legado"]()}
+        pedido = {"cliente": "X", "produto": "etanol", "qtd": 81, "cupom": None}
+        self.assertIsNone(primeira_divergencia([pedido], implementacoes))
+        divergencia = primeira_divergencia([pedido], implementacoes, toleradas={})
+        self.assertEqual(divergencia.valores, {REFERENCIA: 282.07, "legado": 282.06})
+
+    def test_legado_sem_outras_divergencias(self):
+        """Fora a divergência documentada, o legado concorda com a referência."""
+        self.assertIsNone(verificar(3000, ["legado"], workers=2, tamanho_bloco=1000))
+
+    def test_tolerancia_do_legado_so_nos_casos_documentados(self):
+        """A tolerância só cobre os casos documentados e não esconde erros de uma unidade."""
+        legado = IMPLEMENTACOES["legado"]()
+        tolerada = TOLERADAS["legado"]
+        pedidos = gerar_pedidos(5000, semente=3, cupons=CUPONS_DIFERENCIAL)
+        toleradas = 0
+        for pedido, esperado, valor in zip(
+            pedidos, self.referencia(pedidos), legado(pedidos)
+        ):
+            if valor != esperado:
+                self.assertTrue(tolerada(pedido, esperado, valor), pedido)
+                self.assertIn(caso_do_legado(pedido), DIVERGENCIAS_LEGADO)
+                toleradas += 1
+        self.assertGreater(toleradas, 0)
+
+        lubrificante = {"cliente": "X", "produto": "lubrificante", "qtd": 10, "cupom": None}
+        self.assertFalse(tolerada(lubrificante, 250.0, 250.01))
+        gasolina = {"cliente": "X", "produto": "gasolina", "qtd": 300, "cupom": None}
+        self.assertFalse(tolerada(gasolina, 1457.0, 1457.01))
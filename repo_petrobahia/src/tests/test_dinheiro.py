@@ -0,0 +1,43 @@
+import unittest
+from decimal import Decimal
+
+from refatorado.dinheiro import (
+    de_centavos,
+    formatar_centavos,
+    para_centavos,
+    para_decimal,
+    para_reais_inteiros,
+    truncar_centavos,
+)
+
+
+class TestDinheiro(unittest.TestCase):
+    """Testes para a aritmética monetária exata."""
+
+    def test_para_decimal_usa_valor_configurado(self):
+        """Deve converter o float para o decimal escrito na configuração."""
+        self.assertEqual(para_decimal(3.99), Decimal("3.99"))
+        self.assertEqual(para_decimal(0.95), Decimal("0.95"))
+
+    def test_para_centavos_meio_para_o_par(self):
+        """Deve arredondar para centavos como o round() do Python (meio para o par)."""
+        self.assertEqual(para_centavos(Decimal("1457.005")), 145700)
+        self.assertEqual(para_centavos(Decimal("1457.015")), 145702)
+        self.assertEqual(para_centavos(Decimal("147.9151")), 14792)
+
+    def test_para_reais_inteiros(self):
+        """Deve arredondar para reais inteiros e retornar centavos."""
+        self.assertEqual(para_reais_inteiros(Decimal("3878.28")), 387800)
+        self.assertEqual(para_reais_inteiros(Decimal("3878.51")), 387900)
+        self.assertEqual(para_reais_inteiros(Decimal("3788.50")), 378800)
+
+    def test_truncar_centavos(self):
+        """Deve descartar as casas além dos centavos."""
+        self.assertEqual(truncar_centavos(Decimal("170.525")), 17052)
+        self.assertEqual(truncar_centavos(Decimal("68.21")), 6821)
+
+    def test_conversao_e_formatacao(self):
+        """Deve converter e formatar centavos sem perda."""
+        self.assertEqual(de_centavos(580352), Decimal("5803.52"))
+        self.assertEqual(formatar_centavos(580352), "5803.52")
+        self.assertEqual(formatar_centavos(7), "0.07")
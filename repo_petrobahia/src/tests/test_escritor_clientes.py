@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+from refatorado.escritor_clientes import EscritorClientes
+
+
+class TestEscritorClientes(unittest.TestCase):
+    """Testes para o escritor de clientes em buffer."""
+
+    def setUp(self):
+        """Cria um diretório temporário para o arquivo de clientes."""
+        self.pasta = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.pasta.name, "clientes.txt")
+        self.cliente = {"nome": "Carlos", "email": "carlos@petrobahia.com", "cnpj": "456"}
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def _ler_linhas(self):
+        with open(self.caminho, encoding="utf-8") as arquivo:
+            return arquivo.readlines()
+
+    def test_grava_ao_atingir_tamanho_flush(self):
+        """Só deve gravar quando o buffer atingir o tamanho configurado."""
+        with EscritorClientes(self.caminho, tamanho_flush=3, intervalo_flush=3600) as escritor:
+            escritor.escrever(self.cliente)
+            escritor.escrever(self.cliente)
+            self.assertEqual(self._ler_linhas(), [])
+            escritor.escrever(self.cliente)
+            self.assertEqual(len(self._ler_linhas()), 3)
+
+    def test_grava_ao_passar_intervalo(self):
+        """Deve gravar quando o intervalo de flush tiver passado."""
+        agora = [0.0]
+        with EscritorClientes(
+            self.caminho, tamanho_flush=100, intervalo_flush=5.0, relogio=lambda: agora[0]
+        ) as escritor:
+            escritor.escrever(self.cliente)
+            self.assertEqual(self._ler_linhas(), [])
+            agora[0] = 5.0
+            escritor.escrever(self.cliente)
+            self.assertEqual(len(self._ler_linhas()), 2)
+
+    def test_flush_final_mesmo_com_erro(self):
+        """O context manager deve gravar o buffer mesmo se houver exceção."""
+        with self.assertRaises(RuntimeError):
+            with EscritorClientes(self.caminho, tamanho_flush=100) as escritor:
+                escritor.escrever(self.cliente)
+                raise RuntimeError("falha no meio do lote")
+        self.assertEqual(self._ler_linhas(), [str(self.cliente) + "\n"])
+
+    def test_fechar_duas_vezes(self):
+        """Fechar novamente não deve falhar."""
+        escritor = EscritorClientes(self.caminho)
+        escritor.fechar()
+        escritor.fechar()
+
+    def test_tamanho_flush_invalido(self):
+        """Deve rejeitar tamanho de flush não positivo."""
+        with self.assertRaises(ValueError):
+            EscritorClientes(self.caminho, tamanho_flush=0)
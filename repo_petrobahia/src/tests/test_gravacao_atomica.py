@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from refatorado.gravacao_atomica import gravar_atomicamente
+
+
+class TestGravacaoAtomica(unittest.TestCase):
+    """Testes da gravação atômica de arquivos."""
+
+    def test_substitui_o_arquivo_sem_deixar_temporario(self):
+        """O conteúdo novo substitui o anterior e o temporário é renomeado."""
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "estado.json")
+            gravar_atomicamente(caminho, "antigo")
+            gravar_atomicamente(caminho, "novo")
+            with open(caminho, encoding="utf-8") as arquivo:
+                self.assertEqual(arquivo.read(), "novo")
+            self.assertEqual(os.listdir(pasta), ["estado.json"])
+
+    def test_sincroniza_antes_e_depois_de_renomear(self):
+        """O temporário é sincronizado antes da renomeação, e a pasta depois dela."""
+        eventos = []
+        fsync = os.fsync
+        replace = os.replace
+
+        def registrar_fsync(descritor):
+            eventos.append("fsync")
+            fsync(descritor)
+
+        def registrar_replace(origem, destino):
+            eventos.append("replace")
+            replace(origem, destino)
+
+        with tempfile.TemporaryDirectory() as pasta, patch(
+            "os.fsync", registrar_fsync
+        ), patch("os.replace", registrar_replace):
+            gravar_atomicamente(os.path.join(pasta, "estado.json"), "novo")
+        self.assertEqual(eventos, ["fsync", "replace", "fsync"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+import io
+import json
+import os
+import pickle
+import tempfile
+import random
+import unittest
+from array import array
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from refatorado import indice_clientes
+from refatorado.indice_clientes import DadosCliente, FiltroBloom, IndiceClientes
+from refatorado.ingestao_pedidos import processar_fluxo
+from refatorado.pedido import LotePedidos
+from refatorado.pedido_service import (
+    STATUS_CLIENTE_DESCONHECIDO,
+    STATUS_INVALIDO,
+    STATUS_OK,
+    PedidoService,
+)
+
+CLIENTES = [
+    {"nome": "TransLog", "email": "frota@translog.com", "cnpj": "11222333000181"},
+    {"nome": "MoveMais", "email": "movemais@@frota", "cnpj": "456"},
+    {"nome": "TransLog", "email": "outro@translog.com", "cnpj": "999"},
+    {"nome": "D'Ávila", "email": "contato@davila.com", "cnpj": "11222333000181"},
+]
+
+PEDIDOS = [
+    {"cliente": "TransLog", "produto": "diesel", "qtd": 1200, "cupom": "MEGA10"},
+    {"cliente": "Fantasma", "produto": "gasolina", "qtd": 300},
+    {"cliente": "MoveMais", "produto": "etanol", "qtd": 0},
+    {"cliente": "D'Ávila", "produto": "lubrificante", "qtd": 12, "cupom": "LUB2"},
+    {"produto": "diesel", "qtd": 10},
+]
+
+
+class TestFiltroBloom(unittest.TestCase):
+    """Testes do filtro de Bloom."""
+
+    def test_sem_falsos_negativos_e_taxa_de_falsos_positivos(self):
+        """Todo nome adicionado é encontrado; os ausentes raramente passam."""
+        filtro = FiltroBloom(1000, 0.01)
+        nomes = [f"cliente-{i}" for i in range(1000)]
+        for nome in nomes:
+            filtro.adicionar(nome)
+        self.assertTrue(all(nome in filtro for nome in nomes))
+        falsos = sum(f"ausente-{i}" in filtro for i in range(10_000))
+        self.assertLess(falsos, 300)
+        self.assertLess(len(filtro), 1300)  # cerca de 1,2 byte por nome
+
+    def test_taxa_invalida(self):
+        """A taxa de falsos positivos deve estar entre 0 e 1."""
+        with self.assertRaises(ValueError):
+            FiltroBloom(10, 0)
+
+
+class TestOrdenacaoPorHash(unittest.TestCase):
+    """Testes da ordenação dos vetores do índice compacto."""
+
+    def test_ordena_no_lugar_e_estavel(self):
+        """Com ou sem NumPy, os vetores ficam ordenados por (hash, offset), no lugar."""
+        sorteio = random.Random(7)
+        hashes_originais = [sorteio.choice((0, 5, 2**64 - 1)) for _ in range(50)]
+        hashes_originais += [sorteio.getrandbits(64) for _ in range(200)]
+        esperado = sorted(zip(hashes_originais, range(0, 2500, 10)))
+        for numpy in (indice_clientes.np, None):
+            with self.subTest(numpy=numpy is not None), patch.object(indice_clientes, "np", numpy):
+                hashes = array("Q", hashes_originais)
+                offsets = array("Q", range(0, 2500, 10))
+                indice_clientes._ordenar_por_hash(hashes, offsets)
+                self.assertEqual(list(zip(hashes, offsets)), esperado)
+                hashes.append(1)  # sem visões NumPy presas ao vetor
+
+
+class TestIndiceClientes(unittest.TestCase):
+    """Testes do índice de clientes nos modos padrão e compacto."""
+
+    def setUp(self):
+        """Grava um clientes.txt no formato do ClienteService."""
+        self.pasta = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.pasta.name, "clientes.txt")
+        with open(self.caminho, "w", encoding="utf-8") as arquivo:
+            arquivo.writelines(str(cliente) + "\n" for cliente in CLIENTES)
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def test_busca_nos_dois_modos(self):
+        """Os dois modos devem achar os mesmos clientes, com o primeiro registro de cada nome."""
+        for compacto in (False, True):
+            with self.subTest(compacto=compacto):
+                with IndiceClientes(self.caminho, compacto=compacto) as indice:
+                    self.assertEqual(
+                        indice.buscar("TransLog"),
+                        DadosCliente("TransLog", "frota@translog.com", "11222333000181"),
+                    )
+                    self.assertEqual(indice.buscar("D'Ávila").email, "contato@davila.com")
+                    self.assertIsNone(indice.buscar("Fantasma"))
+                    self.assertIsNone(indice.buscar(None))
+                    self.assertNotIn("Fantasma", indice)
+                    self.assertEqual(
+                        [d and d.nome for d in indice.juntar(["MoveMais", "X", "MoveMais"])],
+                        ["MoveMais", None, "MoveMais"],
+                    )
+
+    def test_somente_validos(self):
+        """Clientes com email ou CNPJ inválido ficam fora do índice."""
+        for compacto in (False, True):
+            with self.subTest(compacto=compacto):
+                with IndiceClientes(self.caminho, compacto, somente_validos=True) as indice:
+                    self.assertIn("TransLog", indice)
+                    self.assertNotIn("MoveMais", indice)
+                    self.assertEqual(len(indice), 2)
+
+    def test_compacto_serializavel(self):
+        """O índice compacto reabre o arquivo ao ser enviado a outro processo."""
+        with IndiceClientes(self.caminho, compacto=True) as indice:
+            copia = pickle.loads(pickle.dumps(indice))
+        try:
+            self.assertEqual(copia.buscar("MoveMais").cnpj, "456")
+        finally:
+            copia.fechar()
+
+    def test_juncao_no_servico(self):
+        """Pedidos de clientes desconhecidos são recusados antes de precificar."""
+        with IndiceClientes(self.caminho, compacto=True) as indice:
+            service = PedidoService(clientes=indice)
+            for entrada in (PEDIDOS, iter(PEDIDOS), LotePedidos.de_pedidos(PEDIDOS)):
+                resultado = service.processar_pedidos(entrada, registrar_log=False)
+                self.assertEqual(
+                    resultado.status,
+                    [
+                        STATUS_OK,
+                        STATUS_CLIENTE_DESCONHECIDO,
+                        STATUS_INVALIDO,
+                        STATUS_OK,
+                        STATUS_CLIENTE_DESCONHECIDO,
+                    ],
+                )
+                self.assertEqual(resultado.valores, [3878.0, 0.0, 0.0, 298.0, 0.0])
+                self.assertEqual(resultado.clientes[0].cnpj, "11222333000181")
+            centavos = service.processar_pedidos_centavos(PEDIDOS, registrar_log=False)
+            self.assertEqual(centavos.valores, [387800, 0, 0, 29800, 0])
+            with redirect_stdout(io.StringIO()) as saida:
+                self.assertEqual(service.processar_pedido(PEDIDOS[1]), 0.0)
+            self.assertIn("não cadastrado", saida.getvalue())
+
+    def test_fluxo_anexa_dados_do_cliente(self):
+        """A saída JSONL traz cnpj e email de cada cliente cadastrado."""
+        service = PedidoService(clientes=IndiceClientes(self.caminho))
+        saida = io.StringIO()
+        processar_fluxo(PEDIDOS, service, saida, tamanho_lote=2)
+        linhas = [json.loads(linha) for linha in saida.getvalue().splitlines()]
+        self.assertEqual(linhas[0]["cnpj"], "11222333000181")
+        self.assertEqual(linhas[2]["email"], "movemais@@frota")
+        self.assertIsNone(linhas[1]["cnpj"])
+        self.assertEqual(linhas[1]["status"], STATUS_CLIENTE_DESCONHECIDO)
+
+
+if __name__ == "__main__":
+    unittest.main()
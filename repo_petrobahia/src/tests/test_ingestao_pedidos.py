@@ -0,0 +1,99 @@
+import io
+import json
+import unittest
+from decimal import Decimal
+from unittest.mock import patch
+
+from refatorado.ingestao_pedidos import (
+    detectar_formato,
+    em_lotes,
+    ler_pedidos,
+    processar_fluxo,
+)
+from refatorado.pedido_service import PedidoService
+
+
+class TestIngestaoPedidos(unittest.TestCase):
+    """Testes para a ingestão de pedidos em fluxo."""
+
+    def setUp(self):
+        """Configura o serviço e os pedidos de exemplo."""
+        self.service = PedidoService()
+        self.pedidos = [
+            {"cliente": "TransLog", "produto": "diesel", "qtd": 1200, "cupom": "MEGA10"},
+            {"cliente": "MoveMais", "produto": "gasolina", "qtd": 300, "cupom": None},
+            {"cliente": "EcoFrota", "produto": "etanol", "qtd": 50, "cupom": "NOVO5"},
+            {"cliente": "PetroPark", "produto": "lubrificante", "qtd": 12, "cupom": "LUB2"},
+        ]
+
+    # Testes de Leitura
+    def test_ler_jsonl(self):
+        """Deve gerar um pedido por linha JSON, ignorando linhas vazias."""
+        linhas = [json.dumps(p) + "\n" for p in self.pedidos] + ["\n"]
+        self.assertEqual(list(ler_pedidos(linhas, "jsonl")), self.pedidos)
+
+    def test_ler_csv(self):
+        """Deve converter o CSV para o formato de dicionário do PedidoService."""
+        entrada = io.StringIO(
+            "cliente,produto,qtd,cupom\nTransLog,diesel,1200,MEGA10\nMoveMais,gasolina,300,\n"
+        )
+        self.assertEqual(list(ler_pedidos(entrada, "csv")), self.pedidos[:2])
+
+    @patch("sys.stderr", new_callable=io.StringIO)
+    def test_ler_csv_quantidade_invalida(self, mock_stderr):
+        """Quantidade malformada ou vazia vira um pedido inválido, sem interromper o fluxo."""
+        entrada = io.StringIO(
+            "cliente,produto,qtd,cupom\nA,diesel,10.5,\nB,diesel,abc,\nC,diesel,,\nD,diesel,10,\n"
+        )
+        pedidos = list(ler_pedidos(entrada, "csv"))
+        self.assertEqual([p["qtd"] for p in pedidos], [0, 0, 0, 10])
+        resultado = PedidoService().processar_pedidos(pedidos, registrar_log=False)
+        self.assertEqual(resultado.status, ["INVALIDO", "INVALIDO", "INVALIDO", "OK"])
+        self.assertIn("Linha 2", mock_stderr.getvalue())
+        self.assertIn("Linha 4", mock_stderr.getvalue())
+
+    def test_formato_desconhecido(self):
+        """Deve rejeitar formatos não suportados."""
+        with self.assertRaises(ValueError):
+            ler_pedidos([], "xml")
+
+    def test_detectar_formato(self):
+        """Deve deduzir o formato pela extensão."""
+        self.assertEqual(detectar_formato("pedidos.CSV"), "csv")
+        self.assertEqual(detectar_formato("pedidos.jsonl"), "jsonl")
+        self.assertEqual(detectar_formato("-"), "jsonl")
+
+    # Testes de Processamento em Fluxo
+    def test_em_lotes(self):
+        """Deve agrupar o fluxo respeitando o tamanho do lote."""
+        lotes = list(em_lotes(iter(range(7)), 3))
+        self.assertEqual(lotes, [[0, 1, 2], [3, 4, 5], [6]])
+
+    def test_em_lotes_tamanho_invalido(self):
+        """Deve rejeitar tamanho de lote não positivo."""
+        with self.assertRaises(ValueError):
+            list(em_lotes([], 0))
+
+    @patch("builtins.print")
+    def test_processar_fluxo_total_e_saida(self, mock_print):
+        """O TOTAL do fluxo deve ser igual ao do processamento individual."""
+        esperado = [self.service.processar_pedido(p) for p in self.pedidos]
+        saida = io.StringIO()
+
+        total = processar_fluxo(iter(self.pedidos), self.service, saida, tamanho_lote=3)
+
+        self.assertEqual(total, sum(esperado))
+        linhas = [json.loads(linha) for linha in saida.getvalue().splitlines()]
+        self.assertEqual([linha["valor"] for linha in linhas], esperado)
+        self.assertEqual(linhas[0]["cliente"], "TransLog")
+
+    def test_processar_fluxo_exato(self):
+        """No modo exato, a saída traz centavos e o TOTAL é um Decimal exato."""
+        saida = io.StringIO()
+        total = processar_fluxo(self.pedidos, self.service, saida, tamanho_lote=3, exato=True)
+
+        self.assertEqual(total, Decimal("5803.52"))
+        linhas = [json.loads(linha) for linha in saida.getvalue().splitlines()]
+        self.assertEqual(
+            [linha["valor_centavos"] for linha in linhas], [387800, 145700, 17052, 29800]
+        )
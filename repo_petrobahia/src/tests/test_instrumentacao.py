@@ -0,0 +1,117 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from refatorado.instrumentacao import (
+    Histograma,
+    Instrumentacao,
+    SinkJson,
+    SinkMemoria,
+    SinkPrometheus,
+)
+from refatorado.pedido_service import PedidoService
+
+
+class TestInstrumentacao(unittest.TestCase):
+    """Testes para a camada de instrumentação."""
+
+    def setUp(self):
+        """Configura um relógio simulado que avança 1ms a cada leitura."""
+        self.tempo = [0.0]
+
+        def relogio():
+            self.tempo[0] += 0.001
+            return self.tempo[0]
+
+        self.sink = SinkMemoria()
+        self.instr = Instrumentacao(self.sink, relogio=relogio)
+        self.pedidos = [
+            {"cliente": "TransLog", "produto": "diesel", "qtd": 1200, "cupom": "MEGA10"},
+            {"cliente": "MoveMais", "produto": "gasolina", "qtd": 300, "cupom": None},
+            {"cliente": "Falho", "produto": "etanol", "qtd": 0},
+            {"cliente": "Aqua", "produto": "agua", "qtd": 10, "cupom": "MEGA10"},
+        ]
+
+    # Testes dos Componentes
+    def test_histograma_acumulado(self):
+        """Os baldes devem ser cumulativos e o último deve ser +Inf."""
+        histograma = Histograma((0.1, 1.0))
+        for valor in (0.05, 0.1, 0.5, 2.0):
+            histograma.observar(valor)
+        self.assertEqual(histograma.para_dict()["baldes"], [[0.1, 2], [1.0, 3], ["+Inf", 4]])
+        self.assertEqual(histograma.total, 4)
+
+    def test_etapa_registra_duracao(self):
+        """A etapa deve registrar a duração medida pelo relógio."""
+        with self.instr.etapa("cupom"):
+            pass
+        self.assertAlmostEqual(self.instr.histogramas["cupom"].soma, 0.001)
+
+    # Testes de Integração com o PedidoService
+    @patch("builtins.print")
+    def test_pedido_instrumentado(self, mock_print):
+        """O caminho instrumentado deve dar o mesmo valor e registrar etapas e contadores."""
+        sem_instrumentacao = [PedidoService().processar_pedido(p) for p in self.pedidos]
+        service = PedidoService(instrumentacao=self.instr)
+        com_instrumentacao = [service.processar_pedido(p) for p in self.pedidos]
+
+        self.assertEqual(com_instrumentacao, sem_instrumentacao)
+        snapshot = self.instr.exportar()
+        self.assertEqual(snapshot["contadores"]["produto"], {"diesel": 1, "gasolina": 1, "agua": 1})
+        self.assertEqual(snapshot["contadores"]["cupom"], {"MEGA10": 2, "": 1})
+        self.assertEqual(
+            snapshot["contadores"]["erro"], {"INVALIDO": 1, "PRODUTO_DESCONHECIDO": 1}
+        )
+        self.assertEqual(snapshot["histogramas"]["validacao"]["total"], 4)
+        self.assertEqual(snapshot["histogramas"]["arredondamento"]["total"], 3)
+        self.assertEqual(self.sink.snapshots, [snapshot])
+
+    def test_lote_instrumentado(self):
+        """O lote deve registrar uma medição por etapa e contar o lote inteiro."""
+        service = PedidoService(instrumentacao=self.instr)
+        service.processar_pedidos(self.pedidos, registrar_log=False)
+        snapshot = self.instr.snapshot()
+        for etapa in ("validacao", "preco_base", "cupom", "arredondamento"):
+            self.assertEqual(snapshot["histogramas"][f"lote.{etapa}"]["total"], 1)
+        self.assertEqual(snapshot["contadores"]["produto"]["diesel"], 1)
+        self.assertEqual(snapshot["contadores"]["erro"]["INVALIDO"], 1)
+
+    def test_sem_instrumentacao_nao_coleta(self):
+        """Sem instrumentação, o serviço não deve medir nada."""
+        service = PedidoService()
+        with patch("refatorado.instrumentacao.Instrumentacao.etapa") as mock_etapa:
+            service.processar_pedidos(self.pedidos, registrar_log=False)
+        mock_etapa.assert_not_called()
+
+    # Testes dos Sinks em Arquivo
+    def test_sinks_em_arquivo(self):
+        """Os sinks JSON e Prometheus devem gravar o snapshot."""
+        self.instr.contar("produto", "diesel", 3)
+        with self.instr.etapa("cupom"):
+            pass
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho_json = os.path.join(pasta, "metricas.json")
+            caminho_prom = os.path.join(pasta, "metricas.prom")
+            snapshot = self.instr.snapshot()
+            SinkJson(caminho_json).exportar(snapshot)
+            SinkPrometheus(caminho_prom).exportar(snapshot)
+
+            with open(caminho_json, encoding="utf-8") as arquivo:
+                self.assertEqual(json.load(arquivo)["contadores"]["produto"], {"diesel": 3})
+            with open(caminho_prom, encoding="utf-8") as arquivo:
+                texto = arquivo.read()
+
+        self.assertIn('petrobahia_eventos_total{categoria="produto",chave="diesel"} 3', texto)
+        self.assertIn('petrobahia_etapa_segundos_count{etapa="cupom"} 1', texto)
+        self.assertIn('petrobahia_etapa_segundos_bucket{etapa="cupom",le="+Inf"} 1', texto)
+
+    def test_prometheus_escapa_rotulos(self):
+        """Barra invertida, aspas e quebra de linha devem ser escapadas nos rótulos."""
+        self.instr.contar("cupom", 'A"B\\C\nD')
+        self.instr.contar("cupom", None)
+        texto = SinkPrometheus("nao-usado").formatar(self.instr.snapshot())
+        self.assertIn('chave="A\\"B\\\\C\\nD"} 1', texto)
+        self.assertIn('{categoria="cupom",chave=""} 1', texto)
+        self.assertEqual(len(texto.splitlines()), 4)  # dois TYPE e duas séries, sem linhas partidas
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+
+from refatorado.leitor_clientes import LeitorClientes
+
+
+class TestLeitorClientes(unittest.TestCase):
+    """Testes para o leitor memory-mapped do arquivo de clientes."""
+
+    def setUp(self):
+        """Grava um clientes.txt no formato do ClienteService."""
+        self.pasta = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.pasta.name, "clientes.txt")
+        self.clientes = [
+            {"nome": "Ana Paula", "email": "ana@@petrobahia", "cnpj": "123"},
+            {"nome": "Carlos", "email": "carlos@petrobahia.com", "cnpj": "456"},
+            {"nome": "D'Ávila Transportes", "email": "contato@davila.com", "cnpj": "789"},
+            {"nome": "Sem Email", "cnpj": "000"},
+        ]
+        with open(self.caminho, "w", encoding="utf-8") as arquivo:
+            for cliente in self.clientes:
+                arquivo.write(str(cliente) + "\n")
+            arquivo.write("\n")
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def test_valores_dos_campos_pedidos(self):
+        """Deve extrair apenas os campos pedidos, na ordem pedida."""
+        with LeitorClientes(self.caminho) as leitor:
+            valores = list(leitor.valores(("cnpj", "email")))
+        self.assertEqual(
+            valores,
+            [
+                ("123", "ana@@petrobahia"),
+                ("456", "carlos@petrobahia.com"),
+                ("789", "contato@davila.com"),
+                ("000", None),
+            ],
+        )
+
+    def test_valores_com_aspas_e_acentos(self):
+        """Deve decodificar valores que o repr escreve entre aspas duplas."""
+        with LeitorClientes(self.caminho) as leitor:
+            nomes = [nome for (nome,) in leitor.valores(("nome",))]
+        self.assertEqual(nomes, [c["nome"] for c in self.clientes])
+
+    def test_valor_que_imita_outro_campo(self):
+        """Um campo dentro do valor de outro não deve ser confundido com o real."""
+        cliente = {
+            "nome": "Posto X, 'email': 'fake@x.com'",
+            "email": "real@x.com",
+            "cnpj": "1, 'cnpj': '2'",
+        }
+        caminho = os.path.join(self.pasta.name, "imitacao.txt")
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            arquivo.write(str(cliente) + "\n")
+            arquivo.write(str({"nome": "Aninhado", "extra": [1, 2], "email": "a@b.com"}) + "\n")
+        with LeitorClientes(caminho) as leitor:
+            self.assertEqual(
+                list(leitor.valores()),
+                [
+                    (cliente["nome"], "real@x.com", cliente["cnpj"]),
+                    ("Aninhado", "a@b.com", None),
+                ],
+            )
+
+    def test_acesso_por_offset(self):
+        """Deve reler um registro a partir do seu offset."""
+        with LeitorClientes(self.caminho) as leitor:
+            registros = list(leitor.registros(("cnpj",)))
+            offset_carlos = registros[1][0]
+            self.assertEqual(
+                leitor.ler_em(offset_carlos), ("Carlos", "carlos@petrobahia.com", "456")
+            )
+            self.assertEqual([offset for offset, _ in registros], list(leitor.offsets()))
+            with self.assertRaises(IndexError):
+                leitor.ler_em(10**9)
+
+    def test_arquivo_vazio(self):
+        """Um arquivo vazio não deve ter registros."""
+        vazio = os.path.join(self.pasta.name, "vazio.txt")
+        open(vazio, "w", encoding="utf-8").close()
+        with LeitorClientes(vazio) as leitor:
+            self.assertEqual(list(leitor.valores()), [])
@@ -0,0 +1,124 @@
+import pickle
+import unittest
+from datetime import date
+
+from refatorado.motor_cupons import MotorCupons, RegraCupom
+from refatorado.pedido import LotePedidos
+from refatorado.preco_calculadora import PrecoCalculadora
+
+
+class TestMotorCupons(unittest.TestCase):
+    """Testes para o motor de cupons."""
+
+    def setUp(self):
+        """Configura um motor com regras padrão e regras adicionais."""
+        self.motor = MotorCupons(
+            (
+                RegraCupom("MEGA10", multiplicador=0.9),
+                RegraCupom("LUB2", deducao=2.0, produtos=frozenset({"lubrificante"})),
+                RegraCupom("FROTA3", multiplicador=0.97, cumulativo=True),
+                RegraCupom("PIX1", deducao=1.0, cumulativo=True),
+                RegraCupom(
+                    "VERAO",
+                    multiplicador=0.8,
+                    inicio=date(2026, 1, 1),
+                    fim=date(2026, 3, 31),
+                ),
+            )
+        )
+
+    # Testes de Regras Individuais
+    def test_regras_padrao(self):
+        """O motor padrão deve reproduzir os cupons originais."""
+        motor = MotorCupons()
+        self.assertEqual(motor.aplicar(100.0, "MEGA10", "diesel"), 100.0 * 0.9)
+        self.assertEqual(motor.aplicar(100.0, "NOVO5", "diesel"), 100.0 * 0.95)
+        self.assertEqual(motor.aplicar(50.0, "LUB2", "lubrificante"), 48.0)
+        self.assertEqual(motor.aplicar(50.0, "LUB2", "diesel"), 50.0)
+        self.assertEqual(motor.aplicar(50.0, "XPTO", "diesel"), 50.0)
+        self.assertEqual(motor.aplicar(50.0, None, "diesel"), 50.0)
+
+    def test_cupom_com_validade(self):
+        """Cupom só vale dentro do período, com datas inclusivas."""
+        self.assertEqual(self.motor.aplicar(100.0, "VERAO", "diesel", date(2026, 3, 31)), 80.0)
+        self.assertEqual(self.motor.aplicar(100.0, "VERAO", "diesel", date(2026, 4, 1)), 100.0)
+
+    # Testes de Combinação
+    def test_cupons_cumulativos(self):
+        """Cupons cumulativos devem ser aplicados em sequência."""
+        self.assertEqual(self.motor.aplicar(100.0, "FROTA3+PIX1", "diesel"), 100.0 * 0.97 - 1.0)
+
+    def test_cupom_nao_cumulativo_nao_combina(self):
+        """Uma combinação com cupom não cumulativo ou desconhecido não dá desconto."""
+        self.assertEqual(self.motor.aplicar(100.0, "MEGA10+PIX1", "diesel"), 100.0)
+        self.assertEqual(self.motor.aplicar(100.0, "PIX1+MEGA10", "diesel"), 100.0)
+        self.assertEqual(self.motor.aplicar(100.0, "PIX1+XPTO", "diesel"), 100.0)
+
+    def test_combinacao_como_no_codigo_original(self):
+        """Cupons padrão combinados seguem desconhecidos, como no serviço legado."""
+        motor = MotorCupons()
+        preco = PrecoCalculadora().calcular_preco("gasolina", 10)
+        self.assertEqual(round(motor.aplicar(preco, "MEGA10+NOVO5", "gasolina"), 2), 51.90)
+
+    def test_combinacao_ignora_cupons_fora_do_periodo(self):
+        """Cupons cumulativos fora do período ou de outro produto não contam na combinação."""
+        motor = MotorCupons(
+            (
+                RegraCupom("PIX1", deducao=1.0, cumulativo=True),
+                RegraCupom(
+                    "LUB3", deducao=3.0, produtos=frozenset({"lubrificante"}), cumulativo=True
+                ),
+            )
+        )
+        self.assertEqual(motor.aplicar(100.0, "LUB3+PIX1", "diesel"), 99.0)
+        self.assertEqual(motor.aplicar(100.0, "LUB3+PIX1", "lubrificante"), 96.0)
+
+    # Testes de Lote e Imutabilidade
+    def test_aplicar_lote_igual_ao_individual(self):
+        """O lote deve ter o mesmo resultado da aplicação item a item."""
+        precos = [100.0, 50.0, 50.0, 100.0, 70.0]
+        cupons = ["MEGA10", "LUB2", "LUB2", None, "FROTA3+PIX1"]
+        produtos = ["diesel", "lubrificante", "diesel", "etanol", "gasolina"]
+        esperado = [self.motor.aplicar(*item) for item in zip(precos, cupons, produtos)]
+        self.assertEqual(self.motor.aplicar_lote(precos, cupons, produtos), esperado)
+
+        lote = LotePedidos.de_pedidos(
+            {"produto": produto, "qtd": 1, "cupom": cupom}
+            for produto, cupom in zip(produtos, cupons)
+        )
+        self.assertEqual(
+            self.motor.aplicar_lote_codificado(
+                precos, lote.codigos_cupom, lote.codigos_produto, lote.nomes
+            ),
+            esperado,
+        )
+
+    def test_coeficientes_pre_calculados(self):
+        """Um cupom simples deve devolver sempre a mesma tupla de coeficientes."""
+        primeira = self.motor._resolver("MEGA10", "diesel", None)
+        self.assertEqual(primeira, ((0.9, 0.0),))
+        self.assertIs(self.motor._resolver("MEGA10", "etanol", None), primeira)
+
+    def test_tabela_imutavel(self):
+        """A tabela de regras não pode ser alterada depois de criada."""
+        with self.assertRaises(TypeError):
+            self.motor.regras["NOVO"] = RegraCupom("NOVO", 0.5)
+
+    def test_serializavel_para_outros_processos(self):
+        """O motor deve poder ser enviado a processos trabalhadores."""
+        copia = pickle.loads(pickle.dumps(self.motor))
+        self.assertEqual(dict(copia.regras), dict(self.motor.regras))
+
+    def test_de_dict(self):
+        """Deve montar as regras a partir da configuração."""
+        motor = MotorCupons.de_dict(
+            {
+                "MEGA10": {"percentual": 10},
+                "LUB2": {"deducao": 2.0, "produtos": ["lubrificante"]},
+                "NATAL": {"percentual": 15, "inicio": "2026-12-01", "fim": "2026-12-31"},
+            }
+        )
+        self.assertEqual(motor.aplicar(100.0, "MEGA10", "diesel"), 100.0 * 0.9)
+        self.assertEqual(motor.aplicar(10.0, "LUB2", "lubrificante"), 8.0)
+        self.assertEqual(motor.aplicar(100.0, "NATAL", "diesel", date(2026, 12, 24)), 85.0)
+        self.assertEqual(motor.aplicar(100.0, "NATAL", "diesel", date(2027, 1, 1)), 100.0)
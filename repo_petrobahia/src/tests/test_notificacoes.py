@@ -0,0 +1,171 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from refatorado.cliente_service import ClienteService
+from refatorado.notificacoes import FilaNotificacoes, MensagemBoasVindas, SmtpLocal
+from refatorado.repositorio_clientes import RepositorioClientes
+
+
+class TestFilaNotificacoes(unittest.TestCase):
+    """Testes para a fila de notificações em segundo plano."""
+
+    def setUp(self):
+        """Prepara mensagens e uma espera simulada (sem dormir de verdade)."""
+        self.esperas = []
+        self.mensagens = [MensagemBoasVindas(f"c{i}@frota.com", f"Cliente {i}") for i in range(25)]
+
+    def test_entrega_todas_ao_encerrar(self):
+        """Ao encerrar, todas as mensagens pendentes devem ser entregues."""
+        smtp = SmtpLocal()
+        with FilaNotificacoes(smtp, workers=3, tamanho_lote=4) as fila:
+            for mensagem in self.mensagens:
+                fila.enviar(mensagem)
+        self.assertCountEqual(smtp.enviadas, self.mensagens)
+
+    def test_agrupa_em_lotes(self):
+        """Mensagens já enfileiradas devem ser entregues em lotes."""
+        smtp = SmtpLocal()
+        liberar = threading.Event()
+        original = smtp.enviar_lote
+
+        def enviar_lote(lote):
+            liberar.wait(5)
+            original(lote)
+
+        smtp.enviar_lote = enviar_lote
+        fila = FilaNotificacoes(smtp, workers=1, tamanho_lote=10)
+        for mensagem in self.mensagens:
+            fila.enviar(mensagem)
+        liberar.set()
+        fila.encerrar()
+
+        self.assertEqual(smtp.enviadas, self.mensagens)
+        self.assertLess(smtp.tentativas, len(self.mensagens))
+
+    def test_nova_tentativa_com_espera_exponencial(self):
+        """Falhas temporárias devem ser repetidas com espera crescente."""
+        smtp = SmtpLocal(falhas=2)
+        fila = FilaNotificacoes(smtp, workers=1, espera_inicial=0.5, dormir=self.esperas.append)
+        fila.enviar(self.mensagens[0])
+        fila.encerrar()
+        self.assertEqual(smtp.enviadas, [self.mensagens[0]])
+        self.assertEqual(self.esperas, [0.5, 1.0])
+
+    def test_desiste_apos_max_tentativas(self):
+        """Após esgotar as tentativas, o lote vai para 'nao_entregues'."""
+        smtp = SmtpLocal(falhas=10)
+        fila = FilaNotificacoes(smtp, workers=1, max_tentativas=3, dormir=self.esperas.append)
+        fila.enviar(self.mensagens[0])
+        fila.encerrar()
+        self.assertEqual(fila.nao_entregues, [self.mensagens[0]])
+        self.assertEqual(smtp.tentativas, 3)
+
+    def test_enviar_apos_encerrar(self):
+        """Não deve aceitar mensagens depois de encerrada."""
+        fila = FilaNotificacoes(SmtpLocal(), workers=1)
+        fila.encerrar()
+        with self.assertRaises(RuntimeError):
+            fila.enviar(self.mensagens[0])
+
+    def test_enviar_concorrente_com_encerrar(self):
+        """Toda mensagem aceita durante o encerramento deve ser entregue."""
+        smtp = SmtpLocal()
+        fila = FilaNotificacoes(smtp, workers=2, tamanho_lote=3)
+        aceitas = []
+
+        def enviar_todas():
+            for mensagem in self.mensagens:
+                try:
+                    fila.enviar(mensagem)
+                except RuntimeError:
+                    return
+                aceitas.append(mensagem)
+
+        remetente = threading.Thread(target=enviar_todas)
+        remetente.start()
+        fila.encerrar()
+        remetente.join()
+        self.assertCountEqual(smtp.enviadas, aceitas)
+
+    @patch("builtins.print")
+    def test_erro_inesperado_do_transporte(self, mock_print):
+        """Um erro que não é OSError não derruba a thread: o lote vai para 'nao_entregues'."""
+        smtp = SmtpLocal()
+        original = smtp.enviar_lote
+
+        def enviar_lote(lote):
+            if lote[0] is self.mensagens[0]:
+                raise ValueError("resposta inesperada do relay")
+            original(lote)
+
+        smtp.enviar_lote = enviar_lote
+        fila = FilaNotificacoes(smtp, workers=1, tamanho_lote=1, dormir=self.esperas.append)
+        fila.enviar(self.mensagens[0])
+        fila.enviar(self.mensagens[1])
+        fila.encerrar()
+        self.assertEqual(fila.nao_entregues, [self.mensagens[0]])
+        self.assertEqual(smtp.enviadas, [self.mensagens[1]])
+        self.assertEqual(self.esperas, [])
+        self.assertIn("[ERRO]", mock_print.call_args[0][0])
+
+    def test_fila_cheia_nao_trava_encerramento(self):
+        """Com um remetente esperando espaço, enviar após encerrar falha na hora."""
+        smtp = SmtpLocal()
+        liberar = threading.Event()
+        original = smtp.enviar_lote
+
+        def enviar_lote(lote):
+            liberar.wait(5)
+            original(lote)
+
+        smtp.enviar_lote = enviar_lote
+        fila = FilaNotificacoes(smtp, workers=1, tamanho_lote=1, capacidade=1)
+        colocar = fila._fila.put
+        terceira = threading.Event()
+
+        def put(item):
+            if item is self.mensagens[2]:
+                terceira.set()
+            colocar(item)
+
+        fila._fila.put = put
+        remetente = threading.Thread(
+            target=lambda: [fila.enviar(m) for m in self.mensagens[:3]]
+        )
+        remetente.start()
+        encerramento = threading.Thread(target=fila.encerrar)
+        # A 3ª mensagem já passou pela verificação e espera espaço na fila.
+        terceira.wait(5)
+        encerramento.start()
+        while not fila._encerrada:
+            liberar.wait(0.001)
+        with self.assertRaises(RuntimeError):
+            fila.enviar(self.mensagens[3])
+        liberar.set()
+        remetente.join()
+        encerramento.join()
+        self.assertEqual(smtp.enviadas, self.mensagens[:3])
+
+    # Testes de Integração com o ClienteService
+    @patch("builtins.print")
+    def test_cadastro_enfileira_boas_vindas(self, mock_print):
+        """O cadastro deve enfileirar o email em vez de enviá-lo na hora."""
+        smtp = SmtpLocal()
+        with FilaNotificacoes(smtp, workers=2) as fila:
+            service = ClienteService(repositorio=RepositorioClientes(), notificador=fila)
+            service.cadastrar_cliente({"nome": "Carlos", "email": "c@p.com", "cnpj": "456"})
+            service.cadastrar_clientes(
+                [
+                    {"nome": "Ana", "email": "a@p.com", "cnpj": "123"},
+                    {"nome": "Carlos", "email": "c@p.com", "cnpj": "456"},
+                ]
+            )
+        self.assertCountEqual(
+            smtp.enviadas,
+            [MensagemBoasVindas("c@p.com", "Carlos"), MensagemBoasVindas("a@p.com", "Ana")],
+        )
+        mock_print.assert_called_with(
+            "1 clientes cadastrados, 0 com dados incompletos, 1 duplicados, "
+            "0 com email inválido (aceitos)."
+        )
@@ -0,0 +1,133 @@
+import sys
+import unittest
+from unittest.mock import patch
+
+from refatorado.agregacao import Agregador
+from refatorado.pedido import LotePedidos, Pedido, como_pedido
+from refatorado.pedido_service import PedidoService
+from refatorado.preco_calculadora import PrecoCalculadora
+
+PEDIDOS = [
+    {"cliente": "TransLog", "produto": "diesel", "qtd": 1200, "cupom": "MEGA10"},
+    {"cliente": "MoveMais", "produto": "gasolina", "qtd": 300, "cupom": None},
+    {"cliente": "Falho", "produto": "etanol", "qtd": 0},
+    {"cliente": "EcoFrota", "produto": "etanol", "qtd": 81, "cupom": "NOVO5"},
+    {"cliente": "Aqua", "produto": "agua", "qtd": 10},
+    {"cliente": "Vazio", "qtd": 10},
+    {"cliente": "PetroPark", "produto": "lubrificante", "qtd": 12, "cupom": "LUB2"},
+]
+
+
+class TestPedido(unittest.TestCase):
+    """Testes do registro compacto de pedido."""
+
+    def test_ida_e_volta_pelo_dict(self):
+        """Converter para ``Pedido`` e de volta deve preservar os campos."""
+        pedido = Pedido.de_dict(PEDIDOS[0])
+        self.assertEqual(pedido.para_dict(), PEDIDOS[0])
+        self.assertEqual(Pedido.de_dict(PEDIDOS[2]), Pedido("Falho", "etanol", 0, None))
+
+    def test_sem_dict_por_instancia(self):
+        """O registro usa slots, sem ``__dict__`` por instância."""
+        self.assertFalse(hasattr(Pedido(), "__dict__"))
+
+    def test_textos_internados(self):
+        """Códigos iguais vindos de textos diferentes devem virar o mesmo objeto."""
+        produto = "".join(["die", "sel"])
+        self.assertIs(Pedido.de_dict({"produto": produto}).produto, sys.intern("diesel"))
+
+    def test_como_pedido(self):
+        """O adaptador deve aceitar tanto ``Pedido`` quanto dicionário."""
+        pedido = Pedido("A", "diesel", 10, None)
+        self.assertIs(como_pedido(pedido), pedido)
+        self.assertEqual(como_pedido(pedido.para_dict()), pedido)
+
+
+class TestLotePedidos(unittest.TestCase):
+    """Testes do lote de pedidos em colunas."""
+
+    def setUp(self):
+        """Monta o lote a partir dos pedidos de exemplo."""
+        self.lote = LotePedidos.de_pedidos(PEDIDOS)
+
+    def test_ida_e_volta(self):
+        """Os pedidos lidos do lote devem ser iguais aos originais."""
+        self.assertEqual(len(self.lote), len(PEDIDOS))
+        self.assertEqual(list(self.lote), [Pedido.de_dict(p) for p in PEDIDOS])
+        self.assertEqual(self.lote[3], Pedido("EcoFrota", "etanol", 81, "NOVO5"))
+
+    def test_vocabulario_compartilhado(self):
+        """Cada produto ou cupom distinto deve aparecer uma única vez no vocabulário."""
+        lote = LotePedidos.de_pedidos(PEDIDOS * 100)
+        self.assertEqual(len(lote.nomes), len(self.lote.nomes))
+        self.assertEqual(lote.codigos_produto.itemsize, 4)
+
+    def test_quantidade_fracionaria_recusada(self):
+        """Quantidade não inteira é recusada sem deixar o lote pela metade."""
+        with self.assertRaises(TypeError):
+            self.lote.adicionar("Frota", "diesel", 10.5, None)
+        self.assertEqual(len(self.lote.clientes), len(self.lote))
+
+    def test_memoria_por_pedido(self):
+        """As colunas devem ocupar bem menos memória que os dicionários."""
+        quantidade = 10_000
+        pedidos = [dict(PEDIDOS[i % len(PEDIDOS)]) for i in range(quantidade)]
+        lote = LotePedidos.de_pedidos(pedidos)
+        memoria_dicts = sum(map(sys.getsizeof, pedidos))
+        memoria_lote = sum(
+            map(
+                sys.getsizeof,
+                (lote.clientes, lote.codigos_produto, lote.quantidades, lote.codigos_cupom),
+            )
+        )
+        self.assertLess(memoria_lote * 4, memoria_dicts)
+
+
+@patch("builtins.print")
+class TestServicosComPedidoCompacto(unittest.TestCase):
+    """Os serviços devem aceitar ``Pedido`` e ``LotePedidos`` nativamente."""
+
+    def setUp(self):
+        """Configura o serviço e as três representações do mesmo lote."""
+        self.service = PedidoService()
+        self.registros = [Pedido.de_dict(p) for p in PEDIDOS]
+        self.lote = LotePedidos.de_pedidos(PEDIDOS)
+
+    def test_pedido_individual(self, mock_print):
+        """``processar_pedido`` deve dar o mesmo valor para ``Pedido`` e dicionário."""
+        for registro, pedido in zip(self.registros, PEDIDOS):
+            self.assertEqual(
+                self.service.processar_pedido(registro), self.service.processar_pedido(pedido)
+            )
+
+    def test_lote_nas_tres_formas(self, mock_print):
+        """O lote deve dar o mesmo resultado com dicionários, ``Pedido`` e colunas."""
+        esperado = self.service.processar_pedidos(PEDIDOS)
+        self.assertEqual(self.service.processar_pedidos(self.registros), esperado)
+        self.assertEqual(self.service.processar_pedidos(self.lote), esperado)
+
+    def test_lote_centavos_em_colunas(self, mock_print):
+        """O modo exato também deve aceitar o lote em colunas."""
+        self.assertEqual(
+            self.service.processar_pedidos_centavos(self.lote),
+            self.service.processar_pedidos_centavos(PEDIDOS),
+        )
+
+    def test_calculadora_em_colunas(self, mock_print):
+        """A calculadora deve precificar as colunas do lote como ``calcular_precos``."""
+        calculadora = PrecoCalculadora()
+        esperado = calculadora.calcular_precos(self.lote.produtos, list(self.lote.quantidades))
+        self.assertEqual(list(calculadora.calcular_precos_lote(self.lote)), list(esperado))
+
+    def test_agregador_com_lote_em_colunas(self, mock_print):
+        """A agregação deve aceitar o lote em colunas."""
+        por_dict, por_colunas = Agregador(), Agregador()
+        por_dict.adicionar_lote(PEDIDOS, self.service.processar_pedidos(PEDIDOS), self.service)
+        por_colunas.adicionar_lote(
+            self.lote, self.service.processar_pedidos(self.lote), self.service
+        )
+        self.assertEqual(por_colunas, por_dict)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,13 @@
 import unittest
+from decimal import Decimal
 from unittest.mock import MagicMock, patch
 
-from refatorado.pedido_service import PedidoService
+from refatorado.pedido_service import (
+    STATUS_INVALIDO,
+    STATUS_OK,
+    STATUS_PRODUTO_DESCONHECIDO,
+    PedidoService,
+)
 
 
 class TestPedidoService(unittest.TestCase):
@@ -107,3 +113,110 @@ class TestPedidoService(unittest.TestCase):
         preco_final = self.service.processar_pedido(pedido)
         self.assertAlmostEqual(preco_final, 95.00)
         self.calc_mock.calcular_preco.assert_called_once_with("etanol", 100)
+
+
+class TestPedidoServiceLote(unittest.TestCase):
+    """Testes do processamento em lote com a calculadora real."""
+
+    def setUp(self):
+        """Configura o serviço e um lote de pedidos variados."""
+        self.service = PedidoService()
+        self.pedidos = [
+            {"cliente": "TransLog", "produto": "diesel", "qtd": 1200, "cupom": "MEGA10"},
+            {"cliente": "MoveMais", "produto": "gasolina", "qtd": 300, "cupom": None},
+            {"cliente": "Falho", "produto": "etanol", "qtd": 0},
+            {"cliente": "EcoFrota", "produto": "etanol", "qtd": 50, "cupom": "NOVO5"},
+            {"cliente": "Aqua", "produto": "agua", "qtd": 10},
+            {"cliente": "PetroPark", "produto": "lubrificante", "qtd": 12, "cupom": "LUB2"},
+        ]
+
+    @patch("builtins.print")
+    def test_lote_igual_ao_processamento_individual(self, mock_print):
+        """Valores e total devem ser idênticos ao processamento pedido a pedido."""
+        esperado = [self.service.processar_pedido(p) for p in self.pedidos]
+        resultado = self.service.processar_pedidos(self.pedidos)
+        self.assertEqual(resultado.valores, esperado)
+        self.assertEqual(resultado.total, sum(esperado))
+
+    @patch("builtins.print")
+    def test_lote_status_por_linha(self, mock_print):
+        """Deve informar o status de cada linha do lote."""
+        resultado = self.service.processar_pedidos(self.pedidos)
+        self.assertEqual(
+            resultado.status,
+            [
+                STATUS_OK,
+                STATUS_OK,
+                STATUS_INVALIDO,
+                STATUS_OK,
+                STATUS_PRODUTO_DESCONHECIDO,
+                STATUS_OK,
+            ],
+        )
+
+    @patch("builtins.print")
+    def test_lote_imprime_uma_unica_linha(self, mock_print):
+        """Deve imprimir no máximo uma linha de resumo por lote."""
+        self.service.processar_pedidos(iter(self.pedidos))
+        self.assertEqual(mock_print.call_count, 1)
+
+    @patch("builtins.print")
+    def test_lote_sem_log(self, mock_print):
+        """Não deve imprimir nada quando o log estiver desligado."""
+        self.service.processar_pedidos(self.pedidos, registrar_log=False)
+        mock_print.assert_not_called()
+
+    def test_lote_vazio(self):
+        """Um lote vazio deve resultar em total zero."""
+        resultado = self.service.processar_pedidos([], registrar_log=False)
+        self.assertEqual(resultado.valores, [])
+        self.assertEqual(resultado.total, 0)
+
+
+class TestPedidoServiceCentavos(unittest.TestCase):
+    """Testes do processamento em lote no modo de dinheiro exato."""
+
+    def setUp(self):
+        """Configura o serviço com a calculadora real."""
+        self.service = PedidoService()
+
+    def test_centavos_igual_ao_float_no_exemplo(self):
+        """No exemplo do main, o modo exato deve chegar ao mesmo TOTAL."""
+        pedidos = [
+            {"cliente": "TransLog", "produto": "diesel", "qtd": 1200, "cupom": "MEGA10"},
+            {"cliente": "MoveMais", "produto": "gasolina", "qtd": 300, "cupom": None},
+            {"cliente": "EcoFrota", "produto": "etanol", "qtd": 50, "cupom": "NOVO5"},
+            {"cliente": "PetroPark", "produto": "lubrificante", "qtd": 12, "cupom": "LUB2"},
+            {"cliente": "Falho", "produto": "diesel", "qtd": 0},
+        ]
+        resultado = self.service.processar_pedidos_centavos(pedidos, registrar_log=False)
+        self.assertEqual(resultado.valores, [387800, 145700, 17052, 29800, 0])
+        self.assertEqual(resultado.total, 580352)
+        self.assertEqual(resultado.status[-1], STATUS_INVALIDO)
+
+    def test_centavos_corrige_erro_de_truncamento_float(self):
+        """3.59 * 19 = 68.21 exatos; o truncamento em float perde um centavo."""
+        pedido = [{"produto": "etanol", "qtd": 19}]
+        self.assertEqual(self.service.processar_pedidos(pedido, False).valores, [68.2])
+        self.assertEqual(self.service.processar_pedidos_centavos(pedido, False).valores, [6821])
+
+    def test_centavos_com_quantidade_fracionaria(self):
+        """O modo exato aceita a quantidade em float, como no modo padrão."""
+        pedido = [{"produto": "diesel", "qtd": 10.5}, {"produto": "etanol", "qtd": 2.2}]
+        exato = self.service.processar_pedidos_centavos(pedido, False)
+        self.assertEqual(self.service.processar_pedidos(pedido, False).valores, [42.0, 7.9])
+        self.assertEqual(exato.valores, [4200, 790])
+
+    def test_arredondar_centavos(self):
+        """Deve manter as regras de arredondamento por produto."""
+        self.assertEqual(self.service._arredondar_centavos(Decimal("3878.51"), "diesel"), 387900)
+        self.assertEqual(self.service._arredondar_centavos(Decimal("1457.996"), "gasolina"), 145800)
+        self.assertEqual(self.service._arredondar_centavos(Decimal("170.529"), "etanol"), 17052)
+
+    @patch("builtins.print")
+    def test_centavos_imprime_resumo(self, mock_print):
+        """Deve imprimir uma única linha de resumo com o TOTAL exato."""
+        self.service.processar_pedidos_centavos([{"produto": "etanol", "qtd": 19}])
+        mock_print.assert_called_once_with(
+            "Lote processado: 1 pedidos precificados, 0 inválidos | TOTAL = R$68.21"
+        )
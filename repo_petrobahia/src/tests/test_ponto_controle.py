@@ -0,0 +1,137 @@
+import json
+import os
+import tempfile
+import unittest
+
+from refatorado.agregacao import Agregador
+from refatorado.ingestao_pedidos import abrir_entrada_posicionada, ler_pedidos, processar_fluxo
+from refatorado.pedido_service import PedidoService
+from refatorado.ponto_controle import (
+    PontoControle,
+    PontosControle,
+    abrir_saida_retomada,
+    carregar_ponto_controle,
+)
+
+PEDIDOS = [
+    {"cliente": "TransLog", "produto": "diesel", "qtd": 1200, "cupom": "MEGA10"},
+    {"cliente": "MoveMais", "produto": "gasolina", "qtd": 300, "cupom": None},
+    {"cliente": "Falho", "produto": "etanol", "qtd": 0, "cupom": None},
+    {"cliente": "EcoFrota", "produto": "etanol", "qtd": 81, "cupom": "NOVO5"},
+    {"cliente": "PetroPark", "produto": "lubrificante", "qtd": 12, "cupom": "LUB2"},
+]
+
+
+def _interromper_apos(pedidos, limite):
+    """Repassa ``limite`` pedidos e então simula a queda do processo."""
+    for indice, pedido in enumerate(pedidos):
+        if indice == limite:
+            raise KeyboardInterrupt
+        yield pedido
+
+
+class TestRetomada(unittest.TestCase):
+    """Testes da gravação de pontos de controle e da retomada do fluxo."""
+
+    def setUp(self):
+        """Grava a entrada de exemplo em um diretório temporário."""
+        self.pasta = tempfile.TemporaryDirectory()
+        self.entrada = self._caminho("pedidos.jsonl")
+        self.ponto = self._caminho("ponto.json")
+        with open(self.entrada, "w", encoding="utf-8") as arquivo:
+            arquivo.writelines(json.dumps(pedido) + "\n" for pedido in PEDIDOS * 7)
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def _caminho(self, nome):
+        return os.path.join(self.pasta.name, nome)
+
+    def _executar(self, saida_caminho, exato=False, workers=1, interromper=None, retomar=False):
+        """Processa a entrada com pontos de controle, como faz o ``main_refatorado``."""
+        anterior = carregar_ponto_controle(self.ponto) if retomar else None
+        if anterior is None:
+            inicial = PontoControle(self.entrada, exato, agregados=Agregador().para_dict())
+            saida = open(saida_caminho, "w", encoding="utf-8")
+        else:
+            inicial = anterior
+            saida = abrir_saida_retomada(saida_caminho, anterior.saida_bytes)
+        agregador = Agregador.de_dict(inicial.agregados)
+        with saida, abrir_entrada_posicionada(self.entrada, inicial.posicao) as entrada:
+            pontos = PontosControle(self.ponto, entrada, inicial, a_cada=2)
+            pedidos = ler_pedidos(entrada)
+            if interromper is not None:
+                pedidos = _interromper_apos(pedidos, interromper)
+            total = processar_fluxo(
+                pedidos, PedidoService(), saida, 3, workers, exato, agregador, pontos=pontos
+            )
+        pontos.encerrar()
+        return total, agregador
+
+    def _ler(self, caminho):
+        with open(caminho, "r", encoding="utf-8") as arquivo:
+            return arquivo.read()
+
+    def test_retomada_sem_repetir_nem_perder_pedidos(self):
+        """Cair e retomar deve dar a mesma saída, TOTAL e agregados de uma execução única."""
+        for exato, workers in ((False, 1), (True, 1), (False, 2)):
+            with self.subTest(exato=exato, workers=workers):
+                esperado = self._executar(self._caminho("inteira.jsonl"), exato, workers)
+                saida = self._caminho("retomada.jsonl")
+                with self.assertRaises(KeyboardInterrupt):
+                    self._executar(saida, exato, workers, interromper=22)
+                ponto = carregar_ponto_controle(self.ponto)
+                # Um ponto a cada 2 lotes de 3; em paralelo, há lotes lidos e ainda em voo.
+                self.assertIn(ponto.pedidos, (6, 12, 18))
+
+                obtido = self._executar(saida, exato, workers, retomar=True)
+                self.assertEqual(obtido, esperado)
+                self.assertEqual(self._ler(saida), self._ler(self._caminho("inteira.jsonl")))
+                self.assertFalse(os.path.exists(self.ponto))
+
+    def test_retomar_sem_ponto_comeca_do_inicio(self):
+        """Sem ponto de controle salvo, a retomada processa tudo."""
+        total, _ = self._executar(self._caminho("saida.jsonl"), retomar=True)
+        self.assertEqual(len(self._ler(self._caminho("saida.jsonl")).splitlines()), 35)
+        self.assertGreater(total, 0)
+
+    def test_entrada_posicionada_repete_cabecalho_do_csv(self):
+        """Ao retomar um CSV, o cabeçalho é lido de novo antes da posição salva."""
+        caminho = self._caminho("pedidos.csv")
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            arquivo.write("cliente,produto,qtd,cupom\nA,diesel,10,\nB,gasolina,20,\n")
+        with abrir_entrada_posicionada(caminho) as entrada:
+            primeiro = next(ler_pedidos(entrada, "csv"))
+            posicao = entrada.posicao
+        self.assertEqual(primeiro["cliente"], "A")
+        with abrir_entrada_posicionada(caminho, posicao, cabecalho=True) as entrada:
+            self.assertEqual([p["cliente"] for p in ler_pedidos(entrada, "csv")], ["B"])
+
+    def test_validar_retomada(self):
+        """A retomada deve recusar outra entrada ou outras opções."""
+        ponto = PontoControle(self.entrada, exato=False)
+        ponto.validar_retomada(self.entrada, False, False)
+        for argumentos in (
+            (self._caminho("outra.jsonl"), False, False),
+            (self.entrada, True, False),
+            (self.entrada, False, True),
+        ):
+            with self.assertRaises(ValueError):
+                ponto.validar_retomada(*argumentos)
+
+    def test_saida_menor_que_o_ponto(self):
+        """Uma saída truncada por fora não pode ser retomada."""
+        caminho = self._caminho("saida.jsonl")
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            arquivo.write("{}\n")
+        with self.assertRaises(ValueError):
+            abrir_saida_retomada(caminho, 100)
+
+    def test_formato_desconhecido(self):
+        """Deve recusar um ponto de controle de outro formato."""
+        with self.assertRaises(ValueError):
+            PontoControle.de_dict({"formato": 99, "entrada": "x", "exato": False})
+
+
+if __name__ == "__main__":
+    unittest.main()
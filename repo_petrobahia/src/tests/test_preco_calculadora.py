@@ -1,5 +1,7 @@
 import unittest
+from unittest.mock import patch
 
+from refatorado import preco_calculadora
 from refatorado.preco_calculadora import PrecoCalculadora
 
 
@@ -61,3 +63,60 @@ class TestPrecoCalculadora(unittest.TestCase):
         # Preço base: 3.59 * 100 = 359.00
         # Desconto: 359.00 * 0.97 = 348.23
         self.assertAlmostEqual(self.calc.calcular_preco("etanol", 100), 348.23, 2)
+
+    # Testes do Cálculo em Lote
+    def test_calcular_precos_igual_ao_escalar(self):
+        """O lote deve reproduzir exatamente o cálculo item a item."""
+        produtos = []
+        quantidades = []
+        for produto in ("diesel", "gasolina", "etanol", "lubrificante", "agua"):
+            for qtd in (1, 12, 50, 79, 80, 81, 199, 200, 201, 499, 500, 501, 999, 1000, 1001, 1200):
+                produtos.append(produto)
+                quantidades.append(qtd)
+
+        with patch("builtins.print"):
+            esperado = [self.calc.calcular_preco(p, q) for p, q in zip(produtos, quantidades)]
+        self.assertEqual(list(self.calc.calcular_precos(produtos, quantidades)), esperado)
+
+    def test_calcular_precos_sem_numpy(self):
+        """Sem NumPy, o lote deve cair no caminho em Python puro."""
+        with patch("refatorado.preco_calculadora.np", None):
+            precos = self.calc.calcular_precos(["diesel", "etanol"], [1200, 100])
+        self.assertIsInstance(precos, list)
+        self.assertEqual(precos, [4309.2, 348.23])
+
+    @unittest.skipIf(preco_calculadora.np is None, "NumPy não instalado")
+    def test_calcular_precos_com_numpy(self):
+        """Com NumPy, o lote deve retornar um ndarray."""
+        precos = self.calc.calcular_precos(["gasolina", "lubrificante"], [300, 10])
+        self.assertIsInstance(precos, preco_calculadora.np.ndarray)
+        self.assertEqual(precos.tolist(), [1457.0, 250.0])
+
+    def test_calcular_precos_tamanhos_diferentes(self):
+        """Deve rejeitar colunas de tamanhos diferentes."""
+        with self.assertRaises(ValueError):
+            self.calc.calcular_precos(["diesel"], [1, 2])
+
+    @patch.dict(PrecoCalculadora.BASES, {"diesel": 4.50})
+    def test_recompilar_apos_alterar_bases(self):
+        """A tabela só reflete mudanças em BASES depois de recompilar."""
+        self.assertEqual(self.calc.calcular_preco("diesel", 10), 39.9)
+        versao = self.calc.tabela.versao
+        self.calc.recompilar()
+        self.assertEqual(self.calc.calcular_preco("diesel", 10), 45.0)
+        self.assertNotEqual(self.calc.tabela.versao, versao)
+
+    # Testes do Modo de Dinheiro Exato
+    def test_calcular_preco_centavos(self):
+        """Deve calcular em decimal e retornar centavos inteiros."""
+        self.assertEqual(self.calc.calcular_preco_centavos("diesel", 1200), 430920)
+        self.assertEqual(self.calc.calcular_preco_centavos("gasolina", 300), 145700)
+        self.assertEqual(self.calc.calcular_preco_centavos("etanol", 100), 34823)
+        self.assertEqual(self.calc.calcular_preco_centavos("agua", 10), 0)
+
+    def test_calcular_precos_centavos(self):
+        """O lote exato deve coincidir com o cálculo item a item."""
+        self.assertEqual(
+            self.calc.calcular_precos_centavos(["diesel", "lubrificante"], [800, 10]),
+            [303240, 25000],
+        )
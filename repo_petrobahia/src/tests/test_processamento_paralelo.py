@@ -0,0 +1,55 @@
+import io
+import random
+import unittest
+
+from refatorado.ingestao_pedidos import em_lotes, processar_fluxo
+from refatorado.pedido_service import PedidoService
+from refatorado.processamento_paralelo import precificar_em_paralelo
+
+
+class TestProcessamentoParalelo(unittest.TestCase):
+    """Testes para a precificação em pool de processos."""
+
+    def setUp(self):
+        """Gera um fluxo determinístico de pedidos variados."""
+        aleatorio = random.Random(42)
+        self.service = PedidoService()
+        self.pedidos = [
+            {
+                "cliente": f"Cliente{i}",
+                "produto": aleatorio.choice(["diesel", "gasolina", "etanol", "lubrificante"]),
+                "qtd": aleatorio.randint(0, 1500),
+                "cupom": aleatorio.choice([None, "MEGA10", "NOVO5", "LUB2"]),
+            }
+            for i in range(500)
+        ]
+
+    def test_resultados_na_ordem_de_entrada(self):
+        """Os lotes devem voltar na ordem de entrada, com os mesmos valores do modo sequencial."""
+        lotes = list(em_lotes(self.pedidos, 37))
+        resultados = list(precificar_em_paralelo(lotes, self.service, workers=2))
+
+        self.assertEqual([lote for lote, _ in resultados], lotes)
+        for lote, resultado in resultados:
+            esperado = self.service.processar_pedidos(lote, registrar_log=False)
+            self.assertEqual(resultado.valores, esperado.valores)
+            self.assertEqual(resultado.status, esperado.status)
+
+    def test_total_identico_ao_sequencial(self):
+        """O TOTAL em paralelo deve ser exatamente igual ao sequencial."""
+        saida_sequencial = io.StringIO()
+        saida_paralela = io.StringIO()
+
+        total_sequencial = processar_fluxo(self.pedidos, self.service, saida_sequencial, 50)
+        total_paralelo = processar_fluxo(
+            self.pedidos, self.service, saida_paralela, 50, workers=3
+        )
+
+        self.assertEqual(total_paralelo, total_sequencial)
+        self.assertEqual(saida_paralela.getvalue(), saida_sequencial.getvalue())
+
+    def test_total_exato_identico_ao_sequencial(self):
+        """No modo exato, o TOTAL em paralelo também deve ser idêntico."""
+        total_sequencial = processar_fluxo(self.pedidos, self.service, None, 50, exato=True)
+        total_paralelo = processar_fluxo(self.pedidos, self.service, None, 50, 2, exato=True)
+        self.assertEqual(total_paralelo, total_sequencial)
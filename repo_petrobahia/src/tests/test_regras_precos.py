@@ -0,0 +1,191 @@
+import io
+import json
+import os
+import pickle
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+
+from refatorado.agregacao import Agregador
+from refatorado.cache_precos import CachePrecos
+from refatorado.ingestao_pedidos import processar_fluxo
+from refatorado.motor_cupons import MotorCupons
+from refatorado.pedido_service import PedidoService
+from refatorado.regras_precos import HISTORICO, PublicadorRegras, ler_regras
+from refatorado.saida_colunar import FORMATO_PBCOL, EscritorColunar, LeitorColunar
+from refatorado.tabela_tarifas import TabelaTarifas
+
+PEDIDO = {"cliente": "TransLog", "produto": "diesel", "qtd": 1200, "cupom": "MEGA10"}
+
+TARIFAS_NOVAS = {
+    "diesel": {"base": 5.0, "faixas": [[500, 0.95], [1000, 0.9]]},
+    "gasolina": {"base": 5.19, "faixas": [[200, 1.0, 100.0]]},
+}
+
+
+class TestPublicadorRegras(unittest.TestCase):
+    """Testes da publicação de instantâneos de regras."""
+
+    def setUp(self):
+        """Cria um diretório temporário para os arquivos de regras."""
+        self.pasta = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.pasta.name, "regras.json")
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def _gravar(self, dados):
+        with open(self.caminho, "w", encoding="utf-8") as arquivo:
+            json.dump(dados, arquivo)
+        # Garante uma assinatura nova mesmo em sistemas de arquivos com mtime grosso.
+        estado = os.stat(self.caminho)
+        os.utime(self.caminho, ns=(estado.st_atime_ns, estado.st_mtime_ns + 1_000_000_000))
+
+    def test_publicar_nao_altera_instantaneo_anterior(self):
+        """Publicar cria uma versão nova; quem guardou a anterior continua com ela."""
+        publicador = PublicadorRegras()
+        anterior = publicador.atual()
+        novo = publicador.publicar(cupons=MotorCupons(()))
+        self.assertEqual((anterior.versao, novo.versao), (1, 2))
+        self.assertIs(novo.tabela, anterior.tabela)
+        self.assertIn("MEGA10", anterior.cupons.regras)
+        self.assertIs(publicador.atual(), novo)
+
+    def test_historico_limitado(self):
+        """Só os instantâneos mais recentes podem ser consultados por versão."""
+        publicador = PublicadorRegras()
+        for _ in range(HISTORICO + 2):
+            publicador.publicar()
+        self.assertEqual(publicador.instantaneo(publicador.versao), publicador.atual())
+        with self.assertRaises(KeyError):
+            publicador.instantaneo(1)
+
+    def test_recarrega_quando_o_arquivo_muda(self):
+        """A vigia recarrega o arquivo alterado; ``atual()`` só lê a referência."""
+        self._gravar({"tarifas": TARIFAS_NOVAS})
+        publicador = PublicadorRegras(caminho=self.caminho)
+        self.assertEqual(publicador.versao, 1)
+        self.assertEqual(publicador.atual().tabela.preco_base("diesel"), 5.0)
+        self.assertIn("MEGA10", publicador.atual().cupons.regras)
+
+        self._gravar({"cupons": {"MEGA10": {"percentual": 20}}})
+        self.assertEqual(publicador.atual().versao, 1)
+        self.assertTrue(publicador.verificar())
+        regras = publicador.atual()
+        self.assertEqual(regras.versao, 2)
+        self.assertEqual(regras.tabela.preco_base("diesel"), 5.0)
+        self.assertEqual(regras.cupons.aplicar(100.0, "MEGA10", "diesel"), 80.0)
+        self.assertFalse(publicador.verificar())
+
+    def test_vigia_em_segundo_plano(self):
+        """Com ``verificar_a_cada``, a thread vigia publica a mudança sozinha."""
+        self._gravar({"tarifas": TARIFAS_NOVAS})
+        with PublicadorRegras(caminho=self.caminho, verificar_a_cada=0.01) as publicador:
+            self._gravar({"cupons": {"MEGA10": {"percentual": 20}}})
+            prazo = time.monotonic() + 5
+            while publicador.versao == 1 and time.monotonic() < prazo:
+                time.sleep(0.01)
+            self.assertEqual(publicador.versao, 2)
+        self.assertIsNone(publicador._vigia)
+
+    def test_arquivo_invalido_mantem_regras(self):
+        """Um arquivo inválido na recarga não troca o instantâneo em vigor."""
+        self._gravar({"tarifas": TARIFAS_NOVAS})
+        publicador = PublicadorRegras(caminho=self.caminho)
+        self._gravar({"outra": 1})
+        with redirect_stdout(io.StringIO()) as saida:
+            self.assertFalse(publicador.verificar())
+        self.assertEqual(publicador.atual().versao, 1)
+        self.assertIn("[ERRO]", saida.getvalue())
+
+    def test_ler_regras_exige_chaves(self):
+        """O arquivo de regras deve ter tarifas e/ou cupons."""
+        self._gravar([1, 2])
+        with self.assertRaises(ValueError):
+            ler_regras(self.caminho)
+
+    def test_serializavel(self):
+        """O publicador deve poder ser enviado a outros processos."""
+        self._gravar({"tarifas": TARIFAS_NOVAS})
+        with PublicadorRegras(caminho=self.caminho, verificar_a_cada=60) as publicador:
+            publicador.publicar()
+            copia = pickle.loads(pickle.dumps(publicador))
+        self.assertEqual(copia.versao, 2)
+        self.assertIsNone(copia._vigia)
+        self.assertEqual(copia.atual().cupons.versao, publicador.atual().cupons.versao)
+        copia.publicar()
+
+
+class TestServicoComRegras(unittest.TestCase):
+    """Testes do ``PedidoService`` com regras versionadas."""
+
+    def setUp(self):
+        """Configura o serviço com um publicador de regras."""
+        self.regras = PublicadorRegras()
+        self.service = PedidoService(regras=self.regras)
+
+    def _publicar_tarifas_novas(self):
+        return self.regras.publicar(tabela=TabelaTarifas.de_dict(TARIFAS_NOVAS))
+
+    def test_lote_registra_versao(self):
+        """O resultado do lote traz a versão usada; sem regras, None."""
+        resultado = self.service.processar_pedidos([PEDIDO], registrar_log=False)
+        self.assertEqual((resultado.valores, resultado.versao_regras), ([3878.0], 1))
+        self._publicar_tarifas_novas()
+        resultado = self.service.processar_pedidos_centavos([PEDIDO], registrar_log=False)
+        self.assertEqual((resultado.valores, resultado.versao_regras), ([486000], 2))
+        self.assertIsNone(PedidoService().processar_pedidos([PEDIDO], False).versao_regras)
+
+    def test_servico_fixado_ignora_recarga(self):
+        """Um lote em andamento termina com o instantâneo em que começou."""
+        fixado = self.service.fixar()
+        self._publicar_tarifas_novas()
+        self.assertEqual(fixado.processar_pedidos([PEDIDO], False).valores, [3878.0])
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(self.service.processar_pedido(PEDIDO), 4860.0)
+        self.assertEqual(self.service.fixar(1).versao_regras, 1)
+
+    def test_cache_invalidado_pela_recarga(self):
+        """Com cache, preços da versão anterior não são reaproveitados."""
+        service = PedidoService(cache=CachePrecos(), regras=self.regras)
+        self.assertEqual(service.processar_pedidos([PEDIDO], False).valores, [3878.0])
+        self._publicar_tarifas_novas()
+        self.assertEqual(service.processar_pedidos([PEDIDO], False).valores, [4860.0])
+
+    def test_fluxo_registra_versao_por_pedido(self):
+        """Cada linha da saída JSONL traz a versão, também em paralelo."""
+        self._publicar_tarifas_novas()
+        for workers in (1, 2):
+            saida = io.StringIO()
+            total = processar_fluxo([PEDIDO] * 6, self.service, saida, 2, workers)
+            linhas = [json.loads(linha) for linha in saida.getvalue().splitlines()]
+            self.assertEqual({linha["versao_regras"] for linha in linhas}, {2})
+            self.assertEqual(total, 6 * 4860.0)
+
+    def test_lote_em_voo_sobrevive_a_muitas_recargas(self):
+        """Lotes em voo usam o próprio instantâneo, mesmo após mais recargas que o histórico."""
+
+        def pedidos():
+            for _ in range(6):
+                for _ in range(HISTORICO + 2):
+                    self._publicar_tarifas_novas()
+                yield PEDIDO
+
+        for workers in (1, 2):
+            agregador = Agregador()
+            with tempfile.TemporaryDirectory() as pasta:
+                caminho = os.path.join(pasta, "lotes.pbcol")
+                with EscritorColunar(caminho, FORMATO_PBCOL) as colunar:
+                    total = processar_fluxo(
+                        pedidos(), self.service, None, 1, workers, False, agregador, colunar
+                    )
+                with LeitorColunar(caminho) as leitor:
+                    valores = [v for bloco in leitor.blocos() for v in bloco["valor_centavos"]]
+            self.assertEqual(total, 6 * 4860.0)
+            self.assertEqual(valores, [486000] * 6)
+            self.assertEqual(agregador.total_centavos, 6 * 486000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from refatorado.cliente_service import ClienteService
+from refatorado.repositorio_clientes import (
+    POLITICA_MESCLAR,
+    POLITICA_REJEITAR,
+    RepositorioClientes,
+)
+
+
+class TestRepositorioClientes(unittest.TestCase):
+    """Testes para o repositório de clientes indexado por CNPJ."""
+
+    def setUp(self):
+        """Configura um repositório em memória."""
+        self.repositorio = RepositorioClientes()
+        self.ana = {"nome": "Ana Paula", "email": "ana@@petrobahia", "cnpj": "123"}
+        self.carlos = {"nome": "Carlos", "email": "carlos@petrobahia.com", "cnpj": "456"}
+
+    def tearDown(self):
+        self.repositorio.fechar()
+
+    # Testes de Gravação e Busca
+    def test_salvar_e_buscar(self):
+        """Deve encontrar o cliente pelo CNPJ."""
+        self.assertTrue(self.repositorio.salvar(self.carlos))
+        self.assertEqual(self.repositorio.buscar("456"), self.carlos)
+        self.assertIsNone(self.repositorio.buscar("999"))
+        self.assertIn("456", self.repositorio)
+
+    def test_rejeitar_duplicado(self):
+        """Com a política 'rejeitar', o registro existente é mantido."""
+        self.repositorio.salvar(self.ana)
+        outro = dict(self.ana, email="ana@petrobahia.com")
+        self.assertFalse(self.repositorio.salvar(outro, POLITICA_REJEITAR))
+        self.assertEqual(self.repositorio.buscar("123"), self.ana)
+
+    def test_mesclar_duplicado(self):
+        """Com a política 'mesclar', o registro existente é atualizado."""
+        self.repositorio.salvar(self.ana)
+        corrigido = dict(self.ana, email="ana@petrobahia.com")
+        self.assertTrue(self.repositorio.salvar(corrigido, POLITICA_MESCLAR))
+        self.assertEqual(self.repositorio.buscar("123"), corrigido)
+        self.assertEqual(len(self.repositorio), 1)
+
+    def test_salvar_lote_com_duplicados_internos(self):
+        """Duplicados dentro do mesmo lote também devem ser detectados."""
+        resultados = self.repositorio.salvar_lote([self.ana, self.carlos, self.ana])
+        self.assertEqual(resultados, [True, True, False])
+        self.assertEqual(len(self.repositorio), 2)
+
+    def test_importar_arquivo_legado(self):
+        """Deve importar o clientes.txt legado descartando as repetições."""
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "clientes.txt")
+            with open(caminho, "w", encoding="utf-8") as arquivo:
+                for _ in range(8):
+                    arquivo.write(str(self.ana) + "\n" + str(self.carlos) + "\n")
+            self.assertEqual(self.repositorio.importar_arquivo(caminho), 2)
+        self.assertEqual(len(self.repositorio), 2)
+
+    # Testes de Integração com o ClienteService
+    @patch("builtins.print")
+    def test_service_rejeita_duplicado(self, mock_print):
+        """O serviço deve recusar o segundo cadastro do mesmo CNPJ."""
+        service = ClienteService(repositorio=self.repositorio)
+        self.assertTrue(service.cadastrar_cliente(self.carlos))
+        self.assertFalse(service.cadastrar_cliente(self.carlos))
+        mock_print.assert_any_call("Cliente com CNPJ 456 já cadastrado. Cadastro não realizado.")
+        self.assertEqual(service.buscar_cliente("456"), self.carlos)
+
+    @patch("builtins.print")
+    def test_service_lote_filtra_duplicados(self, mock_print):
+        """O cadastro em lote deve gravar cada CNPJ uma única vez."""
+        service = ClienteService(repositorio=self.repositorio)
+        incompleto = {"nome": "Sem CNPJ", "email": "x@y.com"}
+        resultados = service.cadastrar_clientes([self.ana, incompleto, self.carlos, self.ana])
+        self.assertEqual(resultados, [True, False, True, False])
+        mock_print.assert_any_call("Enviando email de boas-vindas para 2 clientes")
+
+    def test_service_sem_repositorio_nao_busca(self):
+        """Sem repositório, a busca por CNPJ não está disponível."""
+        with self.assertRaises(RuntimeError):
+            ClienteService().buscar_cliente("123")
@@ -0,0 +1,144 @@
+import io
+import os
+import tempfile
+import unittest
+
+from refatorado.ingestao_pedidos import processar_fluxo
+from refatorado.pedido import LotePedidos
+from refatorado.pedido_service import PedidoService
+from refatorado.saida_colunar import (
+    COLUNAS,
+    FORMATO_ARROW,
+    FORMATO_PBCOL,
+    EscritorColunar,
+    LeitorColunar,
+    detalhar_lote,
+    ipc,
+    pa,
+)
+
+PEDIDOS = [
+    {"cliente": "TransLog", "produto": "diesel", "qtd": 1200, "cupom": "MEGA10"},
+    {"cliente": "MoveMais", "produto": "gasolina", "qtd": 300, "cupom": None},
+    {"cliente": "Falho", "produto": "etanol", "qtd": 0},
+    {"cliente": "EcoFrota", "produto": "etanol", "qtd": 81, "cupom": "NOVO5"},
+    {"cliente": "Aqua", "produto": "agua", "qtd": 10},
+    {"cliente": "PetroPark", "produto": "lubrificante", "qtd": 12, "cupom": "LUB2"},
+]
+
+
+class TestDetalharLote(unittest.TestCase):
+    """Testes da decomposição do valor de cada pedido."""
+
+    def setUp(self):
+        """Configura o serviço de pedidos."""
+        self.service = PedidoService()
+
+    def test_decomposicao(self):
+        """Preço base menos descontos deve dar o valor final de cada pedido."""
+        resultado = self.service.processar_pedidos(PEDIDOS, registrar_log=False)
+        colunas = detalhar_lote(PEDIDOS, resultado, self.service)
+        # etanol x81: 290.79 de tabela, 282.07 na faixa, 267.96 com NOVO5.
+        self.assertEqual(colunas["preco_base_centavos"][3], 29079)
+        self.assertEqual(colunas["desconto_quantidade_centavos"][3], 872)
+        self.assertEqual(colunas["desconto_cupom_centavos"][3], 1411)
+        for base, quantidade, cupom, valor in zip(
+            colunas["preco_base_centavos"],
+            colunas["desconto_quantidade_centavos"],
+            colunas["desconto_cupom_centavos"],
+            colunas["valor_centavos"],
+        ):
+            self.assertEqual(base - quantidade - cupom, valor)
+        self.assertEqual(sum(colunas["valor_centavos"]), round(resultado.total * 100))
+
+    def test_modo_exato_e_lote_em_colunas(self):
+        """Deve aceitar o resultado em centavos e o lote em colunas."""
+        lote = LotePedidos.de_pedidos(PEDIDOS)
+        resultado = self.service.processar_pedidos_centavos(lote, registrar_log=False)
+        colunas = detalhar_lote(lote, resultado, self.service)
+        self.assertEqual(colunas["valor_centavos"], resultado.valores)
+        self.assertEqual(colunas["status"], resultado.status)
+
+
+class TestFormatoPbcol(unittest.TestCase):
+    """Testes do formato binário colunar de fallback."""
+
+    def setUp(self):
+        """Cria um diretório temporário e o serviço de pedidos."""
+        self.pasta = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.pasta.name, "pedidos.pbcol")
+        self.service = PedidoService()
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def test_ida_e_volta_em_blocos(self):
+        """Cada lote vira um bloco e as linhas lidas devem igualar as colunas gravadas."""
+        resultado = self.service.processar_pedidos(PEDIDOS, registrar_log=False)
+        colunas = detalhar_lote(PEDIDOS, resultado, self.service)
+        with EscritorColunar(self.caminho, FORMATO_PBCOL) as escritor:
+            escritor.escrever_colunas(colunas)
+            escritor.escrever_colunas(colunas)
+        self.assertEqual(escritor.linhas, 2 * len(PEDIDOS))
+
+        esperado = [dict(zip(COLUNAS, valores)) for valores in zip(*map(colunas.get, COLUNAS))]
+        with LeitorColunar(self.caminho) as leitor:
+            self.assertEqual(list(leitor.linhas()), esperado * 2)
+
+    def test_colunas_inteiras_sem_copia(self):
+        """As colunas inteiras devem ser views do arquivo mapeado."""
+        resultado = self.service.processar_pedidos(PEDIDOS, registrar_log=False)
+        with EscritorColunar(self.caminho, FORMATO_PBCOL) as escritor:
+            escritor.escrever_lote(PEDIDOS, resultado, self.service)
+        with LeitorColunar(self.caminho) as leitor:
+            for bloco in leitor.blocos():
+                valores = bloco["valor_centavos"]
+                self.assertIsInstance(valores, memoryview)
+                self.assertEqual(sum(valores), round(resultado.total * 100))
+                del bloco, valores
+
+    def test_arquivo_invalido(self):
+        """Deve rejeitar um arquivo que não seja PBCOL."""
+        with open(self.caminho, "wb") as arquivo:
+            arquivo.write(b"nao sou colunar")
+        with self.assertRaises(ValueError):
+            LeitorColunar(self.caminho)
+
+    def test_formato_desconhecido(self):
+        """Deve rejeitar um formato inexistente."""
+        with self.assertRaises(ValueError):
+            EscritorColunar(self.caminho, "csv")
+
+    def test_fluxo_grava_colunar(self):
+        """``processar_fluxo`` deve gravar um bloco por lote, com todos os pedidos."""
+        with EscritorColunar(self.caminho, FORMATO_PBCOL) as escritor:
+            total = processar_fluxo(PEDIDOS * 5, self.service, io.StringIO(), 4, colunar=escritor)
+        with LeitorColunar(self.caminho) as leitor:
+            linhas = list(leitor.linhas())
+        self.assertEqual(len(linhas), len(PEDIDOS) * 5)
+        self.assertEqual(sum(linha["valor_centavos"] for linha in linhas), round(total * 100))
+
+
+@unittest.skipIf(pa is None, "pyarrow não instalado")
+class TestFormatoArrow(unittest.TestCase):
+    """Testes da saída no formato IPC do Arrow."""
+
+    def test_ida_e_volta(self):
+        """O arquivo Arrow deve ser lido por mapa de memória com as mesmas colunas."""
+        service = PedidoService()
+        resultado = service.processar_pedidos(PEDIDOS, registrar_log=False)
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "pedidos.arrow")
+            with EscritorColunar(caminho, FORMATO_ARROW) as escritor:
+                escritor.escrever_lote(PEDIDOS, resultado, service)
+            with pa.memory_map(caminho) as origem:
+                tabela = ipc.open_file(origem).read_all()
+                self.assertEqual(tabela.column_names, list(COLUNAS))
+                self.assertEqual(
+                    tabela.column("valor_centavos").to_pylist(),
+                    detalhar_lote(PEDIDOS, resultado, service)["valor_centavos"],
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
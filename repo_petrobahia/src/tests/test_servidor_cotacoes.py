@@ -0,0 +1,133 @@
+import asyncio
+import json
+import unittest
+
+from bench.gerador_carga import gerar_carga, percentil
+from refatorado.pedido_service import PedidoService
+from refatorado.regras_precos import PublicadorRegras
+from refatorado.servidor_cotacoes import Microlotes, ServidorCotacoes
+
+PEDIDOS = [
+    {"id": 1, "cliente": "TransLog", "produto": "diesel", "qtd": 1200, "cupom": "MEGA10"},
+    {"id": 2, "cliente": "MoveMais", "produto": "gasolina", "qtd": 300, "cupom": None},
+    {"id": 3, "cliente": "Falho", "produto": "etanol", "qtd": 0},
+    {"id": 4, "cliente": "EcoFrota", "produto": "etanol", "qtd": 81, "cupom": "NOVO5"},
+    {"id": 5, "cliente": "Aqua", "produto": "agua", "qtd": 10},
+]
+
+
+class TestServidorCotacoes(unittest.IsolatedAsyncioTestCase):
+    """Testes do servidor de cotações por TCP."""
+
+    async def asyncSetUp(self):
+        """Sobe o servidor em uma porta livre."""
+        self.servidor = ServidorCotacoes(porta=0, janela=0.001)
+        await self.servidor.iniciar()
+        self.leitor, self.escritor = await asyncio.open_connection(
+            self.servidor.host, self.servidor.porta
+        )
+
+    async def asyncTearDown(self):
+        self.escritor.close()
+        await self.escritor.wait_closed()
+        await self.servidor.encerrar()
+
+    async def _enviar(self, linhas):
+        self.escritor.write(b"".join(linha + b"\n" for linha in linhas))
+        await self.escritor.drain()
+        return [json.loads(await self.leitor.readline()) for _ in linhas]
+
+    async def test_cotacoes_iguais_ao_servico(self):
+        """As cotações devem igualar o processamento em lote, na ordem e com o id."""
+        esperado = PedidoService().processar_pedidos(PEDIDOS, registrar_log=False)
+        respostas = await self._enviar([json.dumps(p).encode() for p in PEDIDOS])
+        self.assertEqual([r["id"] for r in respostas], [1, 2, 3, 4, 5])
+        self.assertEqual([r["valor"] for r in respostas], esperado.valores)
+        self.assertEqual([r["status"] for r in respostas], esperado.status)
+
+    async def test_linha_invalida_nao_derruba_conexao(self):
+        """Uma linha malformada recebe um erro e a conexão segue atendendo."""
+        respostas = await self._enviar(
+            [b"{nao e json", b'{"produto": "diesel", "qtd": "10"}', json.dumps(PEDIDOS[0]).encode()]
+        )
+        self.assertIn("erro", respostas[0])
+        self.assertIn("erro", respostas[1])
+        self.assertEqual(respostas[2]["valor"], 3878.0)
+
+    async def test_linha_longa_recebe_erro(self):
+        """Uma linha acima do limite de leitura recebe um erro, sem perder as seguintes."""
+        longa = json.dumps({"cliente": "x" * 100_000, "produto": "diesel", "qtd": 1}).encode()
+        respostas = await self._enviar([longa, json.dumps(PEDIDOS[0]).encode()])
+        self.assertIn("limite", respostas[0]["erro"])
+        self.assertEqual(respostas[1]["valor"], 3878.0)
+
+    async def test_gerador_de_carga(self):
+        """O gerador deve receber uma resposta por pedido e medir as latências."""
+        medidas = await gerar_carga(
+            self.servidor.host, self.servidor.porta, conexoes=4, pedidos_por_conexao=50
+        )
+        self.assertEqual(medidas["pedidos"], 200)
+        self.assertLessEqual(medidas["p50_ms"], medidas["p99_ms"])
+
+
+class TestMicrolotes(unittest.IsolatedAsyncioTestCase):
+    """Testes do agrupamento de pedidos em micro-lotes."""
+
+    async def test_agrupa_pedidos_concorrentes(self):
+        """Pedidos concorrentes devem ser precificados em poucos lotes."""
+        microlotes = Microlotes(PedidoService(), tamanho_lote=64, janela=0.05)
+        microlotes.iniciar()
+        try:
+            cotacoes = await asyncio.gather(*(microlotes.cotar(PEDIDOS[0]) for _ in range(200)))
+        finally:
+            await microlotes.encerrar()
+        self.assertTrue(all(c["valor"] == 3878.0 for c in cotacoes))
+        self.assertEqual(microlotes.pedidos, 200)
+        self.assertLessEqual(microlotes.lotes, 4)
+
+    async def test_lote_espera_a_janela(self):
+        """Pedidos que chegam dentro da janela entram no mesmo lote."""
+        microlotes = Microlotes(PedidoService(), tamanho_lote=64, janela=0.5)
+        microlotes.iniciar()
+        try:
+            primeira = asyncio.ensure_future(microlotes.cotar(PEDIDOS[0]))
+            await asyncio.sleep(0.05)
+            segunda = await microlotes.cotar(PEDIDOS[1])
+            self.assertEqual((await primeira)["valor"], 3878.0)
+        finally:
+            await microlotes.encerrar()
+        self.assertEqual(segunda["status"], "OK")
+        self.assertEqual((microlotes.lotes, microlotes.pedidos), (1, 2))
+
+    async def test_cotacao_registra_versao_das_regras(self):
+        """Com regras versionadas, cada cotação traz a versão usada no seu lote."""
+        regras = PublicadorRegras()
+        microlotes = Microlotes(PedidoService(regras=regras))
+        microlotes.iniciar()
+        try:
+            primeira = await microlotes.cotar(PEDIDOS[0])
+            regras.publicar()
+            segunda = await microlotes.cotar(PEDIDOS[0])
+        finally:
+            await microlotes.encerrar()
+        self.assertEqual((primeira["versao_regras"], segunda["versao_regras"]), (1, 2))
+        self.assertEqual(primeira["valor"], segunda["valor"])
+
+    async def test_contrapressao_com_fila_cheia(self):
+        """Com a fila cheia, enfileirar deve esperar até haver espaço."""
+        microlotes = Microlotes(PedidoService(), capacidade=2)
+        await microlotes.enfileirar(PEDIDOS[0])
+        await microlotes.enfileirar(PEDIDOS[0])
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(microlotes.enfileirar(PEDIDOS[0]), 0.05)
+        await microlotes.encerrar()
+
+    def test_percentil(self):
+        """O percentil deve usar o posto mais próximo."""
+        self.assertEqual(percentil([1, 2, 3, 4], 0.5), 2)
+        self.assertEqual(percentil([1, 2, 3, 4], 0.99), 4)
+        self.assertEqual(percentil([], 0.99), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
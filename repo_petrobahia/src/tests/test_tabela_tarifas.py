@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+import unittest
+
+from refatorado import tabela_tarifas
+from refatorado.preco_calculadora import PrecoCalculadora
+from refatorado.tabela_tarifas import FaixaDesconto, TabelaTarifas
+
+
+class TestTabelaTarifas(unittest.TestCase):
+    """Testes para a tabela de tarifas compilada."""
+
+    def setUp(self):
+        """Configura uma tabela com faixas fora de ordem e um produto sem faixas."""
+        self.tabela = TabelaTarifas(
+            {"diesel": 3.99, "gasolina": 5.19, "graxa": 10.0},
+            {
+                "diesel": [FaixaDesconto(1000, 0.9), FaixaDesconto(500, 0.95)],
+                "gasolina": [FaixaDesconto(200, deducao=100.0)],
+            },
+        )
+
+    # Testes de Busca de Faixa
+    def test_faixas_respeitam_limite_exclusivo(self):
+        """A faixa só vale para quantidades acima do limite."""
+        self.assertEqual(self.tabela.preco_total("diesel", 500), 3.99 * 500)
+        self.assertEqual(self.tabela.preco_total("diesel", 501), 3.99 * 501 * 0.95)
+        self.assertEqual(self.tabela.preco_total("diesel", 1000), 3.99 * 1000 * 0.95)
+        self.assertEqual(self.tabela.preco_total("diesel", 1001), 3.99 * 1001 * 0.9)
+
+    def test_deducao_fixa(self):
+        """Deve aplicar a dedução fixa da faixa."""
+        self.assertEqual(self.tabela.preco_total("gasolina", 200), 5.19 * 200)
+        self.assertEqual(self.tabela.preco_total("gasolina", 201), 5.19 * 201 - 100.0)
+
+    def test_produto_sem_faixas(self):
+        """Produto sem faixas deve ter apenas o preço base."""
+        self.assertEqual(self.tabela.preco_total("graxa", 5000), 50000.0)
+        self.assertEqual(self.tabela.preco_base("graxa"), 10.0)
+
+    def test_contem_produto(self):
+        """Deve informar se o produto está na tabela."""
+        self.assertIn("diesel", self.tabela)
+        self.assertNotIn("agua", self.tabela)
+
+    def test_faixa_sem_preco_base(self):
+        """Deve rejeitar faixas de produtos sem preço base."""
+        with self.assertRaises(ValueError):
+            TabelaTarifas({"diesel": 3.99}, {"etanol": [FaixaDesconto(80, 0.97)]})
+
+    # Testes de Carga por Configuração
+    def test_de_arquivo(self):
+        """Deve carregar a tabela de um arquivo JSON."""
+        dados = {
+            "diesel": {"base": 3.99, "faixas": [[500, 0.95, 0.0], [1000, 0.9, 0.0]]},
+            "querosene": {"base": 4.5},
+        }
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "tarifas.json")
+            with open(caminho, "w", encoding="utf-8") as arquivo:
+                json.dump(dados, arquivo)
+            calc = PrecoCalculadora.de_arquivo(caminho)
+
+        self.assertAlmostEqual(calc.calcular_preco("diesel", 1200), 4309.20, 2)
+        self.assertEqual(calc.calcular_preco("querosene", 10), 45.0)
+
+    def test_tabela_padrao_igual_as_regras_originais(self):
+        """A tabela padrão deve reproduzir as regras de desconto originais."""
+        calc = PrecoCalculadora()
+        for qtd in range(1, 1500):
+            self.assertEqual(
+                calc.calcular_preco("diesel", qtd),
+                round(3.99 * qtd * (0.9 if qtd > 1000 else 0.95 if qtd > 500 else 1.0), 2),
+            )
+            self.assertEqual(
+                calc.calcular_preco("gasolina", qtd),
+                round(5.19 * qtd - 100.0 if qtd > 200 else 5.19 * qtd, 2),
+            )
+            self.assertEqual(
+                calc.calcular_preco("etanol", qtd),
+                round(3.59 * qtd * 0.97 if qtd > 80 else 3.59 * qtd, 2),
+            )
+
+    @unittest.skipIf(tabela_tarifas.np is None, "NumPy não instalado")
+    def test_precos_totais_numpy(self):
+        """A versão vetorizada deve coincidir com a escalar."""
+        produtos = ["diesel", "agua", "gasolina", "graxa", "diesel", "gasolina"]
+        quantidades = [1001, 10, 201, 3, 500, 50]
+        totais = self.tabela.precos_totais_numpy(produtos, quantidades).tolist()
+        esperado = [
+            self.tabela.preco_total(p, q) if p in self.tabela else 0.0
+            for p, q in zip(produtos, quantidades)
+        ]
+        self.assertEqual(totais, esperado)
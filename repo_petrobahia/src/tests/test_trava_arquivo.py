@@ -0,0 +1,88 @@
+import ast
+import io
+import multiprocessing
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from refatorado.cliente_service import ClienteService
+from refatorado.trava_arquivo import anexar_com_trava
+
+PROCESSOS = 4
+CLIENTES_POR_PROCESSO = 100
+# Registros maiores que o buffer de escrita, para que gravações sem trava pudessem se intercalar.
+NOME_LONGO = "N" * 20_000
+
+
+def _cadastrar_um_a_um(caminho: str, produtor: int) -> None:
+    """Cadastra clientes um a um, no modo de escrita concorrente."""
+    service = ClienteService(caminho, escrita_concorrente=True)
+    with redirect_stdout(io.StringIO()):
+        for numero in range(CLIENTES_POR_PROCESSO):
+            service.cadastrar_cliente(
+                {"nome": NOME_LONGO, "email": "a@b.com", "cnpj": f"{produtor}-{numero}"}
+            )
+
+
+def _cadastrar_em_lote(caminho: str, produtor: int) -> None:
+    """Cadastra clientes em lote, com flush a cada 10 registros."""
+    service = ClienteService(caminho, escrita_concorrente=True)
+    clientes = [
+        {"nome": NOME_LONGO, "email": "a@b.com", "cnpj": f"{produtor}-{numero}"}
+        for numero in range(CLIENTES_POR_PROCESSO)
+    ]
+    with redirect_stdout(io.StringIO()):
+        service.cadastrar_clientes(clientes, tamanho_flush=10)
+
+
+class TestTravaArquivo(unittest.TestCase):
+    """Testes da escrita concorrente de clientes por vários processos."""
+
+    def setUp(self):
+        """Cria um diretório temporário para o arquivo de clientes."""
+        self.pasta = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.pasta.name, "clientes.txt")
+
+    def tearDown(self):
+        self.pasta.cleanup()
+
+    def _executar_produtores(self, alvo):
+        processos = [
+            multiprocessing.Process(target=alvo, args=(self.caminho, produtor))
+            for produtor in range(PROCESSOS)
+        ]
+        for processo in processos:
+            processo.start()
+        for processo in processos:
+            processo.join()
+            self.assertEqual(processo.exitcode, 0)
+
+    def _verificar_registros(self):
+        with open(self.caminho, encoding="utf-8") as arquivo:
+            registros = [ast.literal_eval(linha) for linha in arquivo]
+        cnpjs = {registro["cnpj"] for registro in registros}
+        self.assertEqual(len(registros), PROCESSOS * CLIENTES_POR_PROCESSO)
+        self.assertEqual(len(cnpjs), PROCESSOS * CLIENTES_POR_PROCESSO)
+        self.assertTrue(all(registro["nome"] == NOME_LONGO for registro in registros))
+
+    def test_anexar_com_trava(self):
+        """Deve anexar o texto ao fim do arquivo."""
+        anexar_com_trava(self.caminho, "a\n")
+        anexar_com_trava(self.caminho, "b\n")
+        with open(self.caminho, encoding="utf-8") as arquivo:
+            self.assertEqual(arquivo.read(), "a\nb\n")
+
+    def test_varios_processos_um_a_um(self):
+        """Cadastros simultâneos de vários processos não devem se perder nem se intercalar."""
+        self._executar_produtores(_cadastrar_um_a_um)
+        self._verificar_registros()
+
+    def test_varios_processos_em_lote(self):
+        """Lotes gravados por vários processos devem manter cada registro inteiro."""
+        self._executar_produtores(_cadastrar_em_lote)
+        self._verificar_registros()
+
+
+if __name__ == "__main__":
+    unittest.main()
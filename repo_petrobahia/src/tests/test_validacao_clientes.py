@@ -0,0 +1,76 @@
+import unittest
+
+from refatorado.cliente_service import ClienteService
+from refatorado.validacao_clientes import (
+    CNPJ_INVALIDO,
+    EMAIL_INVALIDO,
+    FALTA_CAMPO,
+    VALIDO,
+    cnpj_valido,
+    descrever_status,
+    validar_lote,
+)
+
+
+class TestValidacaoClientes(unittest.TestCase):
+    """Testes para a validação em lote de clientes."""
+
+    # Testes de CNPJ
+    def test_cnpj_valido(self):
+        """Deve aceitar CNPJs com dígitos verificadores corretos, com ou sem pontuação."""
+        self.assertTrue(cnpj_valido("11.222.333/0001-81"))
+        self.assertTrue(cnpj_valido("11222333000181"))
+        self.assertTrue(cnpj_valido("33.000.167/0001-01"))
+
+    def test_cnpj_digito_errado(self):
+        """Deve rejeitar CNPJ com dígito verificador errado."""
+        self.assertFalse(cnpj_valido("11.222.333/0001-82"))
+        self.assertFalse(cnpj_valido("11.222.333/0001-91"))
+
+    def test_cnpj_formato_invalido(self):
+        """Deve rejeitar tamanhos errados, letras e dígitos todos iguais."""
+        self.assertFalse(cnpj_valido("123"))
+        self.assertFalse(cnpj_valido("1122233300018A"))
+        self.assertFalse(cnpj_valido("00000000000000"))
+        self.assertFalse(cnpj_valido("１１２２２３３３０００１８１"))
+
+    # Testes de Lote
+    def test_validar_lote(self):
+        """Deve retornar as flags de cada registro."""
+        clientes = [
+            {"nome": "Frota", "email": "frota@petrobahia.com", "cnpj": "11.222.333/0001-81"},
+            {"nome": "Ana Paula", "email": "ana@@petrobahia", "cnpj": "123"},
+            {"nome": "Sem Email", "cnpj": "11222333000181"},
+            {"email": "x@y.com", "cnpj": "11222333000181"},
+        ]
+        status = validar_lote(clientes)
+        self.assertIsInstance(status, bytearray)
+        self.assertEqual(
+            list(status),
+            [VALIDO, EMAIL_INVALIDO | CNPJ_INVALIDO, FALTA_CAMPO, FALTA_CAMPO],
+        )
+
+    def test_validar_lote_campos_none_ou_nao_texto(self):
+        """None conta como ausente e campos que não são texto, como inválidos, sem erro."""
+        clientes = [
+            {"nome": "Frota", "email": None, "cnpj": "11222333000181"},
+            {"nome": None, "email": "frota@petrobahia.com", "cnpj": "11222333000181"},
+            {"nome": "Frota", "email": 42, "cnpj": 11222333000181},
+        ]
+        self.assertEqual(
+            list(validar_lote(clientes)),
+            [FALTA_CAMPO, FALTA_CAMPO, EMAIL_INVALIDO | CNPJ_INVALIDO],
+        )
+        # O cadastro avulso usa a mesma regra de campos obrigatórios.
+        service = ClienteService()
+        self.assertEqual(
+            [service._dados_validos(c) for c in clientes],
+            [not flags & FALTA_CAMPO for flags in validar_lote(clientes)],
+        )
+
+    def test_descrever_status(self):
+        """Deve traduzir as flags em texto."""
+        self.assertEqual(descrever_status(VALIDO), [])
+        self.assertEqual(
+            descrever_status(EMAIL_INVALIDO | CNPJ_INVALIDO), ["email inválido", "CNPJ inválido"]
+        )